@@ -1,8 +1,9 @@
 
-from inventory import app
+from inventory import create_app
+
+app = create_app()
 
 
 if __name__=="__main__":
     app.run(debug=True)
 
-
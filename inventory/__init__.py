@@ -6,15 +6,38 @@ from flask_migrate import Migrate
 from inventory.config import Config
 from flask_cors import CORS
 
-app = Flask(__name__)
-app.config.from_object(Config)
-db = SQLAlchemy(app)
-cors = CORS(app)
-migrate = Migrate(app, db, render_as_batch=True)
-bcrypt = Bcrypt(app)
-login_manager = LoginManager(app)
-login_manager.login_view = 'login'
+db = SQLAlchemy()
+cors = CORS()
+migrate = Migrate(render_as_batch=True)
+bcrypt = Bcrypt()
+login_manager = LoginManager()
+login_manager.login_view = 'users.login'
 login_manager.login_message = ""
 login_manager.login_message_category = "info"
 
-from inventory import routes
+
+# Build the application. config is a settings class or a mapping applied over Config, e.g.
+# create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'}). The views, models and commands are only
+# imported here, so importing the package stays cheap for workers and CLI commands that never build an app
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.from_mapping(config)
+    elif config is not None:
+        app.config.from_object(config)
+
+    db.init_app(app)
+    cors.init_app(app)
+    migrate.init_app(app, db)
+    bcrypt.init_app(app)
+    login_manager.init_app(app)
+
+    from inventory import identity, instrumentation, metrics
+    from inventory.views import register_blueprints
+    from inventory.commands import bp as commands
+    instrumentation.init_app(app)
+    metrics.init_app(app)
+    register_blueprints(app)
+    app.register_blueprint(commands)
+    return app
@@ -0,0 +1,69 @@
+from inventory import db
+from inventory.models import Shop, Store, ShopItem, StoreItem
+from inventory.search import get_item_index
+from inventory.versioning import table_version
+from flask import current_app
+from sqlalchemy import func, literal, union_all
+import threading
+import time
+
+STOCK_TABLES = ('shop_item', 'store_item', 'shop', 'store')
+
+
+# Quantity in stock of every item at every shop and store that has some, loaded with a single query
+class StockSnapshot:
+    def __init__(self, rows):
+        self.locations = {}  # item id -> {'shops': [...], 'stores': [...]}, the locations in name order
+        self.item_ids = {'shops': set(), 'stores': set()}  # ids of the items in stock at some shop / store
+        for item_id, kind, location_id, name, quantity in rows:
+            item_locations = self.locations.setdefault(item_id, {'shops': [], 'stores': []})
+            item_locations[kind].append({"id": location_id, "name": name, "quantity": int(quantity)})
+            self.item_ids[kind].add(item_id)
+        self.item_ids['all'] = self.item_ids['shops'] | self.item_ids['stores']
+
+
+def load_stock_snapshot():
+    shop_stock = db.session.query(ShopItem.item_id, literal('shops'), Shop.id, Shop.shop_name,
+                                  func.sum(ShopItem.item_quantity)) \
+        .join(Shop, Shop.id == ShopItem.shop_id).filter(ShopItem.item_quantity > 0) \
+        .group_by(ShopItem.item_id, Shop.id, Shop.shop_name)
+    store_stock = db.session.query(StoreItem.item_id, literal('stores'), Store.id, Store.store_name,
+                                   func.sum(StoreItem.item_quantity)) \
+        .join(Store, Store.id == StoreItem.store_id).filter(StoreItem.item_quantity > 0) \
+        .group_by(StoreItem.item_id, Store.id, Store.store_name)
+    stock = union_all(shop_stock.statement, store_stock.statement).subquery()
+    return StockSnapshot(db.session.execute(db.select(stock).order_by(*stock.c[:2], stock.c[3])))
+
+
+_snapshot = None
+_snapshot_version = None
+_snapshot_built = 0
+_snapshot_lock = threading.Lock()
+
+
+# The stock snapshot, reloaded after stock moves in this process or after STOCK_SNAPSHOT_TTL seconds to pick up
+# changes made by other worker processes
+def get_stock_snapshot():
+    global _snapshot, _snapshot_version, _snapshot_built
+
+    def is_stale():
+        expired = time.monotonic() - _snapshot_built > current_app.config['STOCK_SNAPSHOT_TTL']
+        return _snapshot is None or table_version(*STOCK_TABLES) != _snapshot_version or expired
+
+    if is_stale():
+        with _snapshot_lock:
+            if is_stale():
+                version = table_version(*STOCK_TABLES)
+                _snapshot = load_stock_snapshot()
+                _snapshot_version = version
+                _snapshot_built = time.monotonic()
+    return _snapshot
+
+
+# Items whose name matches the term with their quantity at every shop and store. Only items in stock somewhere are
+# returned, or with located_at='shops' / 'stores' only items in stock at a shop / store
+def stock_availability(term, limit=None, located_at='all'):
+    snapshot = get_stock_snapshot()
+    index = get_item_index()
+    return [{"item_id": item_id, "name": index.names[item_id], **snapshot.locations[item_id]}
+            for item_id in index.search(term, limit, item_ids=snapshot.item_ids[located_at])]
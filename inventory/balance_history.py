@@ -0,0 +1,50 @@
+from inventory import db
+from inventory.models import AccountBalanceLog
+from sqlalchemy import func, select
+from datetime import date, datetime, time, timedelta
+
+
+def parse_history_day(day):
+    try:
+        return date.fromisoformat(day)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid day")
+
+
+# Latest balance log before a time, found from the timestamp index without reading the older logs
+def last_log_time(before=None):
+    query = db.session.query(func.max(AccountBalanceLog.timestamp))
+    if before is not None:
+        query = query.filter(AccountBalanceLog.timestamp < before)
+    return query.scalar()
+
+
+# Closing balance of every account on each day of a page of the balance history, newest day first. A page covers the
+# `days` calendar days up to and including `until`, by default the day of the latest balance log, and only the last
+# log of each account on each of those days is read. Returns {day: {account id: balance}} and the day the next, older
+# page starts from, None on the last page
+def closing_balances(days, until=None):
+    if until is None:
+        latest = last_log_time()
+        if latest is None:
+            return {}, None
+        until = latest.date()
+    start = datetime.combine(until - timedelta(days=days - 1), time.min)
+    end = datetime.combine(until + timedelta(days=1), time.min)
+
+    day = func.date(AccountBalanceLog.timestamp)
+    ranked = select(AccountBalanceLog.account_id, AccountBalanceLog.timestamp, AccountBalanceLog.balance,
+                    func.row_number().over(partition_by=(AccountBalanceLog.account_id, day),
+                                           order_by=(AccountBalanceLog.timestamp.desc(),
+                                                     AccountBalanceLog.id.desc())).label('position')) \
+        .where(AccountBalanceLog.timestamp >= start, AccountBalanceLog.timestamp < end).subquery()
+    closing = select(ranked.c.account_id, ranked.c.timestamp, ranked.c.balance).where(ranked.c.position == 1) \
+        .order_by(ranked.c.timestamp.desc(), ranked.c.account_id)
+
+    balances = {}
+    for account_id, timestamp, balance in db.session.execute(closing):
+        balances.setdefault(timestamp.date(), {})[account_id] = balance
+    balances = {log_day: dict(sorted(day_balances.items())) for log_day, day_balances in balances.items()}
+
+    older = last_log_time(start)
+    return balances, older.date() if older is not None else None
@@ -0,0 +1,209 @@
+from inventory import db, bcrypt
+from inventory.models import (User, Shop, Store, Item, ShopItem, StoreItem, Shopkeeper, Sale, StockSold, StockOut,
+                              TransferStock, DailyCount, Account, AccountBalanceLog)
+from inventory.rollups import rebuild_daily_summaries
+from flask import current_app
+from sqlalchemy import bindparam, event, insert
+from sqlalchemy.engine import Engine
+from datetime import datetime, timedelta
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+BATCH_SIZE = 5000  # Rows inserted per statement when loading the fixtures
+PAYMENT_METHODS = ['Cash', 'Orange Money', 'Bank']
+
+# What a new process pays before it can answer requests, measured by measure_startup
+STARTUP_STEPS = [
+    ('import inventory', "import inventory"),
+    ('create_app', "from inventory import create_app; create_app()"),
+]
+
+
+# Rows given to add() are inserted with one executemany INSERT per model once BATCH_SIZE rows of a model are waiting.
+# Ids are assigned here so rows can reference each other before they are inserted, and models are always inserted in
+# the order they were first added so the rows referenced are in the database first
+class BulkLoader:
+    def __init__(self):
+        self.pending = {}  # model -> rows not inserted yet
+        self.next_ids = {}
+        self.counts = {}
+
+    def add(self, model, **row):
+        row['id'] = self.next_ids.get(model, 1)
+        self.next_ids[model] = row['id'] + 1
+        rows = self.pending.setdefault(model, [])
+        rows.append(row)
+        if len(rows) >= BATCH_SIZE:
+            self.flush()
+        return row['id']
+
+    def flush(self):
+        for model, rows in self.pending.items():
+            if rows:
+                db.session.execute(insert(model), rows)
+                self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+                self.pending[model] = []
+
+
+# Fill an empty database with a business of the given size. The same options and seed always give the same data, so
+# benchmark results of different versions of the code can be compared. Returns the number of rows per table
+def generate_fixtures(shops=5, stores=2, items=2000, days=365, sales_per_day=40, seed=0, password='benchmark'):
+    rng = random.Random(seed)
+    loader = BulkLoader()
+    now = datetime.now().replace(microsecond=0)
+    first_day = now - timedelta(days=days - 1)
+    password_hash = bcrypt.generate_password_hash(password).decode()
+
+    admin_id = loader.add(User, username='admin', password=password_hash, user_role='Admin')
+    shop_ids = [loader.add(Shop, shop_name=f'Shop {number}', location=f'Location {number}', user_id=admin_id)
+                for number in range(1, shops + 1)]
+    seller_ids = {}
+    for number, shop_id in enumerate(shop_ids, 1):
+        seller_ids[shop_id] = loader.add(User, username=f'shopkeeper{number}', password=password_hash,
+                                         user_role='Staff')
+        loader.add(Shopkeeper, shop_id=shop_id, user_id=seller_ids[shop_id])
+    store_ids = [loader.add(Store, store_name=f'Store {number}', location=f'Location {number}', user_id=admin_id)
+                 for number in range(1, stores + 1)]
+
+    prices = {}  # item id -> (name, cost price, selling price)
+    for number in range(1, items + 1):
+        cost = rng.randint(5, 500) * 100
+        name = f'{rng.choice(["Rice", "Sugar", "Oil", "Soap", "Milk", "Flour", "Tea", "Salt"])} {number}'
+        prices[loader.add(Item, item_name=name, item_cost_price=cost, item_selling_price=cost * 1.25,
+                          date_added=first_day)] = (name, cost, cost * 1.25)
+
+    shop_item_ids = {}  # (shop id, item id) -> shop item id
+    for shop_id in shop_ids:
+        for item_id, (_, cost, _) in prices.items():
+            quantity = rng.choice([0, rng.randint(1, 20), rng.randint(20, 500)])
+            shop_item_ids[shop_id, item_id] = loader.add(
+                ShopItem, shop_id=shop_id, item_id=item_id, item_quantity=quantity, item_value=quantity * cost,
+                item_status='Running Out' if quantity < 20 else 'In Stock', date_added=first_day)
+    for store_id in store_ids:
+        for item_id, (_, cost, _) in prices.items():
+            quantity = rng.randint(0, 2000)
+            loader.add(StoreItem, store_id=store_id, item_id=item_id, item_quantity=quantity,
+                       item_value=quantity * cost, stock_status='Running Out' if quantity < 100 else 'In Stock',
+                       date_added=first_day)
+
+    account_ids = [loader.add(Account, account_name=name, balance=0) for name in PAYMENT_METHODS]
+    balances = dict.fromkeys(account_ids, 0)
+    item_ids = list(prices)
+    for day in range(days):
+        date = first_day + timedelta(days=day)
+        for shop_id in shop_ids:
+            for _ in range(rng.randint(sales_per_day // 2, sales_per_day * 3 // 2)):
+                date_sold = date.replace(hour=rng.randint(8, 19), minute=rng.randint(0, 59))
+                sale_items = []
+                for item_id in rng.sample(item_ids, rng.randint(1, 5)):
+                    name, cost, price = prices[item_id]
+                    quantity = rng.randint(1, 10)
+                    sale_items.append(dict(item_name=name, item_id=item_id, item_quantity=quantity, item_discount=0,
+                                           item_value=quantity * price, item_cost_price=cost,
+                                           item_selling_price=price, shop_id=shop_id, user_id=seller_ids[shop_id]))
+                sales_value = sum(sale_item['item_value'] for sale_item in sale_items)
+                method = rng.randrange(len(PAYMENT_METHODS))
+                sale_id = loader.add(Sale, sales_value=sales_value, sales_discount=0,
+                                     payment_method=PAYMENT_METHODS[method], date_sold=date_sold, shop_id=shop_id,
+                                     credit_option=False, amount_paid=sales_value, user_id=seller_ids[shop_id])
+                for sale_item in sale_items:
+                    loader.add(StockSold, sale_id=sale_id, **sale_item)
+                balances[account_ids[method]] += sales_value
+                loader.add(AccountBalanceLog, account_id=account_ids[method], balance=balances[account_ids[method]],
+                           timestamp=date_sold)
+
+            # A few transfers and the daily count of some items
+            item_id = rng.choice(item_ids)
+            loader.add(StockOut, item_name=prices[item_id][0], item_id=item_id, item_quantity=rng.randint(1, 50),
+                       date_sent=date, shop_id=shop_id, store_id=rng.choice(store_ids),
+                       is_received=day < days - 1)
+            if len(shop_ids) > 1:
+                item_id = rng.choice(item_ids)
+                loader.add(TransferStock, item_name=prices[item_id][0], item_id=item_id,
+                           item_quantity=rng.randint(1, 20), date_sent=date, transfer_from_id=shop_id,
+                           transfer_to_id=rng.choice([other for other in shop_ids if other != shop_id]),
+                           is_received=day < days - 1)
+            for item_id in rng.sample(item_ids, min(20, len(item_ids))):
+                count = rng.randint(0, 500)
+                loader.add(DailyCount, shop_item_id=shop_item_ids[shop_id, item_id], count=count,
+                           base_count=count + rng.choice([0, 0, 0, 1, -1]), shop_id=shop_id,
+                           date=date.replace(hour=20))
+    loader.flush()
+    db.session.execute(Account.__table__.update().where(Account.id == bindparam('b_id'))
+                       .values(balance=bindparam('b_balance')),
+                       [{'b_id': account_id, 'b_balance': balance} for account_id, balance in balances.items()])
+    db.session.commit()
+    loader.counts['daily_shop_summary'] = rebuild_daily_summaries()
+    return loader.counts
+
+
+# The routes measured by the benchmark: name, URL and JSON body for POST requests
+def benchmark_cases(shop_id=1):
+    return [
+        ('home', '/', None),
+        ('stock_sold', f'/{shop_id}/shop', None),
+        ('shop_daily_report', '/shop_daily_report', None),
+        ('download_reports', '/download_reports?download=1&time_range=52&items=1', None),
+        ('view_sales', f'/{shop_id}/view_sales', None),
+        ('get_items', '/get_items', {"item_name": "ri"}),
+    ]
+
+
+# Request every case repeat times as the admin through the test client of the current app, after one request to warm
+# the caches. Returns the median and worst latency in milliseconds, the SQL statements run by a request and the peak
+# memory it allocated in KiB
+def run_benchmarks(cases, repeat=5, username='admin'):
+    statements = [0]
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    user_id = db.session.query(User.id).filter(User.username == username).scalar()
+    if user_id is None:
+        raise ValueError(f"There is no user {username}")
+    client = current_app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+    results = []
+    event.listen(Engine, 'before_cursor_execute', count_statement)
+    try:
+        for name, url, body in cases:
+            request = (lambda: client.post(url, json=body)) if body is not None else (lambda: client.get(url))
+            response = request()
+            if response.status_code >= 400:
+                raise RuntimeError(f"{name}: {url} answered {response.status_code}")
+            timings = []
+            for _ in range(repeat):
+                statements[0] = 0
+                start = time.perf_counter()
+                request()
+                timings.append((time.perf_counter() - start) * 1000)
+            statement_count = statements[0]  # Of the last timed request, before the memory pass runs its own
+            # Memory is measured on a request of its own as tracing allocations slows requests down
+            tracemalloc.start()
+            request()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            timings.sort()
+            results.append({"name": name, "median_ms": timings[len(timings) // 2], "max_ms": timings[-1],
+                            "statements": statement_count, "peak_kib": peak // 1024})
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count_statement)
+    return results
+
+
+# Time each of STARTUP_STEPS in repeat new interpreters, as a gunicorn worker or a test run starts cold. Returns the
+# median and worst time in milliseconds of every step, not counting the start of the interpreter itself
+def measure_startup(repeat=5):
+    results = []
+    for name, code in STARTUP_STEPS:
+        timer = f"import time; start = time.perf_counter(); {code}; print(time.perf_counter() - start)"
+        timings = sorted(float(subprocess.run([sys.executable, "-c", timer], check=True, capture_output=True,
+                                              text=True).stdout.split()[-1]) * 1000 for _ in range(repeat))
+        results.append({"name": name, "median_ms": timings[len(timings) // 2], "max_ms": timings[-1]})
+    return results
@@ -0,0 +1,56 @@
+from inventory import db
+from inventory.models import Item, ShopItem, StockSold
+from inventory.ledger import post_entry, payment_account
+from inventory.events import queue_event
+from inventory.rollups import record_sale, sale_totals
+from inventory.sales_history import sale_summary
+from inventory.stock import remove_stock, InsufficientStock
+from sqlalchemy import update
+
+
+class CheckoutError(Exception):
+    pass
+
+
+# Items in the cart by id, looked up in one query
+def cart_items_lookup(cart_items):
+    item_ids = {cart_item.item_id for cart_item in cart_items}
+    return {item.id: item for item in Item.query.filter(Item.id.in_(item_ids))}
+
+
+# Add the amount paid for a sale to the account of its payment method
+def credit_sale_account(sale):
+    account = payment_account(sale.payment_method)
+    if account:
+        post_entry(f"Sale {sale.id}", {account.id: sale.amount_paid}, {'sales': -sale.amount_paid})
+
+
+# Record a sale of the items in the cart: the shop stock, the sale, the account balance, the cart items and the daily
+# summary are all written in one transaction, with a fixed number of queries whatever the size of the cart. The pages
+# following the shop get the sale once it is committed. Raises CheckoutError, in which case the caller must roll back
+def checkout(sale, cart_items):
+    if not cart_items:
+        raise CheckoutError("The cart is empty.")
+    items = cart_items_lookup(cart_items)
+    quantities = {}  # Quantity sold of every item, by item id
+    for cart_item in cart_items:
+        item = items.get(cart_item.item_id)
+        if item is None:
+            raise CheckoutError(f"{cart_item.item_name} does not exist.")
+        quantities[item.id] = quantities.get(item.id, 0) + cart_item.item_quantity
+    costs = {item.id: item.item_cost_price for item in items.values()}
+    try:
+        remove_stock(ShopItem, sale.shop_id, quantities, costs)
+    except InsufficientStock as error:
+        item_names = {item.id: item.item_name for item in items.values()}
+        raise CheckoutError(f"No enough quantity of {item_names.get(error.item_id, 'an item')} in stock.")
+
+    db.session.add(sale)
+    db.session.flush()
+    credit_sale_account(sale)
+    db.session.execute(update(StockSold).where(StockSold.id.in_([cart_item.id for cart_item in cart_items]))
+                       .values(sale_id=sale.id).execution_options(synchronize_session=False))
+    record_sale(sale, cart_items)
+    queue_event('sale', dict(sale_summary(sale, sale_totals(sale, cart_items)[1]), shop_id=sale.shop_id), sale.shop_id)
+    db.session.commit()
+    return sale
@@ -0,0 +1,126 @@
+import click
+from inventory import db
+from inventory.models import (User, ShopItem, StoreItem, Item, StockSold, StockReceived, StockIn, StockOut,
+                              TransferStock, StoreStockTransfer, TrashLog, PriceLog)
+from inventory.rollups import rebuild_daily_summaries
+from inventory.benchmark import generate_fixtures, benchmark_cases, run_benchmarks, measure_startup
+from flask import Blueprint
+from sqlalchemy import func, inspect, select, text, update
+
+bp = Blueprint('commands', __name__, cli_group=None)
+
+
+# Backfill or repair the daily shop summaries, e.g. `flask rebuild-daily-summary --since 2024-01-01`
+@bp.cli.command('rebuild-daily-summary')
+@click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Only rebuild the summaries from this date (YYYY-MM-DD). Rebuilds everything by default.')
+def rebuild_daily_summary(since):
+    count = rebuild_daily_summaries(since.date() if since else None)
+    click.echo(f"Rebuilt {count} daily shop summaries")
+
+
+# Names of the indexes of a table. SQLAlchemy does not reflect expression indexes on SQLite, which lists them all
+def index_names(connection, table):
+    if connection.dialect.name == 'sqlite':
+        return set(connection.scalars(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+                                      {'table': table}))
+    return {index['name'] for index in inspect(connection).get_indexes(table)}
+
+
+# Columns declared on the models that the tables of an existing database do not have, as (table, column) pairs
+def missing_columns(connection):
+    inspector = inspect(connection)
+    existing = {table: {column['name'] for column in inspector.get_columns(table)}
+                for table in inspector.get_table_names()}
+    return [(table.name, column.name) for table in db.metadata.sorted_tables if table.name in existing
+            for column in table.columns if column.name not in existing[table.name]]
+
+
+# Create the indexes declared on the models that an existing database does not have yet, e.g. `flask create-indexes`.
+# The repository keeps no migration history: every deployment generates its own with `flask db migrate`, databases
+# made with db.create_all() have none to upgrade, and autogenerate skips expression indexes such as the daily summary
+# key, so the indexes are created here. The columns must be there first, and the stock of an item must be on a single
+# row per shop and store before their unique indexes can be created
+@bp.cli.command('create-indexes')
+def create_indexes():
+    with db.engine.connect() as connection:
+        columns = missing_columns(connection)
+    if columns:
+        for table, column in columns:
+            click.echo(f"{table}.{column} is missing")
+        raise click.ClickException("Add the missing columns with `flask db migrate` and `flask db upgrade` first")
+
+    duplicates = []
+    for model, location in ((ShopItem, ShopItem.shop_id), (StoreItem, StoreItem.store_id)):
+        duplicates += [(model.__tablename__, location_id, item_id) for location_id, item_id, _ in
+                       db.session.query(location, model.item_id, func.count(model.id))
+                       .group_by(location, model.item_id).having(func.count(model.id) > 1)]
+    if duplicates:
+        for table, location_id, item_id in duplicates:
+            click.echo(f"{table}: item {item_id} has more than one row at location {location_id}")
+        raise click.ClickException("Merge the duplicate stock rows before creating the indexes")
+
+    created = 0
+    with db.engine.begin() as connection:
+        existing = {table: index_names(connection, table) for table in inspect(connection).get_table_names()}
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                if table.name in existing and index.name not in existing[table.name]:
+                    index.create(connection)
+                    click.echo(f"Created {index.name}")
+                    created += 1
+    click.echo(f"Created {created} indexes")
+
+
+# Fill in the item of stock movements recorded before they referenced items by id, e.g. `flask backfill-item-ids`.
+# Rows are matched to the item with the same name; rows whose item has been renamed since are listed so they can be
+# fixed by hand
+@bp.cli.command('backfill-item-ids')
+def backfill_item_ids():
+    for model in (StockSold, StockReceived, StockIn, StockOut, TransferStock, StoreStockTransfer, TrashLog, PriceLog):
+        item_id = select(func.min(Item.id)).where(Item.item_name == model.item_name).scalar_subquery()
+        result = db.session.execute(update(model).where(model.item_id.is_(None)).values(item_id=item_id)
+                                    .execution_options(synchronize_session=False))
+        db.session.commit()
+        missing = db.session.query(func.count(model.id)).filter(model.item_id.is_(None)).scalar()
+        click.echo(f"{model.__tablename__}: {result.rowcount - missing} rows backfilled, {missing} without a matching item")
+
+
+# Fill an empty database with generated data to benchmark against, e.g. `flask generate-fixtures --days 730` with
+# SQLALCHEMY_DATABASE_URI pointing at a new SQLite database
+@bp.cli.command('generate-fixtures')
+@click.option('--shops', default=5, show_default=True)
+@click.option('--stores', default=2, show_default=True)
+@click.option('--items', default=2000, show_default=True)
+@click.option('--days', default=365, show_default=True, help='Days of sales, counts and transfers.')
+@click.option('--sales-per-day', default=40, show_default=True, help='Average sales per shop per day.')
+@click.option('--seed', default=0, show_default=True)
+def generate_fixtures_command(shops, stores, items, days, sales_per_day, seed):
+    db.create_all()
+    if db.session.query(Item.id).first() or db.session.query(User.id).first():
+        raise click.ClickException("The database already has data, generate the fixtures into an empty database")
+    counts = generate_fixtures(shops, stores, items, days, sales_per_day, seed)
+    for table, count in counts.items():
+        click.echo(f"{table}: {count} rows")
+    click.echo("Users admin and shopkeeper1... have the password 'benchmark'")
+
+
+# Time the hot routes against the current database, e.g. after `flask generate-fixtures`: `flask benchmark`
+@bp.cli.command('benchmark')
+@click.option('--repeat', default=5, show_default=True, help='Timed requests per route.')
+@click.option('--route', 'routes', multiple=True, help='Only benchmark these routes, e.g. --route home.')
+def benchmark_command(repeat, routes):
+    cases = [case for case in benchmark_cases() if not routes or case[0] in routes]
+    click.echo(f"{'route':<20}{'median ms':>12}{'max ms':>12}{'statements':>12}{'peak KiB':>12}")
+    for result in run_benchmarks(cases, repeat):
+        click.echo(f"{result['name']:<20}{result['median_ms']:>12.1f}{result['max_ms']:>12.1f}"
+                   f"{result['statements']:>12}{result['peak_kib']:>12}")
+
+
+# Time how long a new process takes to import the package and build the app, e.g. `flask benchmark-startup`
+@bp.cli.command('benchmark-startup')
+@click.option('--repeat', default=5, show_default=True, help='New processes started per step.')
+def benchmark_startup_command(repeat):
+    click.echo(f"{'step':<20}{'median ms':>12}{'max ms':>12}")
+    for result in measure_startup(repeat):
+        click.echo(f"{result['name']:<20}{result['median_ms']:>12.1f}{result['max_ms']:>12.1f}")
@@ -1,21 +1,54 @@
 import os
 import json
 
-# # # Production
-with open("/etc/config.json") as config_file:
+# Settings are read from the environment first, then from the JSON file named by INVENTORY_CONFIG (/etc/config.json
+# by default) when it exists, e.g. `SQLALCHEMY_DATABASE_URI=sqlite:///site.db flask run` needs no file at all
+CONFIG_FILE = os.environ.get("INVENTORY_CONFIG", "/etc/config.json")
+
+config = {}
+if os.path.exists(CONFIG_FILE):
+    with open(CONFIG_FILE) as config_file:
         config = json.load(config_file)
 
 
-class Config:
-    SECRET_KEY = config.get("SECRET_KEY")
-    # SQLALCHEMY_DATABASE_URI = 'sqlite:///site.db'
-    SQLALCHEMY_DATABASE_URI = config.get("SQLALCHEMY_DATABASE_URI")
-    URL = 'http://www.asirtrading.com'
+# A setting from the environment, converted to the type of its default, else from the config file, else the default
+def setting(name, default=None):
+    value = os.environ.get(name)
+    if value is None:
+        return config.get(name, default)
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
 
 
-# # Development
-# class Config:
-#     SECRET_KEY = os.environ.get("SECRET_KEY")
-#     # SQLALCHEMY_DATABASE_URI = 'sqlite:///site.db'
-#     SQLALCHEMY_DATABASE_URI = os.environ.get("INVENTORY_SQLALCHEMY_DATABASE_URI")
-#     URL = 'http://127.0.0.1:5000'
+class Config:
+    SECRET_KEY = setting("SECRET_KEY")
+    # SQLALCHEMY_DATABASE_URI = 'sqlite:///site.db'
+    SQLALCHEMY_DATABASE_URI = setting("SQLALCHEMY_DATABASE_URI")
+    URL = setting("URL", 'http://www.asirtrading.com')
+    JOB_WORKERS = setting("JOB_WORKERS", 2)  # Number of reports generated at the same time
+    JOB_RESULT_TTL = setting("JOB_RESULT_TTL", 3600)  # Seconds a finished report is kept for download
+    JOB_ABANDON_TIMEOUT = setting("JOB_ABANDON_TIMEOUT", 1800)  # Seconds a report may wait or run before it is failed
+    SEARCH_RESULT_LIMIT = setting("SEARCH_RESULT_LIMIT", 50)  # Maximum number of item search suggestions
+    SEARCH_INDEX_TTL = setting("SEARCH_INDEX_TTL", 60)  # Seconds before the item name index is rebuilt
+    STOCK_SNAPSHOT_TTL = setting("STOCK_SNAPSHOT_TTL", 30)  # Seconds before stock availability is reloaded
+    STOCK_VALUATION_TTL = setting("STOCK_VALUATION_TTL", 60)  # Seconds before stock totals per location are reloaded
+    PAGE_CACHE_TTL = setting("PAGE_CACHE_TTL", 30)  # Seconds a rendered admin page is served from memory at most
+    PAGE_CACHE_SIZE = setting("PAGE_CACHE_SIZE", 256)  # Rendered pages kept in memory
+    SALES_PAGE_SIZE = setting("SALES_PAGE_SIZE", 50)  # Sales loaded at a time in the shop sales history
+    ACCOUNT_HISTORY_DAYS = setting("ACCOUNT_HISTORY_DAYS", 14)  # Days of closing balances shown per accounts page
+    QUERY_BUDGET = setting("QUERY_BUDGET", 40)  # SQL statements a request may run before it is reported
+    QUERY_REPEAT_LIMIT = setting("QUERY_REPEAT_LIMIT", 10)  # Times a request may run the same statement
+    QUERY_BUDGET_RAISE = setting("QUERY_BUDGET_RAISE", False)  # Raise instead of logging (always on in debug)
+    IDENTITY_CACHE_TTL = setting("IDENTITY_CACHE_TTL", 300)  # Seconds a logged in user is kept in memory
+    LIVE_EVENTS_ENABLED = setting("LIVE_EVENTS_ENABLED", False)  # Live updates on the dashboard, needs threaded workers
+    EVENT_STREAM_HEARTBEAT = setting("EVENT_STREAM_HEARTBEAT", 15)  # Seconds between keep-alives on live update streams
+    EVENT_STREAM_DURATION = setting("EVENT_STREAM_DURATION", 300)  # Seconds before a live update stream reconnects
+    METRICS_ENABLED = setting("METRICS_ENABLED", False)  # Record request and SQL timings for /metrics
+    METRICS_TOKEN = setting("METRICS_TOKEN")  # Bearer token a scraper can read /metrics with, admins always can
+    SLOW_QUERY_MS = setting("SLOW_QUERY_MS", 200)  # SQL statements at least this slow are listed as slow queries
+    SLOW_QUERY_LOG_SIZE = setting("SLOW_QUERY_LOG_SIZE", 100)  # Slow queries kept in memory
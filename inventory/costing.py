@@ -0,0 +1,46 @@
+from inventory import db
+from inventory.models import StoreItem, ShopItem, TransferStock, StockOut, StoreStockTransfer
+from inventory.stock import add_stock
+from sqlalchemy import select, func, update
+
+
+# Quantity of an item across the business: in every store and shop, plus what has been sent between locations and not
+# received yet, in a single query
+def item_stock_quantity(item):
+    def total(column, *conditions):
+        return func.coalesce(select(func.sum(column)).where(*conditions).scalar_subquery(), 0)
+
+    in_transit = [total(model.item_quantity, model.item_id == item.id, model.is_received == False)
+                  for model in (TransferStock, StockOut, StoreStockTransfer)]
+    quantity = total(StoreItem.item_quantity, StoreItem.item_id == item.id) \
+        + total(ShopItem.item_quantity, ShopItem.item_id == item.id)
+    for transit_quantity in in_transit:
+        quantity = quantity + transit_quantity
+    return db.session.execute(select(quantity)).scalar()
+
+
+def weighted_average_cost(old_cost, old_quantity, new_cost, new_quantity):
+    old_quantity = max(old_quantity, 0)
+    total_quantity = old_quantity + new_quantity
+    if total_quantity <= 0:
+        return new_cost
+    return (old_cost * old_quantity + new_cost * new_quantity) / total_quantity
+
+
+# Revalue the stock of an item in every store and shop at its cost price, one UPDATE per table
+def revalue_item_stock(item_id, cost):
+    for model in (StoreItem, ShopItem):
+        db.session.execute(update(model).where(model.item_id == item_id)
+                           .values(item_value=model.item_quantity * cost)
+                           .execution_options(synchronize_session=False))
+
+
+# Receive a delivery of an item into a store. The item's cost price becomes the average of the stock already held,
+# at the old cost, and the delivery, at its unit cost, and all the stock of the item is revalued at the new cost.
+# The item row is locked so two deliveries of the same item cannot average from the same old cost
+def receive_delivery(store_id, item, quantity, unit_cost):
+    db.session.refresh(item, with_for_update=True)
+    stock_quantity = item_stock_quantity(item)
+    item.item_cost_price = weighted_average_cost(item.item_cost_price, stock_quantity, unit_cost, quantity)
+    add_stock(StoreItem, store_id, item.id, quantity, item.item_cost_price, running_out_below=100)
+    revalue_item_stock(item.id, item.item_cost_price)
@@ -0,0 +1,68 @@
+from inventory import db
+from inventory.models import ShopItem, DailyCount
+from sqlalchemy import insert
+from datetime import datetime
+import re
+
+
+def parse_count(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not re.fullmatch(r"-?[0-9]+", value):
+            return None
+    elif not isinstance(value, int):
+        return None
+    return int(value)
+
+
+# Check every row of a submitted daily count. Returns the rows to insert and a list of errors, one per bad row with
+# its position in the payload, so the shopkeeper can fix them all at once
+def validate_daily_count(shop_id, daily_count_data):
+    if not isinstance(daily_count_data, list):
+        return [], [{"row": None, "error": "The daily count must be a list of items."}]
+
+    errors = []
+    counts = {}  # Count by shop item id
+    for row, item_data in enumerate(daily_count_data):
+        if not isinstance(item_data, dict):
+            errors.append({"row": row, "error": "Invalid row."})
+            continue
+        item_id = parse_count(item_data.get("item_id"))
+        count = parse_count(item_data.get("count"))
+        if item_id is None:
+            errors.append({"row": row, "item_id": item_data.get("item_id"), "error": "Invalid item."})
+        elif count is None or count < 0:
+            errors.append({"row": row, "item_id": item_id, "error": "The count must be a whole number of 0 or more."})
+        elif item_id in counts:
+            errors.append({"row": row, "item_id": item_id, "error": "The item is counted more than once."})
+        else:
+            counts[item_id] = (row, count)
+
+    shop_items = {}
+    if counts:
+        shop_items = dict(db.session.query(ShopItem.id, ShopItem.item_quantity)
+                          .filter(ShopItem.shop_id == shop_id, ShopItem.id.in_(counts)))
+    date = datetime.now()
+    rows = []
+    for item_id, (row, count) in counts.items():
+        if item_id not in shop_items:
+            errors.append({"row": row, "item_id": item_id, "error": "The item is not in this shop."})
+        else:
+            rows.append({"shop_item_id": item_id, "count": count, "shop_id": shop_id,
+                         "base_count": shop_items[item_id], "date": date})
+    errors.sort(key=lambda error: -1 if error["row"] is None else error["row"])
+    return rows, errors
+
+
+# Save a whole daily count with one query to load the shop items and one bulk insert, in a single transaction.
+# Nothing is saved if any row is invalid. Returns the validation errors
+def save_daily_count_data(shop_id, daily_count_data):
+    rows, errors = validate_daily_count(shop_id, daily_count_data)
+    if errors:
+        return errors
+    if rows:
+        db.session.execute(insert(DailyCount), rows)
+    db.session.commit()
+    return []
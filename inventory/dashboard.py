@@ -0,0 +1,59 @@
+from inventory import db
+from inventory.models import Shop, ShopItem, StoreItem, Sale, StockSold
+from datetime import datetime, timedelta
+from sqlalchemy import func, and_
+
+
+def day_bounds(day):
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+# Totals shown on the dashboard cards: stock values and today's sales and discounts, in a single round trip
+def dashboard_totals(day):
+    start, end = day_bounds(day)
+    todays_sales = and_(Sale.date_sold >= start, Sale.date_sold < end)
+    shop_stock = db.session.query(func.coalesce(func.sum(ShopItem.item_value), 0)).scalar_subquery()
+    store_stock = db.session.query(func.coalesce(func.sum(StoreItem.item_value), 0)).scalar_subquery()
+    sales_value = db.session.query(func.coalesce(func.sum(Sale.sales_value), 0)).filter(todays_sales) \
+        .scalar_subquery()
+    sales_discount = db.session.query(func.coalesce(func.sum(Sale.sales_discount), 0)).filter(todays_sales) \
+        .scalar_subquery()
+    items_discount = db.session.query(func.coalesce(func.sum(StockSold.item_discount * StockSold.item_quantity), 0)) \
+        .join(Sale, StockSold.sale_id == Sale.id).filter(todays_sales, StockSold.item_discount > 0) \
+        .scalar_subquery()
+    row = db.session.query(shop_stock, store_stock, sales_value, sales_discount, items_discount).one()
+    return {
+        'total_stock_value': row[0],
+        'total_store_stock': row[1],
+        'total_sales_value': row[2],
+        'total_discount': row[3] + row[4],
+    }
+
+
+# Most sold items of all time by quantity
+def top_items_sold(limit=5):
+    quantity = func.sum(StockSold.item_quantity)
+    rows = db.session.query(StockSold.item_name, quantity).group_by(StockSold.item_name) \
+        .order_by(quantity.desc(), StockSold.item_name).limit(limit).all()
+    return {item_name: total for item_name, total in rows}
+
+
+# Quantity of items sold by every shop since `since`, shops without sales included with 0
+def shop_quantities_sold(since):
+    quantity = func.coalesce(func.sum(StockSold.item_quantity), 0)
+    rows = db.session.query(Shop.shop_name, quantity) \
+        .outerjoin(Sale, and_(Sale.shop_id == Shop.id, Sale.date_sold >= since)) \
+        .outerjoin(StockSold, StockSold.sale_id == Sale.id) \
+        .group_by(Shop.id, Shop.shop_name).order_by(Shop.id).all()
+    shop_sales_lookup = {shop_name: total for shop_name, total in rows}
+    return dict(sorted(shop_sales_lookup.items(), key=lambda x: x[1], reverse=True))
+
+
+# Everything the admin dashboard needs. The number of queries does not depend on the number of shops or sales
+def dashboard_metrics():
+    now = datetime.now()
+    metrics = dashboard_totals(now.date())
+    metrics['top_5_items_sold'] = top_items_sold(5)
+    metrics['sorted_total_shop_sales_lookup'] = shop_quantities_sold(now - timedelta(days=7))
+    return metrics
@@ -0,0 +1,116 @@
+from inventory import db
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from collections import deque
+import json
+import queue
+import threading
+import time
+import uuid
+
+HISTORY_SIZE = 500  # Recent events kept so a page that reconnects gets the ones it missed
+QUEUE_SIZE = 200  # Events waiting for a slow page before it is told to reload instead
+
+
+# Sales and stock changes committed in this process, passed on to the pages following them as server-sent events.
+# Event ids are the position in the bus prefixed with a token of the bus, so a page reconnecting to another worker
+# process or after a restart knows it cannot catch up and reloads
+class EventBus:
+    def __init__(self, history_size=HISTORY_SIZE, queue_size=QUEUE_SIZE):
+        self.token = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.history = deque(maxlen=history_size)  # (id, kind, data, shop id)
+        self.last_id = 0
+
+    def position(self):
+        return f"{self.token}-{self.last_id}"
+
+    def publish(self, kind, data, shop_id=None):
+        with self.lock:
+            self.last_id += 1
+            entry = (self.last_id, kind, data, shop_id)
+            self.history.append(entry)
+            for subscriber in list(self.subscribers):
+                if subscriber.qsize() >= self.queue_size:
+                    self.subscribers.discard(subscriber)
+                    subscriber.put(None)  # Dropped, the page has to reload
+                else:
+                    subscriber.put(entry)
+
+    # A queue receiving every event published from now on, and the events published after the position last_event_id,
+    # None if they are not all known any more
+    def subscribe(self, last_event_id=None):
+        subscriber = queue.Queue()
+        with self.lock:
+            missed = []
+            if last_event_id:
+                token, _, position = last_event_id.partition('-')
+                oldest = self.history[0][0] if self.history else self.last_id + 1
+                if token != self.token or not position.isdigit() or int(position) > self.last_id \
+                        or int(position) + 1 < oldest:
+                    missed = None
+                else:
+                    missed = [entry for entry in self.history if entry[0] > int(position)]
+            self.subscribers.add(subscriber)
+        return subscriber, missed
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+
+bus = EventBus()
+
+
+# Publish an event once the transaction it belongs to is committed, so pages never show a sale that was rolled back.
+# shop_id is the shop the event is about: staff only get the events of their shops, admins get every event
+def queue_event(kind, data, shop_id=None):
+    db.session.info.setdefault('pending_events', []).append((kind, data, shop_id))
+
+
+@event.listens_for(Session, 'after_commit')
+def publish_committed_events(session):
+    for kind, data, shop_id in session.info.pop('pending_events', []):
+        bus.publish(kind, data, shop_id)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def forget_rolled_back_events(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('pending_events', None)
+
+
+def format_event(event_id, kind, data):
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+
+
+# The server-sent events for a page following the events after last_event_id, limited to shop_ids unless it is None.
+# A comment is sent every heartbeat seconds to keep the connection open, and the stream ends after duration seconds
+# so the browser reconnects, catching up from the last event it got
+def event_stream(last_event_id=None, shop_ids=None, heartbeat=15, duration=300):
+    subscriber, missed = bus.subscribe(last_event_id)
+    try:
+        yield "retry: 3000\n\n"
+        if missed is None:
+            yield format_event(bus.position(), 'reload', {})
+            return
+        for position, kind, data, shop_id in missed:
+            if shop_ids is None or shop_id in shop_ids:
+                yield format_event(f"{bus.token}-{position}", kind, data)
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            try:
+                entry = subscriber.get(timeout=min(heartbeat, max(deadline - time.monotonic(), 0.01)))
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if entry is None:
+                yield format_event(bus.position(), 'reload', {})
+                return
+            position, kind, data, shop_id = entry
+            if shop_ids is None or shop_id in shop_ids:
+                yield format_event(f"{bus.token}-{position}", kind, data)
+    finally:
+        bus.unsubscribe(subscriber)
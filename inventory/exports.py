@@ -0,0 +1,95 @@
+from inventory import db
+from inventory.models import Shop, Sale, StockSold, DailyShopSummary
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from io import BytesIO
+
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Preset report periods offered on the reports page
+report_ranges = {
+    '30': timedelta(days=30),  # 30 days
+    '13': timedelta(weeks=13),  # 3 months
+    '26': timedelta(weeks=26),  # 6 months
+    '52': timedelta(weeks=52),  # 1 year
+}
+
+
+# Start and end date of a report from the request arguments, either a preset time_range or start_date and end_date
+def report_period(args):
+    end_date = datetime.now().date()
+    time_range = args.get('time_range')
+    if time_range:
+        if time_range not in report_ranges:
+            raise ValueError("Range does not exist")
+        return end_date - report_ranges[time_range], end_date
+    start_date = datetime.strptime(args.get('start_date', ''), "%Y-%m-%d").date()
+    end_date = datetime.strptime(args.get('end_date', ''), "%Y-%m-%d").date()
+    return start_date, end_date
+
+
+# Monthly totals per shop between two dates (inclusive), read from the daily summaries in one query
+def monthly_shop_totals(start_date, end_date):
+    year = func.extract('year', DailyShopSummary.date)
+    month = func.extract('month', DailyShopSummary.date)
+    return db.session.query(year, month, Shop.shop_name, func.sum(DailyShopSummary.sales_value),
+                            func.sum(DailyShopSummary.sales_cost), func.sum(DailyShopSummary.sales_discount)) \
+        .join(Shop, DailyShopSummary.shop_id == Shop.id) \
+        .filter(DailyShopSummary.date >= start_date, DailyShopSummary.date <= end_date) \
+        .group_by(year, month, Shop.shop_name).order_by(year, month, Shop.shop_name).all()
+
+
+# Quantity, value, cost and discount of every item sold per shop between two dates (inclusive)
+def item_totals(start_date, end_date):
+    end = datetime.combine(end_date, datetime.min.time()) + timedelta(days=1)
+    return db.session.query(Shop.shop_name, StockSold.item_name, func.sum(StockSold.item_quantity),
+                            func.sum(StockSold.item_value),
+                            func.sum(StockSold.item_quantity * StockSold.item_cost_price),
+                            func.sum(StockSold.item_discount * StockSold.item_quantity)) \
+        .join(Sale, StockSold.sale_id == Sale.id).join(Shop, Sale.shop_id == Shop.id) \
+        .filter(Sale.date_sold >= start_date, Sale.date_sold < end) \
+        .group_by(Shop.shop_name, StockSold.item_name).order_by(Shop.shop_name, StockSold.item_name).all()
+
+
+# Build the sales report workbook in memory. Rows are written in order so XlsxWriter can flush them as it goes
+# (constant_memory), and nothing is written to a shared file. XlsxWriter is only imported once a report is built
+def build_sales_report(start_date, end_date, include_items=False):
+    import xlsxwriter
+
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    header_format = workbook.add_format({'bold': True})
+    bold_right_format = workbook.add_format({'bold': True, 'align': 'right'})
+
+    worksheet = workbook.add_worksheet('Shops')
+    worksheet.set_column(0, 0, 16)
+    worksheet.set_column(1, 1, 20)
+    worksheet.set_column(2, 5, 15)
+    headers = ['Month', 'Shop Name', 'Total Sales', 'Total Cost', 'Total Discount', 'Total Profit']
+    worksheet.write_row(0, 0, headers, header_format)
+
+    row = 1
+    total_profit = 0
+    for year, month, shop_name, sales, cost, discount in monthly_shop_totals(start_date, end_date):
+        month_name = datetime(int(year), int(month), 1).strftime("%B %Y")
+        worksheet.write_row(row, 0, [month_name, shop_name, sales, cost, discount, sales - cost])
+        total_profit += sales - cost
+        row += 1
+    worksheet.merge_range(row, 0, row, 4, 'Total Profit for all shops', bold_right_format)
+    worksheet.write(row, 5, total_profit, bold_right_format)
+
+    if include_items:
+        worksheet = workbook.add_worksheet('Items')
+        worksheet.set_column(0, 1, 20)
+        worksheet.set_column(2, 6, 15)
+        headers = ['Shop Name', 'Item Name', 'Quantity', 'Total Sales', 'Total Cost', 'Total Discount',
+                   'Total Profit']
+        worksheet.write_row(0, 0, headers, header_format)
+        for row, (shop_name, item_name, quantity, sales, cost, discount) in \
+                enumerate(item_totals(start_date, end_date), start=1):
+            worksheet.write_row(row, 0, [shop_name, item_name, quantity, sales, cost, discount, sales - cost])
+
+    workbook.close()
+    output.seek(0)
+    return output
@@ -0,0 +1,55 @@
+from inventory import db, login_manager
+from inventory.models import User, Shopkeeper
+from flask import current_app
+from flask_login import UserMixin
+import threading
+import time
+
+
+# What a request needs to know about the logged in user, kept in memory so that authenticated requests do not have
+# to load the user from the database. Not a database row: views that need the User itself must query it
+class CachedUser(UserMixin):
+    def __init__(self, user_id, username, user_role, shop_ids):
+        self.id = user_id
+        self.username = username
+        self.user_role = user_role
+        self.shop_ids = shop_ids  # Shops the user is a shopkeeper of, in the order they were assigned
+
+
+_users = {}  # user id -> (time loaded, CachedUser)
+_lock = threading.Lock()
+
+
+def load_identity(user_id):
+    user = db.session.query(User.id, User.username, User.user_role).filter(User.id == user_id).first()
+    if user is None:
+        return None
+    shop_ids = [shop_id for (shop_id,) in db.session.query(Shopkeeper.shop_id)
+                .filter(Shopkeeper.user_id == user_id).order_by(Shopkeeper.id)]
+    return CachedUser(user.id, user.username, user.user_role, shop_ids)
+
+
+# The user with their role and shops, from memory if they were loaded less than IDENTITY_CACHE_TTL seconds ago.
+# Changes made by other worker processes are seen once the entry expires
+def get_identity(user_id):
+    entry = _users.get(user_id)
+    if entry and time.monotonic() - entry[0] < current_app.config['IDENTITY_CACHE_TTL']:
+        return entry[1]
+    identity = load_identity(user_id)
+    with _lock:
+        if identity is None:
+            _users.pop(user_id, None)
+        else:
+            _users[user_id] = (time.monotonic(), identity)
+    return identity
+
+
+# Called when a user's details or shops change so their next request loads them again
+def forget_identity(user_id):
+    with _lock:
+        _users.pop(user_id, None)
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return get_identity(int(user_id))
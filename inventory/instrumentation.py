@@ -0,0 +1,59 @@
+from flask import current_app, g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from collections import Counter
+from functools import wraps
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+# Give a view its own statement budget, for pages that are known to need more than QUERY_BUDGET
+def query_budget(limit):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return view(*args, **kwargs)
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'sql_statements' in g:
+        g.sql_statements[statement] += 1
+
+
+def start_counting_statements():
+    g.sql_statements = Counter()
+
+
+# Report requests that ran more statements than their budget, or ran the same statement over and over, which is how
+# a lazy relationship loaded in a loop shows up. Only logged in production; raised in debug and tests so they get fixed
+def check_statement_count(response):
+    statements = g.pop('sql_statements', None)
+    if not statements:
+        return response
+    view = current_app.view_functions.get(request.endpoint)
+    budget = getattr(view, 'query_budget', current_app.config['QUERY_BUDGET'])
+    total = sum(statements.values())
+    statement, repeats = statements.most_common(1)[0]
+
+    problems = []
+    if total > budget:
+        problems.append(f"{total} SQL statements, budget is {budget}")
+    if repeats > current_app.config['QUERY_REPEAT_LIMIT']:
+        problems.append(f"statement repeated {repeats} times: {statement}")
+    if problems:
+        message = f"{request.method} {request.path}: " + "; ".join(problems)
+        if current_app.config['QUERY_BUDGET_RAISE'] or current_app.debug or current_app.testing:
+            raise QueryBudgetExceeded(message)
+        current_app.logger.warning(message)
+    return response
+
+
+def init_app(app):
+    app.before_request(start_counting_statements)
+    app.after_request(check_statement_count)
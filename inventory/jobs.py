@@ -0,0 +1,122 @@
+from inventory import db
+from inventory.models import Job
+from inventory.exports import build_sales_report, XLSX_MIMETYPE
+from flask import current_app
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+import threading
+import json
+import uuid
+
+
+# Functions that can run as background jobs. Each one takes the job params as keyword arguments and returns
+# (filename, mimetype, data)
+job_types = {}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def job_type(kind):
+    def register(func):
+        job_types[kind] = func
+        return func
+    return register
+
+
+@job_type('sales_report')
+def sales_report_job(start_date, end_date, include_items=False):
+    start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+    report = build_sales_report(start_date, end_date, include_items=include_items)
+    return f'Shop_Reports_{start_date}_{end_date}.xlsx', XLSX_MIMETYPE, report.getvalue()
+
+
+# The pool is created on first use so that every worker process gets its own threads
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=current_app.config['JOB_WORKERS'],
+                                           thread_name_prefix='inventory-job')
+        return _executor
+
+
+UNFINISHED = ('Pending', 'Running')
+ABANDONED_ERROR = "The job was interrupted, please try again"
+
+
+def job_expiry():
+    return datetime.now() - timedelta(seconds=current_app.config['JOB_RESULT_TTL'])
+
+
+# Jobs lost by a worker that stopped or crashed: still waiting JOB_ABANDON_TIMEOUT seconds after they were submitted,
+# or still running that long after they started
+def abandoned_jobs():
+    cutoff = datetime.now() - timedelta(seconds=current_app.config['JOB_ABANDON_TIMEOUT'])
+    return or_(and_(Job.status == 'Pending', Job.date_created < cutoff),
+               and_(Job.status == 'Running', Job.date_started < cutoff))
+
+
+def fail_abandoned(*criteria):
+    return Job.query.filter(abandoned_jobs(), *criteria) \
+        .update({'status': 'Failed', 'error': ABANDONED_ERROR, 'date_finished': datetime.now()},
+                synchronize_session=False)
+
+
+# Mark a job as failed if it was abandoned, so the status page stops waiting for it and it is deleted like other
+# finished jobs
+def fail_abandoned_job(job):
+    if job.status in UNFINISHED and fail_abandoned(Job.id == job.id):
+        db.session.commit()
+    return job
+
+
+# Fail abandoned jobs and delete finished jobs whose results are older than JOB_RESULT_TTL seconds
+def evict_expired_jobs():
+    fail_abandoned()
+    Job.query.filter(Job.date_finished < job_expiry()).delete(synchronize_session=False)
+    db.session.commit()
+
+
+# Record a job and queue it. Returns the job so the caller can hand its id to the user
+def submit_job(kind, params, user_id=None):
+    if kind not in job_types:
+        raise ValueError(f"Unknown job type: {kind}")
+    evict_expired_jobs()
+    job = Job(id=uuid.uuid4().hex, kind=kind, params=json.dumps(params), user_id=user_id)
+    db.session.add(job)
+    db.session.commit()
+    get_executor().submit(run_job, current_app._get_current_object(), job.id)
+    return job
+
+
+# Set the outcome of a job. Only a running job is finished: one failed as abandoned in the meantime stays failed, and
+# may already have been deleted
+def finish_job(job_id, status, **values):
+    finished = Job.query.filter(Job.id == job_id, Job.status == 'Running') \
+        .update(dict(values, status=status, date_finished=datetime.now()), synchronize_session=False)
+    db.session.commit()
+    return finished == 1
+
+
+def run_job(app, job_id):
+    with app.app_context():
+        started = Job.query.filter(Job.id == job_id, Job.status == 'Pending') \
+            .update({'status': 'Running', 'date_started': datetime.now()}, synchronize_session=False)
+        db.session.commit()
+        if not started:
+            return  # Failed as abandoned while it was waiting
+        job = db.session.get(Job, job_id)
+        kind, params = job.kind, json.loads(job.params)
+        try:
+            filename, mimetype, result = job_types[kind](**params)
+        except Exception as error:
+            db.session.rollback()
+            app.logger.exception("Job %s (%s) failed", job_id, kind)
+            finished = finish_job(job_id, 'Failed', error=str(error)[:255])
+        else:
+            finished = finish_job(job_id, 'Done', filename=filename, mimetype=mimetype, result=result)
+        if not finished:
+            app.logger.warning("Job %s (%s) finished after it was failed as abandoned", job_id, kind)
@@ -0,0 +1,77 @@
+from inventory import db
+from inventory.models import Account, AccountBalanceLog, JournalEntry, JournalLine
+from sqlalchemy import bindparam, func, or_
+import math
+
+
+class LedgerError(Exception):
+    pass
+
+
+class InsufficientFunds(LedgerError):
+    def __init__(self, account_name):
+        super().__init__(f"No enough balance in the {account_name or 'selected'} account")
+        self.account_name = account_name
+
+
+# The account money paid with a payment method goes to, None if there is no account for it
+def payment_account(payment_method):
+    return Account.query.filter(func.lower(Account.account_name) == payment_method.lower()).first()
+
+
+# Record a movement of money as one journal entry. accounts holds the amount put into (positive) or taken out of
+# (negative) accounts by account id, categories the same for the sides of the movement that are not accounts, e.g.
+# {'expenses': 500} for money spent, and both together must add up to zero. The account rows are locked in id order
+# and their balances changed by SQL increments, so concurrent entries cannot overwrite each other's balances. With
+# funded, money can only be taken out of an account that holds it. Nothing is committed: the caller commits the entry
+# with the rest of its changes, or rolls back on LedgerError
+def post_entry(description, accounts, categories=None, funded=False):
+    accounts = {account_id: amount for account_id, amount in accounts.items() if amount}
+    categories = {category: amount for category, amount in (categories or {}).items() if amount}
+    if not math.isclose(sum(accounts.values()) + sum(categories.values()), 0, abs_tol=1e-6):
+        raise LedgerError(f"The journal entry '{description}' does not balance.")
+    if not accounts and not categories:
+        return None
+
+    locked = {account_id: (account_name, balance) for account_id, account_name, balance in
+              db.session.query(Account.id, Account.account_name, Account.balance)
+              .filter(Account.id.in_(accounts)).order_by(Account.id).with_for_update()}
+    for account_id, amount in accounts.items():
+        if account_id not in locked:
+            raise LedgerError(f"Account {account_id} does not exist.")
+        account_name, balance = locked[account_id]
+        if funded and amount < 0 and (balance or 0) + amount < 0:
+            raise InsufficientFunds(account_name)
+
+    table = Account.__table__
+    change = bindparam('b_amount', type_=db.Float)
+    conditions = [table.c.id == bindparam('b_account_id')]
+    if funded:
+        conditions.append(or_(change >= 0, table.c.balance + change >= 0))
+    params = [{'b_account_id': account_id, 'b_amount': amount} for account_id, amount in accounts.items()]
+    if params:
+        result = db.session.execute(table.update().where(*conditions)
+                                    .values(balance=func.coalesce(table.c.balance, 0) + change), params)
+        if result.rowcount < len(params):
+            raise InsufficientFunds(None)
+
+    balances = dict(db.session.query(Account.id, Account.balance).filter(Account.id.in_(accounts)))
+    lines = [JournalLine(account_id=account_id, amount=amount, balance=balances[account_id])
+             for account_id, amount in accounts.items()]
+    lines += [JournalLine(category=category, amount=amount) for category, amount in categories.items()]
+    entry = JournalEntry(description=description, lines=lines)
+    db.session.add(entry)
+    db.session.add_all(AccountBalanceLog(account_id=account_id, balance=balance)
+                       for account_id, balance in balances.items())
+
+    # Account objects already loaded in the session still hold the old balances
+    for obj in list(db.session.identity_map.values()):
+        if isinstance(obj, Account) and obj.id in accounts:
+            db.session.expire(obj, ['balance'])
+    return entry
+
+
+# Set the balance of an account to a counted amount, the difference being recorded as an adjustment
+def set_balance(account_id, balance, description):
+    current = db.session.query(Account.balance).filter(Account.id == account_id).with_for_update().scalar() or 0
+    return post_entry(description, {account_id: balance - current}, {'adjustment': current - balance})
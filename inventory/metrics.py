@@ -0,0 +1,109 @@
+from flask import current_app, g, request, has_app_context, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from collections import deque
+from datetime import datetime
+from bisect import bisect_left
+import threading
+import time
+
+# Upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+# Request latencies and SQL time per endpoint, and the slowest recent statements, kept in the memory of the process.
+# Each worker process has its own, so a scraper sees the process that answered it
+class Metrics:
+    def __init__(self, slow_query_ms, slow_query_log_size):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.lock = threading.Lock()
+        self.latency = {}  # (endpoint, method, status) -> [count per bucket..., count above the last, total seconds]
+        self.sql = {}  # endpoint -> [statements, total seconds]
+        self.slow_queries = deque(maxlen=slow_query_log_size)
+
+    def record_request(self, endpoint, method, status, seconds):
+        with self.lock:
+            histogram = self.latency.setdefault((endpoint, method, status), [0] * (len(LATENCY_BUCKETS) + 2))
+            histogram[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            histogram[-1] += seconds
+
+    def record_statement(self, endpoint, statement, parameters, seconds):
+        with self.lock:
+            totals = self.sql.setdefault(endpoint, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            if seconds >= self.slow_query_seconds:
+                self.slow_queries.appendleft({"time": datetime.now(), "endpoint": endpoint,
+                                              "duration_ms": seconds * 1000, "statement": statement,
+                                              "parameters": repr(parameters)[:500]})
+
+    def slowest_queries(self):
+        with self.lock:
+            return sorted(self.slow_queries, key=lambda query: query["duration_ms"], reverse=True)
+
+    # All the metrics in the Prometheus text format
+    def exposition(self):
+        lines = ["# HELP inventory_request_duration_seconds Time taken to answer requests.",
+                 "# TYPE inventory_request_duration_seconds histogram"]
+        with self.lock:
+            latency = {key: list(histogram) for key, histogram in self.latency.items()}
+            sql = {endpoint: list(totals) for endpoint, totals in self.sql.items()}
+        for (endpoint, method, status), histogram in sorted(latency.items()):
+            labels = f'endpoint="{endpoint}",method="{method}",status="{status}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), histogram):
+                cumulative += count
+                lines.append(f'inventory_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"inventory_request_duration_seconds_count{{{labels}}} {cumulative}")
+            lines.append(f"inventory_request_duration_seconds_sum{{{labels}}} {histogram[-1]:.6f}")
+        lines += ["# HELP inventory_sql_statements_total SQL statements run.",
+                  "# TYPE inventory_sql_statements_total counter"]
+        lines += [f'inventory_sql_statements_total{{endpoint="{endpoint}"}} {statements}'
+                  for endpoint, (statements, _) in sorted(sql.items())]
+        lines += ["# HELP inventory_sql_duration_seconds_total Time spent running SQL statements.",
+                  "# TYPE inventory_sql_duration_seconds_total counter"]
+        lines += [f'inventory_sql_duration_seconds_total{{endpoint="{endpoint}"}} {seconds:.6f}'
+                  for endpoint, (_, seconds) in sorted(sql.items())]
+        return "\n".join(lines) + "\n"
+
+
+def current_endpoint():
+    if has_request_context():
+        return request.endpoint or "unknown"
+    return "none"  # Background jobs and CLI commands
+
+
+def start_timer():
+    g.request_started = time.perf_counter()
+
+
+def record_request(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        current_app.extensions['metrics'].record_request(current_endpoint(), request.method,
+                                                         response.status_code, time.perf_counter() - started)
+    return response
+
+
+def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('statement_started', []).append(time.perf_counter())
+
+
+def record_statement(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['statement_started'].pop()
+    metrics = current_app.extensions.get('metrics') if has_app_context() else None
+    if metrics is not None:
+        metrics.record_statement(current_endpoint(), statement, parameters, time.perf_counter() - started)
+
+
+# Nothing is hooked into requests or the database unless METRICS_ENABLED. The Metrics of an app are kept in
+# app.extensions['metrics']
+def init_app(app):
+    if not app.config['METRICS_ENABLED']:
+        return
+    app.extensions['metrics'] = Metrics(app.config['SLOW_QUERY_MS'], app.config['SLOW_QUERY_LOG_SIZE'])
+    app.before_request(start_timer)
+    app.after_request(record_request)
+    if not event.contains(Engine, 'after_cursor_execute', record_statement):
+        event.listen(Engine, 'before_cursor_execute', start_statement_timer)
+        event.listen(Engine, 'after_cursor_execute', record_statement)
@@ -1,14 +1,9 @@
-from inventory import db, login_manager
+from inventory import db
 from flask_login import UserMixin
 from datetime import datetime
 from sqlalchemy.ext.associationproxy import association_proxy
 
 
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
-
 # Users Model
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
@@ -60,26 +55,35 @@ class ShopItem(db.Model):
     shop = db.relationship('Shop', back_populates='item_association')
     item = db.relationship('Item', back_populates='shops')
 
+    __table_args__ = (db.Index('ix_shop_item_shop_id_item_id', 'shop_id', 'item_id', unique=True),)
+
 
 # Model for items received in a shop
 class StockReceived(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     item_name = db.Column(db.String(100), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('item.id'), index=True)
     item_quantity = db.Column(db.Integer, nullable=False)
     date_received = db.Column(db.DateTime, default=datetime.now)
     shop_id = db.Column(db.Integer, db.ForeignKey('shop.id'))
+    item = db.relationship('Item', lazy=True)
 
 
 # Model for items transfer between shops
 class TransferStock(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     item_name = db.Column(db.String(100), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('item.id'))
     item_quantity = db.Column(db.Integer, nullable=False)
     date_sent = db.Column(db.DateTime, default=datetime.now)
     transfer_from_id = db.Column(db.Integer, db.ForeignKey('shop.id'), nullable=False)
     transfer_to_id = db.Column(db.Integer, db.ForeignKey('shop.id'), nullable=False)
     is_received = db.Column(db.Boolean, nullable=False, default=False)
 
+    item = db.relationship('Item', lazy=True)
+
+    __table_args__ = (db.Index('ix_transfer_stock_is_received_item_id', 'is_received', 'item_id'),)
+
 
 # Model for sales in shops
 class Sale(db.Model):
@@ -96,11 +100,14 @@ class Sale(db.Model):
     sale_items = db.relationship('StockSold', backref='sale_group', lazy=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
 
+    __table_args__ = (db.Index('ix_sale_shop_id_date_sold', 'shop_id', 'date_sold'),)
+
 
 # Model for items added to cart
 class StockSold(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     item_name = db.Column(db.String(100), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('item.id'), index=True)
     item_quantity = db.Column(db.Integer, nullable=False)
     item_discount = db.Column(db.Integer, nullable=False)
     item_value = db.Column(db.Integer, nullable=False)
@@ -109,6 +116,10 @@ class StockSold(db.Model):
     sale_id = db.Column(db.Integer, db.ForeignKey('sale.id'))
     shop_id = db.Column(db.Integer, db.ForeignKey('shop.id'))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    item = db.relationship('Item', lazy=True)
+
+    # Covers the items of a sale and the cart (sale_id NULL) of a user in a shop
+    __table_args__ = (db.Index('ix_stock_sold_sale_id_shop_id_user_id', 'sale_id', 'shop_id', 'user_id'),)
 
 
 # Model for store
@@ -141,11 +152,13 @@ class StoreItem(db.Model):
     store = db.relationship('Store', back_populates='item_association')
     item = db.relationship('Item', back_populates='stores')
 
+    __table_args__ = (db.Index('ix_store_item_store_id_item_id', 'store_id', 'item_id', unique=True),)
+
 
 # Model for items
 class Item(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    item_name = db.Column(db.String(100), nullable=False)
+    item_name = db.Column(db.String(100), nullable=False, index=True)
     item_cost_price = db.Column(db.Float, nullable=False)
     item_selling_price = db.Column(db.Float, nullable=False)
     date_added = db.Column(db.DateTime, default=datetime.now)
@@ -157,21 +170,28 @@ class Item(db.Model):
 class StockIn(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     item_name = db.Column(db.String(100), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('item.id'), index=True)
     item_quantity = db.Column(db.Integer, nullable=False)
     date_received = db.Column(db.DateTime, default=datetime.now)
     store_id = db.Column(db.Integer, db.ForeignKey('store.id'))
+    item = db.relationship('Item', lazy=True)
 
 
 # Model for stock sent from a store to a shop
 class StockOut(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     item_name = db.Column(db.String(100), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('item.id'))
     item_quantity = db.Column(db.Integer, nullable=False)
     date_sent = db.Column(db.DateTime, default=datetime.now)
     shop_id = db.Column(db.Integer, db.ForeignKey('shop.id'))
     store_id = db.Column(db.Integer, db.ForeignKey('store.id'))
     is_received = db.Column(db.Boolean, nullable=False, default=False)
 
+    item = db.relationship('Item', lazy=True)
+
+    __table_args__ = (db.Index('ix_stock_out_is_received_item_id', 'is_received', 'item_id'),)
+
 
 # Model for debtors
 class Debtor(db.Model):
@@ -202,6 +222,8 @@ class DailyCount(db.Model):
     base_count = db.Column(db.Integer)  # Quantity of the item as per the system at the time of sending the daily count
     date = db.Column(db.DateTime, default=datetime.now)
 
+    __table_args__ = (db.Index('ix_daily_count_shop_id_date', 'shop_id', 'date'),)
+
 
 # Model for accounts used for payment
 class Account(db.Model):
@@ -229,10 +251,30 @@ class AccountMovement(db.Model):
 class AccountBalanceLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     account_id = db.Column(db.Integer, db.ForeignKey('account.id'), nullable=False)
-    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.now, index=True)
     balance = db.Column(db.Float, nullable=False)
 
 
+# Model for a movement of money recorded in the ledger. Its lines add up to zero: money taken out of accounts or
+# categories is put into others
+class JournalEntry(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(140), nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.now, index=True)
+    lines = db.relationship('JournalLine', backref='entry', lazy=True)
+
+
+# Model for a line of a journal entry: a debit (positive amount) or credit (negative amount) of an account, or of a
+# category such as sales or expenses for the side of the movement that is not one of the accounts
+class JournalLine(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    entry_id = db.Column(db.Integer, db.ForeignKey('journal_entry.id'), nullable=False, index=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('account.id'), index=True)
+    category = db.Column(db.String(40))
+    amount = db.Column(db.Float, nullable=False)
+    balance = db.Column(db.Float)  # Balance of the account after the entry
+
+
 # Model for payments made to people
 class Payment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -257,18 +299,22 @@ class CountDifference(db.Model):
 class TrashLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     item_name = db.Column(db.String(100), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('item.id'), index=True)
     item_quantity = db.Column(db.Integer, nullable=False)
     item_cost_price = db.Column(db.Float, nullable=False)
     item_selling_price = db.Column(db.Float, nullable=False)
     date = db.Column(db.DateTime, default=datetime.now)
+    item = db.relationship('Item', lazy=True)
 
 
 class PriceLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     item_name = db.Column(db.String(100), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('item.id'), index=True)
     item_cost_price = db.Column(db.Float, nullable=False)
     item_selling_price = db.Column(db.Float, nullable=False)
     date = db.Column(db.DateTime, default=datetime.now)
+    item = db.relationship('Item', lazy=True)
 
 
 class Expense(db.Model):
@@ -283,8 +329,53 @@ class Expense(db.Model):
 class StoreStockTransfer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     item_name = db.Column(db.String(100), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('item.id'))
     item_quantity = db.Column(db.Integer, nullable=False)
     date_sent = db.Column(db.DateTime, default=datetime.now)
     transfer_from_id = db.Column(db.Integer, db.ForeignKey('store.id'), nullable=False)
     transfer_to_id = db.Column(db.Integer, db.ForeignKey('store.id'), nullable=False)
     is_received = db.Column(db.Boolean, nullable=False, default=False)
+
+    item = db.relationship('Item', lazy=True)
+
+    __table_args__ = (db.Index('ix_store_stock_transfer_is_received_item_id', 'is_received', 'item_id'),)
+
+
+# Model for daily sales totals of a shop, kept up to date as sales are recorded so that reports do not have to
+# scan every sale. One row per date, shop, seller and payment method. Sales without a seller have no user_id, and as
+# databases do not consider NULLs equal in a unique constraint the key is unique on coalesce(user_id, 0) instead
+class DailyShopSummary(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    shop_id = db.Column(db.Integer, db.ForeignKey('shop.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    payment_method = db.Column(db.String(80), nullable=False)
+    sales_count = db.Column(db.Integer, nullable=False, default=0)
+    sales_value = db.Column(db.Integer, nullable=False, default=0)
+    sales_cost = db.Column(db.Float, nullable=False, default=0.0)
+    sales_discount = db.Column(db.Integer, nullable=False, default=0)  # Item discounts plus general sale discounts
+    shop = db.relationship('Shop', lazy=True)
+    seller_details = db.relationship('User', lazy=True)
+
+    __table_args__ = (db.Index('ix_daily_shop_summary_key', 'date', 'shop_id', db.func.coalesce(user_id, 0),
+                               'payment_method', unique=True),)
+
+    @property
+    def profit(self):
+        return self.sales_value - self.sales_cost
+
+
+# Model for reports and exports generated in the background. The result is kept until it expires
+class Job(db.Model):
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.Text, nullable=False, default='{}')  # JSON encoded arguments of the job
+    status = db.Column(db.String(20), nullable=False, default='Pending')  # Pending, Running, Done or Failed
+    result = db.deferred(db.Column(db.LargeBinary))  # Only loaded when the result is downloaded
+    filename = db.Column(db.String(120))
+    mimetype = db.Column(db.String(100))
+    error = db.Column(db.String(255))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    date_created = db.Column(db.DateTime, default=datetime.now)
+    date_started = db.Column(db.DateTime)
+    date_finished = db.Column(db.DateTime)
@@ -0,0 +1,52 @@
+from inventory.versioning import table_version
+from flask import current_app, make_response, request, session
+from flask.globals import request_ctx
+from flask_login import current_user
+from functools import wraps
+from datetime import date
+import hashlib
+import threading
+import time
+
+_pages = {}  # (endpoint, path, user id) -> (versions, time rendered, etag, page)
+_lock = threading.Lock()
+
+
+def _flashed_messages():
+    return '_flashes' in session or bool(getattr(request_ctx, 'flashes', None))
+
+
+# Keep the page a GET view renders in memory, per user, for as long as none of the tables it is built from changed
+# and at most PAGE_CACHE_TTL seconds, so changes committed by other worker processes are picked up. The page is sent
+# with an ETag that is a hash of its content, which lets browsers revalidate it and get 304 Not Modified when it is
+# the same, whichever worker answers. Pages showing flashed messages are never kept, as the messages are shown once
+def cached_page(*tables):
+    tables = tables + ('user',)  # The layout changes with the role of the user
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET' or _flashed_messages():
+                return view(*args, **kwargs)
+            key = (request.endpoint, request.full_path, current_user.get_id())
+            versions = (date.today(),) + table_version(*tables)
+            entry = _pages.get(key)
+            if entry is None or entry[0] != versions \
+                    or time.monotonic() - entry[1] >= current_app.config['PAGE_CACHE_TTL']:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.mimetype != 'text/html' or _flashed_messages():
+                    return response
+                page = response.get_data()
+                entry = (versions, time.monotonic(), hashlib.sha1(page).hexdigest(), page)
+                with _lock:
+                    _pages.pop(key, None)
+                    while _pages and len(_pages) >= current_app.config['PAGE_CACHE_SIZE']:
+                        del _pages[next(iter(_pages))]  # The oldest page
+                    _pages[key] = entry
+
+            response = current_app.response_class(entry[3], mimetype='text/html')
+            response.set_etag(entry[2])
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
@@ -0,0 +1,50 @@
+from inventory import db
+from inventory.models import Shop, DailyShopSummary
+from sqlalchemy import func, select
+
+
+# Daily totals per shop and payment method for the last `days` dates that have sales, read from the daily summaries
+# in one query. Rows are (date, shop_name, payment_method, sales_value, sales_cost, sales_discount)
+def recent_daily_totals(days=7):
+    recent_dates = select(DailyShopSummary.date).distinct().order_by(DailyShopSummary.date.desc()) \
+        .limit(days).subquery()
+    return db.session.query(DailyShopSummary.date, Shop.shop_name, DailyShopSummary.payment_method,
+                            func.sum(DailyShopSummary.sales_value), func.sum(DailyShopSummary.sales_cost),
+                            func.sum(DailyShopSummary.sales_discount)) \
+        .join(recent_dates, recent_dates.c.date == DailyShopSummary.date) \
+        .join(Shop, DailyShopSummary.shop_id == Shop.id) \
+        .group_by(DailyShopSummary.date, Shop.shop_name, DailyShopSummary.payment_method) \
+        .order_by(DailyShopSummary.date.desc()).all()
+
+
+# Lookups used by reports.html: payment methods, sales, cost, discount and profit per date and shop
+def shop_daily_report_data(shops, days=7):
+    date_list = []
+    payment_methods_lookup = {}  # Stores payment methods and their total values for each shop
+    sales_cost_lookup = {}  # Stores total cost of items sold in each shop
+    discount_lookup = {}  # Stores total discount (both item discount and general sale discount) for each shop
+    total_sales_lookup = {}  # Stores total sales value of items sold in each shop
+    profit_lookup = {}  # Stores total profit of each shop
+    total_profit = {}  # Stores total profit of all shop
+
+    for sale_date, shop_name, payment_method, sales_value, sales_cost, discount in recent_daily_totals(days):
+        date = sale_date.strftime("%Y-%m-%d")
+        if date not in date_list:
+            date_list.append(date)
+            payment_methods_lookup[date] = {shop.shop_name: {} for shop in shops}
+            sales_cost_lookup[date] = {shop.shop_name: 0 for shop in shops}
+            discount_lookup[date] = {shop.shop_name: 0 for shop in shops}
+            total_sales_lookup[date] = {shop.shop_name: 0 for shop in shops}
+            profit_lookup[date] = {shop.shop_name: 0 for shop in shops}
+            total_profit[date] = 0
+
+        payment_methods_lookup[date][shop_name][payment_method] = sales_value
+        sales_cost_lookup[date][shop_name] += sales_cost
+        discount_lookup[date][shop_name] += discount
+        total_sales_lookup[date][shop_name] += sales_value
+        profit_lookup[date][shop_name] += sales_value - sales_cost
+        total_profit[date] += sales_value - sales_cost
+
+    return dict(payment_methods_lookup=payment_methods_lookup, total_sales_lookup=total_sales_lookup,
+                sales_cost_lookup=sales_cost_lookup, discount_lookup=discount_lookup, profit_lookup=profit_lookup,
+                total_profit=total_profit, date_list=date_list)
@@ -0,0 +1,67 @@
+from inventory import db
+from inventory.models import Sale, StockSold, DailyShopSummary
+from sqlalchemy import func, select, update, delete, insert
+from sqlalchemy.exc import IntegrityError
+
+
+# Cost of the items in a sale and its total discount (item discounts plus the general sale discount)
+def sale_totals(sale, sale_items=None):
+    sale_items = sale.sale_items if sale_items is None else sale_items
+    sales_cost = sum(item.item_quantity * item.item_cost_price for item in sale_items)
+    sales_discount = sum(item.item_discount * item.item_quantity for item in sale_items) + sale.sales_discount
+    return sales_cost, sales_discount
+
+
+# Add a sale to the daily summary of its shop, or take it out again with sign=-1 (used when a sale is edited).
+# The update is done in SQL so concurrent sales do not overwrite each other, and it is committed with the sale. The
+# first sale of a day inserts the summary in a savepoint: when a concurrent first sale inserted it in the meantime,
+# the unique constraint rejects the second row and the sale is added to the existing one instead
+def record_sale(sale, sale_items=None, sign=1):
+    if sale.date_sold is None:
+        db.session.flush()
+    sales_cost, sales_discount = sale_totals(sale, sale_items)
+    sale_date = sale.date_sold.date()
+    summary_update = update(DailyShopSummary) \
+        .where(DailyShopSummary.date == sale_date, DailyShopSummary.shop_id == sale.shop_id,
+               DailyShopSummary.user_id == sale.user_id, DailyShopSummary.payment_method == sale.payment_method) \
+        .values(sales_count=DailyShopSummary.sales_count + sign,
+                sales_value=DailyShopSummary.sales_value + sign * sale.sales_value,
+                sales_cost=DailyShopSummary.sales_cost + sign * sales_cost,
+                sales_discount=DailyShopSummary.sales_discount + sign * sales_discount) \
+        .execution_options(synchronize_session=False)
+    if db.session.execute(summary_update).rowcount == 0:
+        summary = DailyShopSummary(date=sale_date, shop_id=sale.shop_id, user_id=sale.user_id,
+                                   payment_method=sale.payment_method, sales_count=sign,
+                                   sales_value=sign * sale.sales_value, sales_cost=sign * sales_cost,
+                                   sales_discount=sign * sales_discount)
+        try:
+            with db.session.begin_nested():
+                db.session.add(summary)
+        except IntegrityError:
+            db.session.execute(summary_update)
+
+
+# Recompute the daily summaries from the recorded sales, either all of them or the ones from start_date onwards
+def rebuild_daily_summaries(start_date=None):
+    item_totals = select(StockSold.sale_id.label('sale_id'),
+                         func.sum(StockSold.item_quantity * StockSold.item_cost_price).label('sales_cost'),
+                         func.sum(StockSold.item_discount * StockSold.item_quantity).label('items_discount')) \
+        .group_by(StockSold.sale_id).subquery()
+    sale_date = func.date(Sale.date_sold)
+    summaries = select(sale_date, Sale.shop_id, Sale.user_id, Sale.payment_method, func.count(Sale.id),
+                       func.sum(Sale.sales_value), func.coalesce(func.sum(item_totals.c.sales_cost), 0),
+                       func.sum(Sale.sales_discount) + func.coalesce(func.sum(item_totals.c.items_discount), 0)) \
+        .outerjoin(item_totals, item_totals.c.sale_id == Sale.id) \
+        .where(Sale.shop_id.isnot(None)) \
+        .group_by(sale_date, Sale.shop_id, Sale.user_id, Sale.payment_method)
+    stale_summaries = delete(DailyShopSummary)
+    if start_date:
+        summaries = summaries.where(Sale.date_sold >= start_date)
+        stale_summaries = stale_summaries.where(DailyShopSummary.date >= start_date)
+
+    db.session.execute(stale_summaries)
+    result = db.session.execute(
+        insert(DailyShopSummary).from_select(['date', 'shop_id', 'user_id', 'payment_method', 'sales_count',
+                                              'sales_value', 'sales_cost', 'sales_discount'], summaries))
+    db.session.commit()
+    return result.rowcount
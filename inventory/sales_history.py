@@ -0,0 +1,54 @@
+from inventory import db
+from inventory.models import Sale
+from inventory.dashboard import day_bounds
+from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import selectinload
+from datetime import datetime
+
+
+# The position of a sale in the history, newest first. Pages are read from the sale after the cursor, so loading
+# older sales costs the same however long the shop has existed
+def sale_cursor(sale):
+    return f"{sale.date_sold.isoformat()}_{sale.id}"
+
+
+def parse_sale_cursor(cursor):
+    try:
+        date_sold, sale_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(date_sold), int(sale_id)
+    except (AttributeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+# A page of a shop's sales, newest first, with their items loaded in one extra query. Returns the sales and the
+# cursor of the next page, None on the last page. Raises ValueError on a bad cursor
+def sales_page(shop_id, limit, cursor=None):
+    query = Sale.query.options(selectinload(Sale.sale_items)).filter(Sale.shop_id == shop_id)
+    if cursor:
+        date_sold, sale_id = parse_sale_cursor(cursor)
+        query = query.filter(or_(Sale.date_sold < date_sold, and_(Sale.date_sold == date_sold, Sale.id < sale_id)))
+    sales = query.order_by(Sale.date_sold.desc(), Sale.id.desc()).limit(limit + 1).all()
+    next_cursor = sale_cursor(sales[limit - 1]) if len(sales) > limit else None
+    return sales[:limit], next_cursor
+
+
+# Discount of a sale: the item discounts plus the discount on the whole sale
+def sale_total_discount(sale):
+    return sum(item.item_discount * item.item_quantity for item in sale.sale_items) + sale.sales_discount
+
+
+def sale_credit(sale):
+    return sale.sales_value - sale.amount_paid if sale.credit_option else 0.0
+
+
+# A sale as the sales history of the till page shows it. discount can be given when the sale items are not loaded
+def sale_summary(sale, discount=None):
+    return {"id": sale.id, "date": str(sale.date_sold.date()), "time": sale.date_sold.strftime('%H:%M:%S'),
+            "sales_value": sale.sales_value, "discount": sale_total_discount(sale) if discount is None else discount,
+            "credit": sale_credit(sale), "payment_method": sale.payment_method}
+
+
+def day_sales_total(shop_id, day):
+    start, end = day_bounds(day)
+    return db.session.query(func.coalesce(func.sum(Sale.sales_value), 0)) \
+        .filter(Sale.shop_id == shop_id, Sale.date_sold >= start, Sale.date_sold < end).scalar()
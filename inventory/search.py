@@ -0,0 +1,104 @@
+from inventory import db
+from inventory.models import Item
+from inventory.versioning import table_version
+from flask import current_app
+from bisect import bisect_left
+import heapq
+import threading
+import time
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# In-memory index of item names. Prefix matches come from a sorted list of names and substring matches from a
+# trigram index, so a search does not have to look at every item
+class ItemNameIndex:
+    def __init__(self, items):
+        self.names = {}  # item id -> item name
+        self.lowered = {}  # item id -> lower case item name
+        entries = []
+        self.trigram_lookup = {}  # trigram -> ids of the items whose name contains it
+        for item_id, item_name in items:
+            lowered = item_name.lower()
+            self.names[item_id] = item_name
+            self.lowered[item_id] = lowered
+            entries.append((lowered, item_id))
+            for trigram in trigrams(lowered):
+                self.trigram_lookup.setdefault(trigram, set()).add(item_id)
+        entries.sort()
+        self.sorted_names = [lowered for lowered, _ in entries]
+        self.sorted_ids = [item_id for _, item_id in entries]
+
+    def prefix_matches(self, term, item_ids=None):
+        position = bisect_left(self.sorted_names, term)
+        while position < len(self.sorted_names) and self.sorted_names[position].startswith(term):
+            item_id = self.sorted_ids[position]
+            if item_ids is None or item_id in item_ids:
+                yield item_id
+            position += 1
+
+    def substring_matches(self, term, item_ids=None, limit=None):
+        if len(term) < 3:
+            # Too short for the trigram index, every name is looked at: stopping at the first matches in name order
+            # would drop better ranked ones
+            matches = [item_id for item_id, lowered in self.lowered.items()
+                       if term in lowered and (item_ids is None or item_id in item_ids)]
+        else:
+            candidate_sets = sorted((self.trigram_lookup.get(trigram, set()) for trigram in trigrams(term)), key=len)
+            candidates = set.intersection(*candidate_sets)
+            if item_ids is not None:
+                candidates &= item_ids
+            matches = [item_id for item_id in candidates if term in self.lowered[item_id]]
+        rank = lambda item_id: (self.lowered[item_id].find(term), self.lowered[item_id])
+        if limit is None:
+            return sorted(matches, key=rank)
+        return heapq.nsmallest(limit, matches, key=rank)
+
+    # Ids of the items whose name contains the term, names starting with it first. item_ids limits the search to
+    # those items (e.g. the items of a shop)
+    def search(self, term, limit=None, item_ids=None):
+        term = term.lower()
+        results = []
+        for item_id in self.prefix_matches(term, item_ids):
+            results.append(item_id)
+            if limit is not None and len(results) >= limit:
+                return results
+        seen = set(results)
+        for item_id in self.substring_matches(term, item_ids, limit=None if limit is None else limit + len(seen)):
+            if item_id not in seen:
+                results.append(item_id)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+
+_index = None
+_index_version = None
+_index_built = 0
+_index_lock = threading.Lock()
+
+
+# The index of all items, rebuilt after items are added or edited in this process, or after SEARCH_INDEX_TTL seconds
+# to pick up changes made by other worker processes
+def get_item_index():
+    global _index, _index_version, _index_built
+
+    def is_stale():
+        expired = time.monotonic() - _index_built > current_app.config['SEARCH_INDEX_TTL']
+        return _index is None or table_version('item') != _index_version or expired
+
+    if is_stale():
+        with _index_lock:
+            if is_stale():
+                version = table_version('item')
+                _index = ItemNameIndex(db.session.query(Item.id, Item.item_name).all())
+                _index_version = version
+                _index_built = time.monotonic()
+    return _index
+
+
+def search_item_names(term, limit=None, item_ids=None):
+    index = get_item_index()
+    return [(item_id, index.names[item_id]) for item_id in index.search(term, limit, item_ids)]
@@ -0,0 +1,37 @@
+// Live updates for a page, pushed by the server as sales and stock changes are committed.
+//
+// The page passes the position of the updates when it was rendered, so the updates committed since then are sent
+// first, and handlers for the kinds of updates it shows. When the server cannot tell what the page missed, e.g. it
+// was restarted, the page is reloaded.
+//
+//   liveFeed({
+//       url: "{{ url_for('main.events') }}",
+//       lastEventId: "{{ live_event_id }}",
+//       on: {sale: (sale) => ..., stock: (change) => ...}
+//   });
+function liveFeed(options) {
+    if (!window.EventSource) {
+        return null;
+    }
+    const url = options.lastEventId ? `${options.url}?last_event_id=${encodeURIComponent(options.lastEventId)}`
+        : options.url;
+    const source = new EventSource(url);
+    Object.entries(options.on).forEach(([kind, handler]) => {
+        source.addEventListener(kind, (event) => handler(JSON.parse(event.data)));
+    });
+    source.addEventListener("reload", () => {
+        source.close();
+        window.location.reload();
+    });
+    return source;
+}
+
+// Add an amount to a number shown on the page, which keeps the exact value in its data-value attribute
+function addToNumber(element, amount) {
+    if (!element) {
+        return;
+    }
+    const value = parseFloat(element.dataset.value) + amount;
+    element.dataset.value = value;
+    element.textContent = value.toLocaleString("en-US", {minimumFractionDigits: 1, maximumFractionDigits: 2});
+}
@@ -0,0 +1,118 @@
+// Live search suggestions for a text input.
+//
+// Suggestions are only fetched once the user stops typing for a moment, a request still running when the text
+// changes again is cancelled, and recent results are remembered so going back over the same text does not ask the
+// server again. When a shorter search already returned every match, longer searches starting with it are answered
+// from that result without a request. A result holds every match when it is shorter than the limit the server says
+// it searched with in the X-Search-Limit header, which may be lower than the limit asked for.
+//
+//   liveSearch({
+//       input: document.getElementById("searchItemName"),
+//       results: document.getElementById("searchResults"),
+//       url: `{{config.URL}}/get_item_name`,
+//       params: {"shop_id": "{{ shop.id }}"}
+//   });
+//
+// The endpoint receives {"item_name": <text>, "limit": <limit>, ...params} and answers [{"name": ...}, ...], with
+// the limit it applied in the X-Search-Limit header.
+function liveSearch(options) {
+    const input = options.input;
+    const results = options.results;
+    const termKey = options.termKey || "item_name";
+    const delay = options.delay || 250;
+    const limit = options.limit || 20;
+    const cacheSize = options.cacheSize || 50;
+    const onSelect = options.onSelect || ((name) => { input.value = name; });
+    // The part of a suggestion searched for, by default the name without the quantity some endpoints add after it,
+    // e.g. "Rice 25kg (40)"
+    const matchText = options.matchText || ((name) => name.replace(/ \(\d+\)$/, "").toLowerCase());
+
+    const cache = new Map();  // search text -> {names, complete}, least recently used first
+    let timer = null;
+    let controller = null;
+
+    const remember = (term, names, complete) => {
+        cache.delete(term);
+        cache.set(term, {names, complete});
+        if (cache.size > cacheSize) {
+            cache.delete(cache.keys().next().value);
+        }
+    };
+
+    const cached = (term) => {
+        if (cache.has(term)) {
+            let entry = cache.get(term);
+            remember(term, entry.names, entry.complete);
+            return entry.names;
+        }
+        // A complete result for the text typed so far also holds every match for the longer text
+        for (let length = term.length - 1; length > 0; length--) {
+            let entry = cache.get(term.slice(0, length));
+            if (entry && entry.complete) {
+                let names = entry.names.filter(name => matchText(name).includes(term))
+                    .sort((a, b) => matchText(a).indexOf(term) - matchText(b).indexOf(term));
+                remember(term, names, true);
+                return names;
+            }
+        }
+        return null;
+    };
+
+    const show = (names) => {
+        results.innerHTML = "";
+        names.forEach((name) => {
+            let item = document.createElement("p");
+            item.className = "search-item";
+            item.textContent = name;
+            item.addEventListener("click", () => {
+                onSelect(name);
+                results.innerHTML = "";
+            });
+            results.appendChild(item);
+        });
+    };
+
+    const search = (term) => {
+        let names = cached(term);
+        if (names) {
+            show(names);
+            return;
+        }
+        controller = new AbortController();
+        fetch(options.url, {
+            method: "POST",
+            headers: {
+                'Accept': 'application/json',
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(Object.assign({[termKey]: term, "limit": limit}, options.params || {})),
+            signal: controller.signal
+        })
+            .then(res => res.json().then(data => {
+                let names = data.map(item => item.name);
+                // Without the limit the server applied, a short result may still be missing matches
+                let applied = parseInt(res.headers.get("X-Search-Limit"), 10);
+                remember(term, names, applied > 0 && names.length < applied);
+                show(names);
+            }))
+            .catch(error => {
+                if (error.name !== "AbortError") {
+                    console.log(error);
+                }
+            });
+    };
+
+    input.addEventListener("input", () => {
+        clearTimeout(timer);
+        if (controller) {
+            controller.abort();
+            controller = null;
+        }
+        let term = input.value.trim().toLowerCase();
+        if (!term) {
+            results.innerHTML = "";
+            return;
+        }
+        timer = setTimeout(() => search(term), delay);
+    });
+}
@@ -0,0 +1,112 @@
+from inventory import db
+from inventory.events import queue_event
+from inventory.models import ShopItem
+from sqlalchemy import bindparam, case, update
+
+
+class InsufficientStock(Exception):
+    def __init__(self, item_id):
+        super().__init__(f"Not enough stock of item {item_id}")
+        self.item_id = item_id
+
+
+# Shop and store stock have the same shape apart from the names of the location and status columns
+def stock_columns(model):
+    table = model.__table__
+    if model is ShopItem:
+        return table, table.c.shop_id, table.c.item_status
+    return table, table.c.store_id, table.c.stock_status
+
+
+# Tell the pages following a shop or store that its stock changed by quantities (by item id), worth value. Changes are
+# valued at cost, at which the stock rows are valued. Store changes only go to admins
+def queue_stock_change(model, location_id, quantities, value):
+    shop_id = location_id if model is ShopItem else None
+    queue_event('stock', {"location": 'shop' if model is ShopItem else 'store', "location_id": location_id,
+                          "items": quantities, "value": value}, shop_id)
+
+
+# Take quantities (by item id) out of the stock of a shop or store and revalue it at costs (by item id).
+# The rows are locked first (SELECT ... FOR UPDATE, which SQLite ignores as it serialises writes anyway) and every
+# UPDATE only applies while enough stock is left, so two sales of the last units cannot both go through.
+# Raises InsufficientStock, in which case the caller must roll back
+def remove_stock(model, location_id, quantities, costs):
+    table, location, _ = stock_columns(model)
+    available = {}
+    for item_id, quantity in db.session.query(model.item_id, model.item_quantity).with_for_update() \
+            .filter(location == location_id, model.item_id.in_(quantities)):
+        available[item_id] = available.get(item_id, 0) + quantity
+    for item_id, quantity in quantities.items():
+        if quantity <= 0 or available.get(item_id, 0) < quantity:
+            raise InsufficientStock(item_id)
+
+    # The value is set before the quantity so MySQL, which applies the assignments in order, computes it from the old
+    # quantity like other databases do
+    stock_update = table.update() \
+        .where(location == bindparam('b_location_id'), table.c.item_id == bindparam('b_item_id'),
+               table.c.item_quantity >= bindparam('b_quantity')) \
+        .ordered_values((table.c.item_value, (table.c.item_quantity - bindparam('b_quantity')) * bindparam('b_cost')),
+                        (table.c.item_quantity, table.c.item_quantity - bindparam('b_quantity')))
+    params = [{'b_location_id': location_id, 'b_item_id': item_id, 'b_quantity': quantity, 'b_cost': costs[item_id]}
+              for item_id, quantity in quantities.items()]
+    result = db.session.execute(stock_update, params)
+    if result.rowcount < len(params):
+        raise InsufficientStock(None)
+    queue_stock_change(model, location_id, {item_id: -quantity for item_id, quantity in quantities.items()},
+                       -sum(quantity * costs[item_id] for item_id, quantity in quantities.items()))
+
+
+# Add a quantity of an item to the stock of a shop or store, creating the stock row if the location does not have
+# the item yet. The status becomes 'Running Out' while the quantity is below running_out_below
+def add_stock(model, location_id, item_id, quantity, cost, running_out_below):
+    table, location, status = stock_columns(model)
+    new_quantity = table.c.item_quantity + quantity
+    result = db.session.execute(
+        table.update().where(location == location_id, table.c.item_id == item_id)
+        .ordered_values((table.c.item_value, new_quantity * cost),
+                        (status, case((new_quantity < running_out_below, 'Running Out'), else_='In Stock')),
+                        (table.c.item_quantity, new_quantity)))
+    if result.rowcount == 0:
+        stock = model(item_id=item_id, item_quantity=quantity, item_value=quantity * cost,
+                      **{location.key: location_id,
+                         status.key: 'Running Out' if quantity < running_out_below else 'In Stock'})
+        db.session.add(stock)
+    queue_stock_change(model, location_id, {item_id: quantity}, quantity * cost)
+
+
+# Set the quantity of an item in the stock of a shop or store, e.g. when an admin corrects it. The row is locked like
+# in remove_stock, so the change sent to the pages following the location is the difference to the quantity actually
+# replaced. Returns that quantity, None if the location does not have the item
+def set_stock(model, location_id, item_id, quantity, cost, running_out_below):
+    table, location, status = stock_columns(model)
+    current = db.session.query(model.item_quantity).with_for_update() \
+        .filter(location == location_id, model.item_id == item_id).scalar()
+    if current is None:
+        return None
+    db.session.execute(
+        table.update().where(location == location_id, table.c.item_id == item_id)
+        .values({table.c.item_quantity: quantity, table.c.item_value: quantity * cost,
+                 status: 'Running Out' if quantity < running_out_below else 'In Stock'}))
+    queue_stock_change(model, location_id, {item_id: quantity - current}, (quantity - current) * cost)
+    return current
+
+
+# Remove an item from the stock of a shop or store altogether. Returns the quantity there was, None if the location
+# did not have the item
+def delete_stock(model, location_id, item_id, cost):
+    table, location, _ = stock_columns(model)
+    current = db.session.query(model.item_quantity).with_for_update() \
+        .filter(location == location_id, model.item_id == item_id).scalar()
+    if current is None:
+        return None
+    db.session.execute(table.delete().where(location == location_id, table.c.item_id == item_id))
+    queue_stock_change(model, location_id, {item_id: -current}, -current * cost)
+    return current
+
+
+# Mark stock sent to a location as received. Returns False if it was already received, so a transfer cannot be
+# received twice
+def mark_received(model, transfer_id):
+    result = db.session.execute(update(model).where(model.id == transfer_id, model.is_received == False)
+                                .values(is_received=True).execution_options(synchronize_session=False))
+    return result.rowcount == 1
@@ -0,0 +1,54 @@
+from inventory import db
+from inventory.stock import stock_columns
+from inventory.versioning import table_version
+from flask import current_app
+from sqlalchemy import case, func
+from collections import namedtuple
+import threading
+import time
+
+# Stock totals of a shop or store: value of the stock, number of items stocked, units in stock and items out of stock
+LocationValuation = namedtuple('LocationValuation', ['value', 'items', 'units', 'out_of_stock'])
+NO_STOCK = LocationValuation(0, 0, 0, 0)
+
+
+# Totals of every shop (model ShopItem) or store (model StoreItem) by location id, in one grouped query
+def load_valuations(model):
+    table, location, _ = stock_columns(model)
+    rows = db.session.query(location, func.coalesce(func.sum(table.c.item_value), 0), func.count(table.c.id),
+                            func.coalesce(func.sum(table.c.item_quantity), 0),
+                            func.sum(case((table.c.item_quantity <= 0, 1), else_=0))) \
+        .group_by(location)
+    return {location_id: LocationValuation(value, items, int(units), int(out_of_stock or 0))
+            for location_id, value, items, units, out_of_stock in rows}
+
+
+_valuations = {}  # table name -> (table version, time loaded, valuations)
+_lock = threading.Lock()
+
+
+# Totals of every shop or store, loaded again after the stock changes in this process or after STOCK_VALUATION_TTL
+# seconds to pick up changes made by other worker processes
+def stock_valuations(model):
+    table_name = model.__table__.name
+
+    def cached():
+        entry = _valuations.get(table_name)
+        if entry and entry[0] == table_version(table_name) \
+                and time.monotonic() - entry[1] < current_app.config['STOCK_VALUATION_TTL']:
+            return entry[2]
+        return None
+
+    valuations = cached()
+    if valuations is None:
+        with _lock:
+            valuations = cached()
+            if valuations is None:
+                version = table_version(table_name)
+                valuations = load_valuations(model)
+                _valuations[table_name] = (version, time.monotonic(), valuations)
+    return valuations
+
+
+def location_valuation(model, location_id):
+    return stock_valuations(model).get(location_id, NO_STOCK)
@@ -0,0 +1,51 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+import threading
+
+
+# Version counter of every table, bumped each time a transaction that changed the table is committed. Caches keep the
+# versions of the tables they were built from and are rebuilt when a version moves on. The counters live in the
+# process, so commits made by other worker processes are only seen through the caches' own expiry times
+_versions = {}
+_lock = threading.Lock()
+
+
+def table_version(*tables):
+    return tuple(_versions.get(table, 0) for table in tables)
+
+
+def bump_tables(*tables):
+    with _lock:
+        for table in tables:
+            _versions[table] = _versions.get(table, 0) + 1
+
+
+def _changed_tables(session):
+    return session.info.setdefault('changed_tables', set())
+
+
+@event.listens_for(Session, 'before_flush')
+def track_flushed_tables(session, flush_context, instances):
+    changed_tables = _changed_tables(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        changed_tables.add(obj.__table__.name)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def track_executed_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _changed_tables(orm_execute_state.session).add(orm_execute_state.statement.table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def bump_committed_tables(session):
+    changed_tables = session.info.pop('changed_tables', None)
+    if changed_tables:
+        bump_tables(*changed_tables)
+
+
+# Only a rollback of the whole transaction forgets the changes, not one of a savepoint
+@event.listens_for(Session, 'after_soft_rollback')
+def forget_rolled_back_tables(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('changed_tables', None)
@@ -0,0 +1,7 @@
+# The views are grouped in one blueprint per part of the business, imported when an app is built so that importing
+# the package does not load every view, form and template helper
+def register_blueprints(app):
+    from inventory.views import main, users, shops, stores, accounts, reports
+
+    for module in (main, users, shops, stores, accounts, reports):
+        app.register_blueprint(module.bp)
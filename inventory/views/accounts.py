@@ -0,0 +1,347 @@
+from flask import Blueprint, current_app, render_template, url_for, flash, redirect, request, jsonify, abort
+from inventory import db
+from inventory.models import Debtor, Account, AccountMovement, Payment, Expense
+from inventory.forms import ExpenseForm, AccountRegistrationForm, PaymentForm, UpdateDebtorForm, UpdateAccountForm
+from flask_login import current_user, login_required
+from datetime import datetime, timedelta
+from sqlalchemy.orm import joinedload
+from collections import Counter
+from inventory.balance_history import closing_balances, parse_history_day
+from inventory.ledger import post_entry, set_balance, InsufficientFunds
+from inventory.page_cache import cached_page
+from inventory.views.common import today_date
+
+bp = Blueprint('accounts', __name__)
+
+
+# Search debtor
+@bp.route('/search_debtor', methods=['GET', 'POST'])
+def search_debtor():
+    phone_number = request.json["phone_number"]
+
+    debtor = Debtor.query.filter_by(phone_number=phone_number).first()
+    response = {}
+    if debtor:
+        response = {
+            "id": debtor.id,
+            "name": debtor.name,
+            "company_name": debtor.company_name,
+            "balance": debtor.unpaid_amount,
+            "phone_number": debtor.phone_number,
+        }
+    return jsonify(response)
+
+
+@bp.route('/view_debtors', methods=['GET'])
+@login_required
+@cached_page('debtor')
+def view_debtors():
+    debtors = Debtor.query.all()
+    return render_template('view_debtors.html', debtors=debtors)
+
+
+# Register accounts
+@bp.route('/add_account', methods=['GET', 'POST'])
+@login_required
+def add_account():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        form = AccountRegistrationForm()
+        if form.validate_on_submit():
+            account = Account(account_name=form.account_name.data)
+            db.session.add(account)
+            db.session.commit()
+            flash(f"{account.account_name} was successfully registered.", "success")
+            return redirect(url_for('accounts.view_accounts'))
+        return render_template('add_account.html', form=form)
+
+
+@bp.route('/view_accounts', methods=['GET', 'POST'])
+@login_required
+@cached_page('account', 'account_balance_log')
+def view_accounts():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        date = today_date()
+        accounts = Account.query.all()
+        account_names = {account.id: account.account_name for account in accounts}
+        try:
+            until = parse_history_day(request.args['until']) if 'until' in request.args else None
+        except ValueError:
+            abort(400)
+        # The date as the key with the closing balance of every account that moved that day
+        balances, older_until = closing_balances(current_app.config['ACCOUNT_HISTORY_DAYS'], until)
+        balance_log_lookup = {day: {account_names[account_id]: balance for account_id, balance in day_balances.items()}
+                              for day, day_balances in balances.items()}
+
+        return render_template('view_accounts.html', accounts=accounts, date=date,
+                               balance_log_lookup=balance_log_lookup, older_until=older_until)
+
+
+# Transfer money between account
+@bp.route('/account_transfer', methods=['GET', 'POST'])
+@login_required
+def account_transfer():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        accounts = Account.query.all()
+        if request.method == 'POST':
+            amount = float(request.form['amount'])
+            transfer_from_id = float(request.form['transfer_from'])
+            transfer_to_id = float(request.form['transfer_to'])
+            rate = float(request.form['rate'])
+
+            transfer_from = Account.query.get_or_404(transfer_from_id)
+            transfer_to = Account.query.get_or_404(transfer_to_id)
+
+            # Amount received in the currency of the transfer_to account
+            if "Dollar" not in transfer_from.account_name and "Dollar" in transfer_to.account_name:
+                received = amount / rate
+            elif "Dollar" in transfer_from.account_name and "Dollar" not in transfer_to.account_name:
+                received = amount * rate
+            else:
+                received = amount
+            changes = Counter()  # Amount moved in or out of every account, by account id
+            changes[transfer_from.id] -= amount
+            changes[transfer_to.id] += received
+            try:
+                post_entry(f"Transfer from {transfer_from.account_name} to {transfer_to.account_name}", changes,
+                           {'exchange': amount - received}, funded=True)
+                # Create an account movement record
+                payment_movement = AccountMovement(amount=amount, rate=rate, transfer_from_id=transfer_from.id,
+                                                   transfer_to_id=transfer_to.id)
+                db.session.add(payment_movement)
+                db.session.commit()
+                return redirect(url_for('accounts.view_accounts'))
+            except InsufficientFunds:
+                db.session.rollback()
+                flash('Insufficient funds in the transfer_from account.', 'error')
+
+        # Retrieve all account movements
+        date_today = datetime.now().date()
+        start_date = date_today - timedelta(days=60)
+
+        account_movement_lookup = {}
+        account_movements = AccountMovement.query \
+            .options(joinedload(AccountMovement.transfer_from), joinedload(AccountMovement.transfer_to)) \
+            .filter(AccountMovement.timestamp >= start_date).order_by(AccountMovement.timestamp.desc()).all()
+        for movement in account_movements:
+            date = movement.timestamp.strftime("%Y-%m-%d")  # date of account movement
+            if date in account_movement_lookup:
+                account_movement_lookup[date].append(movement)
+            else:
+                account_movement_lookup[date] = [movement]
+
+        return render_template('account_transfer.html', accounts=accounts,
+                               account_movement_lookup=account_movement_lookup)
+
+
+@bp.route('/search_payee', methods=['GET', 'POST'])
+def search_payee():
+    phone_number = request.json["phone_number"]
+    payee = Payment.query.filter_by(phone_number=phone_number).first()
+    response = {}
+    if payee:
+        response = {
+            "id": payee.id,
+            "name": payee.name,
+            "phone_number": payee.phone_number,
+        }
+    return jsonify(response)
+
+
+@bp.route('/make_payment', methods=['GET', 'POST'])
+@login_required
+def make_payment():
+    form = PaymentForm()
+    form.populate_account_choices()
+    selected_account_name = form.get_selected_account_name()
+    selected_account = Account.query.filter_by(account_name=selected_account_name).first()
+    if form.validate_on_submit():
+        payment = Payment(name=form.name.data, phone_number=form.phone_number.data, amount=form.amount.data,
+                          account=selected_account.account_name)
+        try:
+            post_entry(f"Payment to {payment.name}", {selected_account.id: -payment.amount},
+                       {'payments': payment.amount}, funded=True)
+            db.session.add(payment)
+            db.session.commit()
+            return redirect(url_for('accounts.view_payments'))
+        except InsufficientFunds as error:
+            db.session.rollback()
+            flash(str(error), "danger")
+            return redirect(url_for('accounts.make_payment'))
+    return render_template('make_payments.html', form=form)
+
+
+# View list of people you made payments to in the last 30 days
+@bp.route('/view_payments', methods=['GET', 'POST'])
+@login_required
+def view_payments():
+    date_today = datetime.now().date()
+    start_date = date_today - timedelta(days=365)
+    # Store date of payment as the key and the payee objects as a list of values
+    payee_lookup = {}
+    payees = Payment.query.filter(Payment.timestamp >= start_date).order_by(Payment.timestamp.desc()).all()
+    for payee in payees:
+        date = payee.timestamp.strftime("%Y-%m-%d")  # date of payment
+        if date in payee_lookup:
+            payee_lookup[date].append(payee)
+        else:
+            payee_lookup[date] = [payee]
+    return render_template('view_payments.html', payee_lookup=payee_lookup)
+
+
+# Update debtor balance or any other debtor details
+@bp.route('/update_debtor/<int:debtor_id>', methods=['GET', 'POST'])
+@login_required
+def update_debtor(debtor_id):
+    debtor = Debtor.query.get_or_404(debtor_id)
+    form = UpdateDebtorForm()
+    form.populate_account_choices()
+    if request.method == 'GET':
+        form.name.data = debtor.name
+        form.company_name.data = debtor.company_name
+        form.phone_number.data = debtor.phone_number
+    if request.method == 'POST':
+        debtor.name = form.name.data
+        debtor.company_name = form.company_name.data
+        debtor.phone_number = form.phone_number.data
+        if "Dollar" in form.payment_method.data:
+            debtor.account_symbol = 'USD'
+        else:
+            debtor.account_symbol = 'GNF'
+        if form.amount_paid.data <= debtor.unpaid_amount:
+            debtor.unpaid_amount -= form.amount_paid.data
+            deposited_account = Account.query.filter_by(account_name=form.payment_method.data).first()
+            try:
+                post_entry(f"Payment from {debtor.name}", {deposited_account.id: form.amount_paid.data},
+                           {'debtors': -form.amount_paid.data}, funded=True)
+            except InsufficientFunds as error:
+                db.session.rollback()
+                flash(str(error), "danger")
+                return redirect(url_for('accounts.update_debtor', debtor_id=debtor_id))
+        else:
+            flash("Amount is more than balance", "warning")
+        db.session.commit()
+        return redirect(url_for('accounts.view_debtors'))
+    return render_template('update_debtor.html', form=form)
+
+
+# Debtors lent by manager
+@bp.route('/borrowers', methods=['GET', 'POST'])
+@login_required
+def borrowers():
+    form = PaymentForm()
+    form.populate_account_choices()
+    selected_account_name = form.get_selected_account_name()
+    account_symbol = 'GNF'
+    if selected_account_name and "Dollar" in selected_account_name:
+        account_symbol = 'USD'
+    if form.validate_on_submit():
+        debtor = Debtor.query.filter_by(phone_number=form.phone_number.data).first()
+        if debtor:
+            debtor.unpaid_amount += form.amount.data
+        else:
+            debtor = Debtor(name=form.name.data, company_name='--', phone_number=form.phone_number.data,
+                            unpaid_amount=form.amount.data, amount_paid=0, account_symbol=account_symbol)
+            db.session.add(debtor)
+        account = Account.query.filter_by(account_name=selected_account_name).first()
+        try:
+            post_entry(f"Loan to {debtor.name}", {account.id: -form.amount.data}, {'debtors': form.amount.data},
+                       funded=True)
+            db.session.commit()
+            return redirect(url_for('accounts.view_debtors'))
+        except InsufficientFunds as error:
+            db.session.rollback()
+            flash(str(error), "danger")
+            return redirect(url_for('accounts.borrowers'))
+    return render_template('borrower_registration.html', form=form)
+
+
+@bp.route('/update_account/<int:account_id>', methods=['GET', 'POST'])
+@login_required
+def update_account(account_id):
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        account = Account.query.get(account_id)
+        form = UpdateAccountForm()
+        if request.method == 'GET':
+            form.account_name.data = account.account_name
+            form.balance.data = account.balance
+        if request.method == 'POST':
+            account.account_name = form.account_name.data
+            set_balance(account.id, form.balance.data, f"Balance of {account.account_name} updated")
+            db.session.commit()
+            return redirect(url_for('accounts.view_accounts'))
+        return render_template('update_account.html', form=form)
+
+
+@bp.route('/expenses', methods=['GET', 'POST'])
+@login_required
+def record_expense():
+    form = ExpenseForm()
+    form.populate_account_choices()
+    selected_account_name = form.get_selected_account_name()
+    selected_account = Account.query.filter_by(account_name=selected_account_name).first()
+    if form.validate_on_submit():
+        expense = Expense(amount=form.amount.data, account=selected_account.account_name,
+                          description=form.description.data)
+        try:
+            post_entry(f"Expense: {expense.description}", {selected_account.id: -expense.amount},
+                       {'expenses': expense.amount}, funded=True)
+            db.session.add(expense)
+            db.session.commit()
+        except InsufficientFunds as error:
+            db.session.rollback()
+            flash(str(error), "danger")
+        return redirect(url_for('accounts.record_expense'))
+
+    date_today = datetime.now().date()
+    start_date = date_today - timedelta(days=60)
+
+    expense_lookup = {}
+    expenses = Expense.query.filter(Expense.date >= start_date).order_by(Expense.date.desc()).all()
+    for expense in expenses:
+        date = expense.date.strftime("%Y-%m-%d")  # date of payment
+        if date in expense_lookup:
+            expense_lookup[date].append(expense)
+        else:
+            expense_lookup[date] = [expense]
+
+    return render_template('expenses.html', form=form, expense_lookup=expense_lookup)
+
+
+@bp.route('/<int:expense_id>/edit_expense', methods=['GET', 'POST'])
+@login_required
+def edit_expense(expense_id):
+    expense = Expense.query.get_or_404(expense_id)
+    form = ExpenseForm()
+    form.populate_account_choices()
+    selected_account_name = form.get_selected_account_name()
+    selected_account = Account.query.filter_by(account_name=selected_account_name).first()
+
+    if request.method == 'GET':
+        form.amount.data = expense.amount
+        form.account.data = expense.account
+        form.description.data = expense.description
+
+    if form.validate_on_submit():
+        # Return the money in this expense to the account it was paid from and take the new amount from the selected
+        # account, in one journal entry
+        accounts = Counter()
+        paid_from = Account.query.filter_by(account_name=expense.account).first()
+        if paid_from:
+            accounts[paid_from.id] += expense.amount
+        accounts[selected_account.id] -= form.amount.data
+        try:
+            post_entry(f"Expense edited: {form.description.data}", accounts,
+                       {'expenses': form.amount.data - (expense.amount if paid_from else 0)}, funded=True)
+        except InsufficientFunds as error:
+            db.session.rollback()
+            flash(str(error), "danger")
+            return redirect(url_for('accounts.edit_expense', expense_id=expense_id))
+
+        # Update the form with the expense details
+        expense.amount = form.amount.data
+        expense.account = form.account.data
+        expense.description = form.description.data
+        db.session.commit()
+        return redirect(url_for('accounts.record_expense'))
+    form.submit.label.text = 'Save Changes'
+    return render_template('edit_expenses.html', form=form)
@@ -0,0 +1,24 @@
+from flask import current_app, jsonify, request
+from datetime import datetime
+
+
+def today_date():
+    date_today = datetime.today().strftime('%Y-%m-%d')
+    return date_today
+
+
+# Number of suggestions a search endpoint returns: the limit asked for by the page, at most SEARCH_RESULT_LIMIT
+def search_limit():
+    limit = request.json.get("limit")
+    maximum = current_app.config['SEARCH_RESULT_LIMIT']
+    if isinstance(limit, int) and 0 < limit < maximum:
+        return limit
+    return maximum
+
+
+# The results of a search endpoint, with the limit they were searched with in the X-Search-Limit header. A page may
+# take a result shorter than that limit as every match, and narrow it down itself as more text is typed
+def search_results(results, limit):
+    response = jsonify(results)
+    response.headers['X-Search-Limit'] = str(limit)
+    return response
@@ -0,0 +1,51 @@
+from flask import Blueprint, current_app, render_template, request, abort
+from inventory import db
+from inventory.models import DailyShopSummary
+from flask_login import current_user, login_required
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from inventory.dashboard import dashboard_metrics
+from inventory.events import bus, event_stream
+
+bp = Blueprint('main', __name__)
+
+
+@bp.route('/', methods=['GET', 'POST'])
+@login_required
+def home():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        current_date = datetime.now().date()
+        metrics = dashboard_metrics()
+        return render_template('home.html', current_date=current_date, live_event_id=bus.position(), **metrics)
+
+
+# Sales and stock changes as server-sent events, so the dashboard and the till pages update without reloading. Staff
+# only get the events of their shops. The page gives the position of the bus when it was rendered, and the browser
+# the last event it got when it reconnects, to catch up on the events in between. Every open page holds a worker
+# thread, so it is only there when LIVE_EVENTS_ENABLED is set
+@bp.route('/events', methods=['GET'])
+@login_required
+def events():
+    if not current_app.config['LIVE_EVENTS_ENABLED']:
+        abort(404)
+    shop_ids = None if current_user.user_role == 'Admin' else set(current_user.shop_ids)
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    stream = event_stream(last_event_id, shop_ids, current_app.config['EVENT_STREAM_HEARTBEAT'],
+                          current_app.config['EVENT_STREAM_DURATION'])
+    return current_app.response_class(stream, mimetype='text/event-stream',
+                                      headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@bp.route('/monthly_sales_data')
+def monthly_sales_data():
+    today = datetime.now().date()
+    start_date = today - timedelta(days=31 * 6 + 30 * 5 + 29)
+    month = func.extract('month', DailyShopSummary.date)
+    monthly_totals = db.session.query(month, func.sum(DailyShopSummary.sales_value)) \
+        .filter(DailyShopSummary.date >= start_date).group_by(month).order_by(month).all()
+
+    sorted_months = [datetime(2000, int(month), 1).strftime('%B') for month, _ in monthly_totals]
+    sorted_values = [value for _, value in monthly_totals]
+
+    monthly_sales = {"labels": sorted_months, "data": sorted_values}
+    return monthly_sales
@@ -0,0 +1,98 @@
+from flask import Blueprint, current_app, render_template, url_for, flash, redirect, request, jsonify, abort
+from inventory.models import Shop, Job
+from flask_login import current_user, login_required
+from flask import send_file
+from io import BytesIO
+import hmac
+from inventory.reports import shop_daily_report_data
+from inventory.exports import build_sales_report, report_period, XLSX_MIMETYPE
+from inventory.jobs import submit_job, fail_abandoned_job
+
+bp = Blueprint('reports', __name__)
+
+
+# View total discounts, total sales value, total item cost, net profit per shop for the last 7 days
+@bp.route('/shop_daily_report', methods=['GET', 'POST'])
+@login_required
+def shop_daily_report():
+    shops = Shop.query.all()
+    report_data = shop_daily_report_data(shops, days=7)  # Only the sales of the last 7 days are displayed
+    return render_template('reports.html', shops=shops, **report_data)
+
+
+# Download reports of shops over a certain period of time, either one of the preset ranges or between two dates.
+# With background=True the report is generated by a background job and the user is sent to the job status page
+@bp.route('/download_reports', methods=['GET', 'POST'])
+@login_required
+def download_reports():
+    if request.args.get('download'):
+        try:
+            start_date, end_date = report_period(request.args)
+        except ValueError:
+            flash("Range does not exist", "warning")
+            return redirect(url_for('reports.shop_daily_report'))
+        include_items = bool(request.args.get('items'))
+
+        if request.args.get('background'):
+            job = submit_job('sales_report', {"start_date": start_date.isoformat(), "end_date": end_date.isoformat(),
+                                              "include_items": include_items}, user_id=current_user.id)
+            return redirect(url_for('reports.job_status', job_id=job.id))
+
+        report = build_sales_report(start_date, end_date, include_items=include_items)
+        filename = f'Shop_Reports_{start_date}_{end_date}.xlsx'
+        return send_file(report, mimetype=XLSX_MIMETYPE, as_attachment=True, download_name=filename)
+    return redirect(url_for('reports.shop_daily_report'))
+
+
+def get_user_job(job_id):
+    job = Job.query.get_or_404(job_id)
+    if job.user_id != current_user.id and current_user.user_role != 'Admin':
+        abort(404)
+    return fail_abandoned_job(job)
+
+
+# Request latencies and SQL timings in the Prometheus text format, for admins or a scraper sending METRICS_TOKEN as a
+# bearer token. Only there when METRICS_ENABLED is set
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    metrics = current_app.extensions.get('metrics')
+    if metrics is None:
+        abort(404)
+    token = current_app.config['METRICS_TOKEN']
+    scraper = token and hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}")
+    if not scraper and not (current_user.is_authenticated and current_user.user_role == 'Admin'):
+        abort(404)
+    return metrics.exposition(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+# The slowest recent SQL statements with their parameters
+@bp.route('/slow_queries', methods=['GET'])
+@login_required
+def slow_queries():
+    metrics = current_app.extensions.get('metrics')
+    if metrics is None or current_user.user_role != 'Admin':
+        abort(404)
+    return render_template('slow_queries.html', slow_queries=metrics.slowest_queries(),
+                           slow_query_ms=current_app.config['SLOW_QUERY_MS'])
+
+
+# Status of a background job. The page polls this route with format=json until the job is done
+@bp.route('/jobs/<job_id>', methods=['GET'])
+@login_required
+def job_status(job_id):
+    job = get_user_job(job_id)
+    if request.args.get('format') == 'json':
+        download_url = url_for('reports.download_job', job_id=job.id) if job.status == 'Done' else None
+        return jsonify({"id": job.id, "kind": job.kind, "status": job.status, "error": job.error,
+                        "download_url": download_url})
+    return render_template('job_status.html', job=job)
+
+
+@bp.route('/jobs/<job_id>/download', methods=['GET'])
+@login_required
+def download_job(job_id):
+    job = get_user_job(job_id)
+    if job.status != 'Done':
+        flash("The report is not ready yet.", "warning")
+        return redirect(url_for('reports.job_status', job_id=job.id))
+    return send_file(BytesIO(job.result), mimetype=job.mimetype, as_attachment=True, download_name=job.filename)
@@ -0,0 +1,802 @@
+from flask import Blueprint, current_app, render_template, url_for, flash, redirect, session, request, jsonify, abort
+from inventory import db
+from inventory.models import (User, Shop, StockReceived, StockSold, Debtor, Item, StockOut, Sale, ShopItem, Shopkeeper,
+                              DailyCount, TransferStock, CountDifference, DailyShopSummary)
+from inventory.forms import (ShopRegistrationForm, ShopStockReceivedForm, ShopStockSoldForm, DebtorRegistrationForm,
+                             SaleForm, TransferStockForm, StockFromShopForm, UpdateTransferStockForm,
+                             UpdateDailyCountForm)
+from flask_login import current_user, login_required
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, selectinload
+from inventory.rollups import record_sale
+from inventory.checkout import checkout, CheckoutError
+from inventory.daily_counts import save_daily_count_data
+from inventory.stock import add_stock, remove_stock, set_stock, delete_stock, mark_received, InsufficientStock
+from inventory.sales_history import sales_page, sale_total_discount, sale_summary, day_sales_total
+from inventory.search import search_item_names
+from inventory.availability import stock_availability
+from inventory.ledger import post_entry, payment_account
+from inventory.valuation import stock_valuations, location_valuation, NO_STOCK
+from inventory.events import bus
+from inventory.page_cache import cached_page
+from inventory.views.common import today_date, search_limit, search_results
+
+bp = Blueprint('shops', __name__)
+
+
+@bp.route('/register_shop', methods=['GET', 'POST'])
+@login_required
+def register_shop():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        form = ShopRegistrationForm()
+        shop = Shop.query.filter_by(shop_name=form.shop_name.data).first()
+        if shop:
+            flash("This already exist. Try another name", "warning")
+
+        if form.validate_on_submit():
+            shop = Shop(shop_name=form.shop_name.data, location=form.location.data, user_id=current_user.id)
+            db.session.add(shop)
+            db.session.commit()
+            flash(f"{shop.shop_name} at {shop.location} was successfully registered.", "success")
+            return redirect(url_for('shops.view_shops'))
+
+        return render_template('register_shop.html', form=form, shop=shop)
+
+
+@bp.route('/view_shops', methods=['GET', 'POST'])
+@login_required
+@cached_page('shop', 'shopkeeper', 'shop_item')
+def view_shops():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        shops = Shop.query.options(selectinload(Shop.shopkeepers).joinedload(Shopkeeper.user_details)).all()
+        users = User.query.all()
+        date = today_date()
+        valuations = stock_valuations(ShopItem)
+        shop_stock_lookup = {shop.id: valuations.get(shop.id, NO_STOCK) for shop in shops}
+        return render_template('view_shops.html', shop_stock_lookup=shop_stock_lookup, shops=shops, date=date,
+                               users=users)
+
+
+@bp.route('/view_shops/<int:shop_id>', methods=['GET'])
+@login_required
+def view_shop(shop_id):
+    shop = Shop.query.get_or_404(shop_id)
+    date = today_date()
+    shop_items = ShopItem.query.options(joinedload(ShopItem.item)).filter_by(shop_id=shop.id).all()
+    total_stock_value = location_valuation(ShopItem, shop.id).value
+    return render_template('view_shop.html', shop=shop, total_stock_value=total_stock_value, date=date,
+                           shop_items=shop_items)
+
+
+@bp.route('/<int:shop_id>/stock_received', methods=['GET', 'POST'])
+@login_required
+def stock_received(shop_id):
+    shop = Shop.query.get_or_404(shop_id)
+    form = ShopStockReceivedForm()
+    if form.validate_on_submit():
+        selected_name = form.item_name.data.split(" (")
+        item_name = selected_name[0]
+        item = Item.query.filter_by(item_name=item_name).first()
+        item_sent = StockOut.query.filter_by(is_received=False, item_id=item.id,
+                                             item_quantity=form.item_quantity.data, shop_id=shop.id).first()
+        if item_sent and mark_received(StockOut, item_sent.id):
+            item_received = StockReceived(item_name=item.item_name, item_id=item.id,
+                                          item_quantity=form.item_quantity.data, shop_id=shop.id)
+            db.session.add(item_received)
+            add_stock(ShopItem, shop.id, item.id, item_received.item_quantity, item.item_cost_price,
+                      running_out_below=40)
+            db.session.commit()
+            flash("Item added to stock", "success")
+        else:
+            flash("An error has occurred", "warning")
+        return redirect(url_for('shops.stock_received', shop_id=shop.id))
+
+    restock_lookup = {}
+    current_date = datetime.now()
+    restock_entries = StockOut.query.filter(StockOut.date_sent <= current_date, StockOut.is_received is True,
+                                            StockOut.shop_id == shop.id) \
+        .order_by(StockOut.date_sent.desc()).all()
+    for entry in restock_entries:
+        date = entry.date_sent.strftime("%d-%m-%Y")
+        if date in restock_lookup:
+            restock_lookup[date].append(entry)
+        else:
+            restock_lookup[date] = [entry]
+    return render_template('stock_received.html', form=form, shop=shop, restock_lookup=restock_lookup)
+
+
+# Get items in a shop to be sold
+@bp.route('/get_item_name', methods=['GET', 'POST'])
+def get_item_name():
+    limit = search_limit()
+    item_name = request.json["item_name"]
+    shop_id = request.json["shop_id"]
+    shop_item_ids = {item_id for item_id, in db.session.query(ShopItem.item_id).filter_by(shop_id=shop_id)}
+    items = search_item_names(item_name, limit=limit, item_ids=shop_item_ids)
+    response = [{"name": name} for _, name in items]
+    return search_results(response, limit)
+
+
+@bp.route('/<int:shop_id>/shop', methods=['GET', 'POST'])
+@login_required
+def stock_sold(shop_id):
+    shop = Shop.query.get(shop_id)
+    selection_form = ShopStockSoldForm()
+    sales_form = SaleForm()
+    # Form to add items to cart
+    if selection_form.validate_on_submit() and selection_form.submit.data:
+        item_name = selection_form.item_name.data
+        item = Item.query.filter_by(item_name=item_name).first()  # query the item class using the item name selected
+        shop_item = ShopItem.query.filter_by(item_id=item.id, shop_id=shop_id).first()  # get shop item
+        discount = selection_form.item_discount.data if selection_form.item_discount.data else 0  # get the item discount
+        if shop_item and shop_item.item_quantity >= selection_form.item_quantity.data:  # Check whether quantity in stock
+            item_sold = StockSold(item_name=item_name, item_id=item.id, item_quantity=selection_form.item_quantity.data,
+                                  item_discount=discount, item_cost_price=item.item_cost_price,
+                                  item_selling_price=item.item_selling_price, shop_id=shop_id, user_id=current_user.id)
+            item_sold.item_value = item_sold.item_quantity * (item.item_selling_price - discount)
+            db.session.add(item_sold)
+            db.session.commit()
+            return redirect(url_for('shops.stock_sold', shop_id=shop.id))
+        else:
+            flash("No enough quantity is stock", "warning")
+    cart_items = StockSold.query.filter_by(sale_id=None, shop_id=shop_id,
+                                           user_id=current_user.id).all()  # Grab cart items
+    total_amount = 0
+    for item in cart_items:
+        total_amount += item.item_value
+    if sales_form.validate_on_submit() and sales_form.submit.data:
+        discount = sales_form.sale_discount.data if sales_form.sale_discount.data else 0
+        if sales_form.credit_option.data is True:
+            session["payment_method"] = sales_form.payment_method.data
+            session["sales_discount"] = discount
+            session["shop_id"] = shop.id
+            session["user_id"] = current_user.id
+            return redirect(url_for("shops.debt_registration"))
+        sale = Sale(sales_discount=discount, payment_method=sales_form.payment_method.data,
+                    shop_id=shop.id, user_id=current_user.id)
+        sale.sales_value = total_amount - discount
+        sale.amount_paid = sale.sales_value
+        sale.transaction_id = sales_form.transaction_id.data if sales_form.transaction_id.data else None
+        try:
+            checkout(sale, cart_items)
+        except CheckoutError as error:
+            db.session.rollback()
+            flash(str(error), "warning")
+        return redirect(url_for('shops.stock_sold', shop_id=shop.id))
+    sales_lookup = {}
+    total_discount = {}
+    Date = today_date()
+    sales_entries, next_cursor = sales_page(shop.id, current_app.config['SALES_PAGE_SIZE'])
+    for entry in sales_entries:
+        total_discount[entry.id] = sale_total_discount(entry)
+        date = entry.date_sold.date()
+        if date in sales_lookup:
+            sales_lookup[date].append(entry)
+        else:
+            sales_lookup[date] = [entry]
+
+    # Getting today's total sales
+    today_total_sales = day_sales_total(shop.id, datetime.now().date())
+
+    return render_template('stock_sold.html', selection_form=selection_form, sales_lookup=sales_lookup, Date=Date,
+                           shop=shop,
+                           sales_form=sales_form, cart_items=cart_items, total_amount=total_amount,
+                           sales_entries=sales_entries, total_discount=total_discount,
+                           today_total_sales=today_total_sales, next_cursor=next_cursor,
+                           live_event_id=bus.position())
+
+
+# Older sales of a shop for the sales history of the till page, a page at a time
+@bp.route('/<int:shop_id>/sales_history')
+@login_required
+def sales_history(shop_id):
+    shop = Shop.query.get_or_404(shop_id)
+    try:
+        sales, next_cursor = sales_page(shop.id, current_app.config['SALES_PAGE_SIZE'], request.args.get('cursor'))
+    except ValueError:
+        abort(400)
+    sales_data = [dict(sale_summary(sale), url=url_for('shops.view_sale_items', sale_id=sale.id)) for sale in sales]
+    return jsonify({"sales": sales_data, "next_cursor": next_cursor})
+
+
+@bp.route('/<int:shop_id>/transfer_stock', methods=['GET', 'POST'])
+@login_required
+def transfer_stock(shop_id):
+    shop_from = Shop.query.get(shop_id)
+    form = TransferStockForm()
+    form.populate_shop_choices()
+    selected_shop_id = form.get_selected_shop_id()
+    shop_to = Shop.query.filter_by(id=selected_shop_id).first()
+    if form.validate_on_submit():
+        item_name = form.item_name.data
+        item = Item.query.filter_by(item_name=item_name).first()
+        if shop_from.id != shop_to.id:
+            try:
+                remove_stock(ShopItem, shop_from.id, {item.id: form.item_quantity.data},
+                             {item.id: item.item_cost_price})
+            except InsufficientStock:
+                db.session.rollback()
+                flash("Quantity is more than available.", "warning")
+            else:
+                stock_sent = TransferStock(item_name=item_name, item_id=item.id, item_quantity=form.item_quantity.data,
+                                           transfer_from_id=shop_from.id, transfer_to_id=shop_to.id)
+                db.session.add(stock_sent)
+                db.session.commit()
+                flash("Stock transferred successfully", "success")
+                return redirect(url_for('shops.transfer_stock', shop_id=shop_from.id))
+        else:
+            flash("Please select the right shop.", "warning")
+
+    stock_transfered_lookup = {}
+
+    current_date = datetime.now()
+    stock_sent_entries = TransferStock.query.filter(TransferStock.date_sent <= current_date,
+                                                    TransferStock.transfer_from_id == shop_from.id) \
+        .order_by(TransferStock.date_sent.desc()).all()
+    for entry in stock_sent_entries:
+        date = entry.date_sent.date()
+        if date in stock_transfered_lookup:
+            stock_transfered_lookup[date].append(entry)
+        else:
+            stock_transfered_lookup[date] = [entry]
+
+    return render_template('transfer_stock.html', form=form, stock_transfered_lookup=stock_transfered_lookup,
+                           shop=shop_from)
+
+
+@bp.route('/<int:shop_id>/stock_from_shop', methods=['GET', 'POST'])
+@login_required
+def stock_from_shop(shop_id):
+    shop = Shop.query.get_or_404(shop_id)
+    form = StockFromShopForm()
+    if form.validate_on_submit():
+        selected_name = form.item_name.data.split(" (")
+        item_name = selected_name[0]
+        item = Item.query.filter_by(item_name=item_name).first()
+        item_sent = TransferStock.query.filter_by(is_received=False, item_id=item.id,
+                                                  item_quantity=form.item_quantity.data, transfer_to_id=shop.id).first()
+        if item_sent and mark_received(TransferStock, item_sent.id):
+            item_received = StockReceived(item_name=item.item_name, item_id=item.id,
+                                          item_quantity=form.item_quantity.data, shop_id=shop.id)
+            db.session.add(item_received)
+            add_stock(ShopItem, shop.id, item.id, item_received.item_quantity, item.item_cost_price,
+                      running_out_below=40)
+            db.session.commit()
+            flash("Item added to stock", "success")
+        else:
+            flash("An error has occurred", "warning")
+        return redirect(url_for('shops.stock_from_shop', shop_id=shop.id))
+
+    restock_lookup = {}
+    current_date = datetime.now()
+    restock_entries = TransferStock.query.filter(TransferStock.date_sent <= current_date,
+                                                 TransferStock.transfer_to_id == shop.id,
+                                                 TransferStock.is_received == True) \
+        .order_by(TransferStock.date_sent.desc()).all()
+    for entry in restock_entries:
+        date = entry.date_sent.strftime("%d-%m-%Y")
+        if date in restock_lookup:
+            restock_lookup[date].append(entry)
+        else:
+            restock_lookup[date] = [entry]
+    return render_template('stock_from_shop.html', form=form, shop=shop, restock_lookup=restock_lookup)
+
+
+@bp.route('/history', methods=['GET'])
+@login_required
+def history():
+    start_date = datetime.now() - timedelta(days=3)
+    sales_entries = StockSold.query.filter(StockSold.date_sold >= start_date,
+                                           StockSold.shop_id).order_by(StockSold.date_sold.desc()).all()
+    sales_dates = []
+    sales_lookup = {}
+    for entry in sales_entries:
+        entry_date = entry.date_sold.date()
+        if entry_date not in sales_dates:
+            sales_dates.append(entry_date)
+
+    for date in sales_dates:
+        sales_lookup[date] = []
+        sales = StockSold.query.filter(func.date(StockSold.date_sold) == date).all()
+        for sale in sales:
+            sales_lookup[date].append(sale)
+    return render_template('history.html', sales_dates=sales_dates, sales_lookup=sales_lookup)
+
+
+@bp.route('/<int:stock_id>/edit_shop_stock', methods=['GET', 'POST'])
+@login_required
+def edit_shop_stock(stock_id):
+    stock = ShopItem.query.get_or_404(stock_id)
+    item = Item.query.get_or_404(stock.item_id)
+    shop = Shop.query.get_or_404(stock.shop.id)
+    form = ShopStockReceivedForm()
+    if request.method == 'GET':
+        form.item_name.data = stock.item.item_name
+        form.item_quantity.data = stock.item_quantity
+    if form.validate_on_submit():
+        item.item_name = form.item_name.data
+        set_stock(ShopItem, shop.id, item.id, form.item_quantity.data, item.item_cost_price, running_out_below=40)
+        db.session.commit()
+        return redirect(url_for('shops.view_shop', shop_id=shop.id))
+    form.submit.label.text = 'Update Changes'
+    return render_template('stock_received.html', form=form, shop=shop)
+
+
+@bp.route('/<int:shop_id>/shop/daily_count', methods=['GET', 'POST'])
+@login_required
+def daily_count(shop_id):
+    shop = Shop.query.get_or_404(shop_id)
+    session["shop_id"] = shop.id
+    all_stock = ShopItem.query.options(joinedload(ShopItem.item)) \
+        .filter(ShopItem.shop_id == shop.id, ShopItem.item_quantity > 0).all()
+    return render_template('daily_count.html', all_stock=all_stock, shop=shop)
+
+
+@bp.route('/debt_registration/', methods=['GET', 'POST'])
+@login_required
+def debt_registration():
+    form = DebtorRegistrationForm()
+    if form.validate_on_submit():
+        shop_id = session.get("shop_id")
+        discount = session.get("sales_discount")
+        payment_method = session.get("payment_method")
+        user_id = session.get("user_id")
+        total_amount = 0
+        cart_items = StockSold.query.filter_by(sale_id=None, shop_id=shop_id, user_id=user_id).all()
+        for item in cart_items:
+            total_amount += item.item_value
+        sale = Sale(sales_discount=discount, payment_method=payment_method,
+                    shop_id=shop_id, user_id=user_id)
+        sale.sales_value = total_amount - discount
+        amount_paid = form.amount_paid.data if form.amount_paid.data else 0
+        debtor = Debtor.query.filter_by(phone_number=form.phone_number.data).first()
+        if debtor:
+            debtor.amount_paid = debtor.amount_paid + amount_paid
+            debtor.unpaid_amount = debtor.unpaid_amount + (sale.sales_value - amount_paid)
+        else:
+            name = form.name.data
+            company_name = form.company_name.data
+            phone_number = form.phone_number.data
+            amount_paid = amount_paid
+            unpaid_amount = sale.sales_value - amount_paid
+            account_symbol = 'GNF'
+            debtor = Debtor(name=name, company_name=company_name, phone_number=phone_number,
+                            amount_paid=amount_paid, unpaid_amount=unpaid_amount, account_symbol=account_symbol)
+            db.session.add(debtor)
+        db.session.add(sale)
+        sale.debtor = debtor
+        sale.amount_paid = amount_paid
+        sale.credit_option = True
+        try:
+            checkout(sale, cart_items)
+        except CheckoutError as error:
+            db.session.rollback()
+            flash(str(error), "warning")
+        return redirect(url_for('shops.stock_sold', shop_id=shop_id))
+    return render_template('debt_registration.html', form=form)
+
+
+# Stock of the items matching the searched term at every shop, for the search box of the shop page
+@bp.route('/get_shops_stock', methods=['GET', 'POST'])
+@login_required
+def get_shops_stock():
+    limit = search_limit()
+    response = []
+    for item in stock_availability(request.json["searched_term"], limit, located_at='shops'):
+        shops = ", ".join(f"{shop['name']}: {shop['quantity']}" for shop in item["shops"])
+        response.append({"name": f"{item['name']} ({shops})", "shops": item["shops"]})
+    return search_results(response, limit)
+
+
+# Items matching the searched term that are in stock somewhere, with the quantity held at each shop and store
+@bp.route('/stock_availability', methods=['POST'])
+@login_required
+def get_stock_availability():
+    limit = search_limit()
+    return search_results(stock_availability(request.json["searched_term"], limit), limit)
+
+
+# Saving daily count of all items in the shop as submitted by the shopkeeper
+@bp.route('/save_daily_count', methods=['POST'])
+def save_daily_count():
+    shop_id = session.get("shop_id")
+    if shop_id is None:
+        return jsonify({"errors": [{"row": None, "error": "No shop selected."}]}), 400
+    errors = save_daily_count_data(shop_id, request.get_json(silent=True))
+    if errors:
+        return jsonify({"shop_id": shop_id, "errors": errors}), 400
+    return jsonify({"shop_id": shop_id})
+
+
+# Getting item in stock sent from a store to a shop (Stockout)
+@bp.route('/get_stock_sent_items', methods=['GET', 'POST'])
+def get_stock_sent_items():
+    limit = search_limit()
+    item_name = request.json["item_name"]
+    shop_id = request.json["shop_id"]
+    shop = Shop.query.get_or_404(shop_id)
+    stock_sent = StockOut.query.filter(StockOut.is_received == False, StockOut.shop_id == shop.id,
+                                       func.lower(StockOut.item_name).contains(item_name.lower(), autoescape=True)) \
+        .limit(limit).all()
+    response = [{"name": f"{item.item_name} ({item.item_quantity})"} for item in stock_sent]
+    return search_results(response, limit)
+
+
+# Remove unwanted item s from cart items list
+@bp.route('/<int:shop_id>/remove_cart_item/<int:item_id>', methods=['GET', 'POST'])
+@login_required
+def remove_cart_item(shop_id, item_id):
+    item = StockSold.query.filter_by(sale_id=None, id=item_id, shop_id=shop_id).first()
+    db.session.delete(item)
+    db.session.commit()
+    return redirect(url_for('shops.stock_sold', shop_id=shop_id))
+
+
+def get_daily_count(shop_id):
+    shop = Shop.query.get_or_404(shop_id)
+    count_comparison_lookup = {}
+    date_today = datetime.now()
+    start_date = date_today - timedelta(days=7)
+    daily_counts = DailyCount.query.options(joinedload(DailyCount.daily_count_item).joinedload(ShopItem.item)) \
+        .filter(DailyCount.date >= start_date, DailyCount.shop_id == shop_id).order_by(DailyCount.date.desc()).all()
+    if daily_counts:
+        shop_item_ids = {item_id for (item_id,) in db.session.query(ShopItem.item_id).filter_by(shop_id=shop_id)}
+        for item in daily_counts:
+            item_name = item.daily_count_item.item.item_name
+            item_id = item.daily_count_item.item.id
+            date = item.date.strftime("%Y-%m-%d")
+
+            if item_id in shop_item_ids:
+                if date in count_comparison_lookup:
+                    if item_name not in count_comparison_lookup[date]:
+                        count_comparison_lookup[date][item_name] = [item.base_count, item.count, item_id]
+                else:
+                    count_comparison_lookup[date] = {item_name: [item.base_count, item.count, item_id]}
+    return count_comparison_lookup
+
+
+# Show daily count from each shop 7 days
+@bp.route('/<int:shop_id>/view_daily_count', methods=['GET'])
+@login_required
+def view_daily_count(shop_id):
+    shop = Shop.query.get_or_404(shop_id)
+    count_comparison_lookup = get_daily_count(shop_id)  # Call the get_daily_count function
+    return render_template('view_daily_count.html', count_comparison_lookup=count_comparison_lookup, shop=shop)
+
+
+# Get items transfered from another shop
+@bp.route('/get_transferred_items', methods=['GET', 'POST'])
+def get_transfered_items():
+    limit = search_limit()
+    item_name = request.json["item_name"]
+    shop_id = request.json["shop_id"]
+    shop = Shop.query.get_or_404(shop_id)
+    stock_sent = TransferStock.query \
+        .filter(TransferStock.is_received == False, TransferStock.transfer_to_id == shop.id,
+                func.lower(TransferStock.item_name).contains(item_name.lower(), autoescape=True)) \
+        .limit(limit).all()
+    response = [{"name": f"{item.item_name} ({item.item_quantity})"} for item in stock_sent]
+    return search_results(response, limit)
+
+
+# Harmonize differences in daily count submitted by shopkeepers and item quantity in the system
+@bp.route('/<int:shop_id>/<int:item_id>/void_count_differences', methods=['GET', 'POST'])
+@login_required
+def void_count_differences(shop_id, item_id):
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        count_comparison_lookup = get_daily_count(shop_id)
+
+        for date, items in count_comparison_lookup.items():
+            if date == datetime.now().strftime("%Y-%m-%d"):  # Only make changes for the current date
+                for item_name, values in items.items():
+                    if values[2] == item_id:  # Check if the item ID matches the clicked item
+                        shop_item = ShopItem.query.filter_by(shop_id=shop_id, item_id=item_id).first()
+                        base_count = values[0]
+                        item_daily_count = values[1]
+
+                        if base_count != item_daily_count:
+                            difference = item_daily_count - base_count
+                            item = CountDifference.query.filter_by(shop_id=shop_id,
+                                                                   shop_item_id=shop_item.id).first()
+                            if item:
+                                item.quantity += difference
+                            else:
+                                count_difference = CountDifference(quantity=difference, shop_id=shop_id,
+                                                                   shop_item_id=shop_item.id)
+                                db.session.add(count_difference)
+
+                            # The difference counted is applied rather than the count itself, so sales made
+                            # since the count are not undone
+                            add_stock(ShopItem, shop_id, item_id, difference, shop_item.item.item_cost_price,
+                                      running_out_below=40)
+                            # Update the item quantity in the dictionary
+                            daily_counts = DailyCount.query.filter(DailyCount.shop_item_id == shop_item.id,
+                                                                   DailyCount.shop_id == shop_id) \
+                                .order_by(DailyCount.date.desc()).all()
+                            for item in daily_counts:
+                                if item.date.strftime("%Y-%m-%d") == date:
+                                    item.base_count = item.count
+                            db.session.commit()
+        return redirect(url_for('shops.view_daily_count', shop_id=shop_id))
+
+
+# List lost items for every shop for the last 30 days
+@bp.route('/view_lost_items', methods=['GET'])
+@login_required
+@cached_page('count_difference', 'shop', 'shop_item', 'item')
+def view_lost_items():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        lost_items_lookup = dict()
+        total_value_lookup = dict()
+        current_date = datetime.now()
+        start_time = current_date - timedelta(days=30)
+        lost_items = CountDifference.query \
+            .options(joinedload(CountDifference.difference_item),
+                     joinedload(CountDifference.shop_item).joinedload(ShopItem.item)) \
+            .filter(CountDifference.date >= start_time).order_by(CountDifference.date.desc()).all()
+        for item in lost_items:
+            shop_name = item.difference_item.shop_name
+            date = item.date.strftime("%Y-%m-%d")
+            product = item.shop_item.item
+            item_name = product.item_name
+
+            # Calculate the value of the lost item for this specific entry
+            lost_item_value = item.quantity * product.item_cost_price
+
+            # Update the total value for the shop in the total_value_lookup dictionary
+            if shop_name in total_value_lookup:
+                total_value_lookup[shop_name] += lost_item_value
+            else:
+                total_value_lookup[shop_name] = lost_item_value
+
+            # Update the lost_items_lookup dictionary
+            if shop_name in lost_items_lookup:
+                if date in lost_items_lookup[shop_name]:
+                    lost_items_lookup[shop_name][date][item_name] = [item.quantity, product.item_cost_price, product.id]
+                else:
+                    lost_items_lookup[shop_name][date] = {
+                        item_name: [item.quantity, product.item_cost_price, product.id]}
+            else:
+                lost_items_lookup[shop_name] = {date: {item_name: [item.quantity, product.item_cost_price, product.id]}}
+        return render_template('view_lost_items.html', lost_items_lookup=lost_items_lookup,
+                               total_value_lookup=total_value_lookup)
+
+
+@bp.route('/edit_stock_from_shop/<int:item_id>', methods=['GET', 'POST'])
+@login_required
+def edit_stock_from_shop(item_id):
+    item = TransferStock.query.get(item_id)
+    form = UpdateTransferStockForm()
+    form.populate_shop_choices()
+
+    if request.method == 'GET':
+        form.item_name.data = item.item_name
+        form.item_quantity.data = item.item_quantity
+        form.shop.data = item.transfer_to_id  # Set the selected shop based on item's shop_id
+
+    if request.method == 'POST':
+        item.item_name = form.item_name.data
+        item.item_id = db.session.query(Item.id).filter_by(item_name=form.item_name.data).scalar()
+        item.item_quantity = form.item_quantity.data
+        item.transfer_to_id = form.shop.data
+        db.session.commit()
+        return redirect(url_for('shops.transfer_stock', shop_id=item.transfer_from.id))
+    return render_template('update_transfer_stock.html', form=form, item=item)
+
+
+@bp.route('/edit_shop/<int:shop_id>', methods=['GET', 'POST'])
+@login_required
+def edit_shop(shop_id):
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        shop = Shop.query.get(shop_id)
+        form = ShopRegistrationForm()
+        if request.method == 'GET':
+            form.shop_name.data = shop.shop_name
+            form.location.data = shop.location
+        if request.method == 'POST':
+            shop.shop_name = form.shop_name.data
+            shop.location = form.location.data
+            db.session.commit()
+            return redirect(url_for('shops.view_shops'))
+        form.submit.label.text = 'Update Changes'
+        return render_template('register_shop.html', form=form)
+
+
+@bp.route('/<int:shop_id>/delete_shop_stock/<int:item_id>', methods=['GET', 'POST'])
+@login_required
+def delete_shop_stock(shop_id, item_id):
+    shop_item = ShopItem.query.get_or_404(item_id)
+    delete_stock(ShopItem, shop_item.shop_id, shop_item.item_id, shop_item.item.item_cost_price)
+    db.session.commit()
+    return redirect(url_for('shops.view_shop', shop_id=shop_id))
+
+
+@bp.route('/update_lost_items/<int:item_id>', methods=['GET', 'POST'])
+@login_required
+def update_lost_items(item_id):
+    form = StockFromShopForm()
+    item = Item.query.get_or_404(item_id)
+    print(item.item_name)
+    shop_item = ShopItem.query.filter_by(item_id=item.id).first()
+    print(shop_item.id)
+    shop_id = shop_item.shop_id
+    shop = Shop.query.get_or_404(shop_id)
+    print(shop.shop_name)
+    count_difference = CountDifference.query.filter_by(shop_item_id=shop_item.id, shop_id=shop.id).first()
+    print(count_difference.quantity)
+    if request.method == 'GET':
+        form.item_name.data = item.item_name
+        form.item_quantity.data = count_difference.quantity
+
+    if request.method == 'POST':
+        count_difference.quantity = form.item_quantity.data
+        count_difference.shop_id = shop.id
+        count_difference.shop_item_id = shop_item.id
+        db.session.commit()
+        return redirect(url_for('shops.view_lost_items'))
+    form.item_quantity.label.text = 'Count'
+    form.submit.label.text = 'Update Changes'
+    return render_template('update_lost_items.html', form=form, shop=shop, item=item)
+
+
+# View items in a sale
+@bp.route('/<sale_id>/view_sale_items', methods=['GET'])
+@login_required
+def view_sale_items(sale_id):
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        sale = Sale.query.get(sale_id)
+        return render_template('view_sale_items.html', sale=sale)
+
+
+# Edit items in a sale
+@bp.route('/<int:item_id>/edit_sale_item/<int:shop_id>', methods=['GET', 'POST'])
+@login_required
+def edit_sale_item(item_id, shop_id):
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        item_sold = StockSold.query.get(item_id)
+        # get item sold cost price by getting the item, by name for sales recorded before items were referenced by
+        # id and not backfilled yet
+        item = item_sold.item or Item.query.filter_by(item_name=item_sold.item_name).first()
+        if item is None:
+            abort(404)
+        shop = Shop.query.get_or_404(shop_id)
+        form = ShopStockSoldForm()
+        if request.method == 'GET':
+            form.item_name.data = item_sold.item_name
+            form.item_quantity.data = item_sold.item_quantity
+            form.item_discount.data = item_sold.item_discount
+
+        if request.method == 'POST':
+            # First remove the item from sale and shop item quantity
+            sale = Sale.query.get_or_404(item_sold.sale_id)
+            record_sale(sale, sign=-1)  # Take the sale out of the daily summary and add it back once edited
+            old_value = item_sold.item_quantity * (item.item_selling_price - item_sold.item_discount)
+            sale.sales_value -= old_value
+
+            # Put the quantity sold back into the shop stock
+            add_stock(ShopItem, shop.id, item.id, item_sold.item_quantity, item.item_cost_price,
+                      running_out_below=40)
+
+            item = Item.query.filter_by(item_name=form.item_name.data).first()
+            if item.id != item_sold.item_id:
+                item_sold.item_cost_price = item.item_cost_price
+                item_sold.item_selling_price = item.item_selling_price
+            item_sold.item_name = form.item_name.data
+            item_sold.item_id = item.id
+            item_sold.item_quantity = form.item_quantity.data
+            item_sold.item_discount = form.item_discount.data
+            item_sold.item_value = item_sold.item_quantity * (item.item_selling_price - item_sold.item_discount)
+
+            # Then take the new quantity out of the stock and update the sale and the account the sale was paid
+            # into, in the same transaction
+            new_value = item_sold.item_quantity * (item.item_selling_price - item_sold.item_discount)
+            sale.sales_value += new_value
+            try:
+                remove_stock(ShopItem, shop.id, {item.id: item_sold.item_quantity}, {item.id: item.item_cost_price})
+            except InsufficientStock:
+                db.session.rollback()
+                flash("No enough quantity in stock", "warning")
+                return render_template('edit_sale_item.html', form=form, shop=shop)
+            account = payment_account(sale.payment_method)
+            if account:
+                post_entry(f"Sale {sale.id} edited", {account.id: new_value - old_value},
+                           {'sales': old_value - new_value})
+            record_sale(sale)
+            db.session.commit()
+            return redirect(url_for('shops.stock_sold', shop_id=shop.id))
+        return render_template('edit_sale_item.html', form=form, shop=shop)
+
+
+# Edit daily count from shops
+@bp.route('/<int:item_id>/edit_daily_count/<int:shop_id>', methods=['GET', 'POST'])
+@login_required
+def edit_daily_count(item_id, shop_id):
+    shop = Shop.query.get_or_404(shop_id)
+    item = Item.query.get_or_404(item_id)
+    shop_item = ShopItem.query.filter_by(item_id=item.id).first()
+    daily_count = DailyCount.query.filter_by(shop_item_id=shop_item.id, shop_id=shop.id) \
+        .order_by(DailyCount.date.desc()).first()
+
+    form = UpdateDailyCountForm()
+    if request.method == 'GET':
+        form.item_name.data = item.item_name
+        form.count.data = daily_count.count
+
+    if request.method == 'POST':
+        item.item_name = item.item_name
+        daily_count.count = form.count.data
+        db.session.commit()
+        return redirect(url_for('shops.view_daily_count', shop_id=shop.id))
+    return render_template('edit_daily_count.html', form=form)
+
+
+@bp.route('/<int:shop_id>/view_sales', methods=['GET'])
+@login_required
+def view_sales(shop_id):
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        # Get the current date and determine the start of the current month and year
+        current_date = datetime.now()
+        start_of_month = current_date.replace(day=1)
+        start_of_year = current_date.replace(month=1, day=1)
+        current_year = current_date.year
+
+        # Fetch the daily sales totals of every seller in the shop for the current year
+        sales = db.session.query(DailyShopSummary.date, User.username, func.sum(DailyShopSummary.sales_value)) \
+            .outerjoin(User, DailyShopSummary.user_id == User.id) \
+            .filter(DailyShopSummary.date >= start_of_year.date(), DailyShopSummary.shop_id == shop_id) \
+            .group_by(DailyShopSummary.date, User.username).order_by(DailyShopSummary.date.desc()).all()
+
+        # Dictionary to store daily sales for the current month for each seller
+        daily_sales = {}
+
+        # Dictionary to store total monthly sales for the year for each seller
+        yearly_sales = {}
+
+        # Variable to store the total yearly sales for the entire shop
+        total_yearly_sales = 0
+
+        # Organize the daily totals by seller and date/month
+        for sale_day, username, sales_value in sales:
+            seller_name = username if username else 'Unknown'
+            sale_date = sale_day.strftime('%Y-%m-%d')  # Format as 'YYYY-MM-DD'
+            sale_month = sale_day.strftime('%B')  # Get month name (e.g., 'January')
+
+            # Calculate daily sales for the current month
+            if sale_day >= start_of_month.date():
+                if seller_name not in daily_sales:
+                    daily_sales[seller_name] = {}
+                if sale_date in daily_sales[seller_name]:
+                    daily_sales[seller_name][sale_date] += sales_value
+                else:
+                    daily_sales[seller_name][sale_date] = sales_value
+
+            # Calculate monthly sales for the year
+            if seller_name not in yearly_sales:
+                yearly_sales[seller_name] = {month: 0 for month in
+                                             ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+                                              'September', 'October', 'November', 'December']}
+
+            yearly_sales[seller_name][sale_month] += sales_value
+
+            # Add to the shop's total yearly sales
+            total_yearly_sales += sales_value
+
+        # Pass the calculated data to the template
+        return render_template(
+            'view_sales.html',
+            daily_sales=daily_sales,
+            yearly_sales=yearly_sales,
+            total_yearly_sales=total_yearly_sales,
+            current_year=current_year
+        )
+
+
+@bp.route('/<int:shop_id>/view_all_sales_items', methods=['GET'])
+@login_required
+def view_all_sales_items(shop_id):
+    current_date = datetime.now()
+    start_time = current_date - timedelta(days=7)
+    sales = Sale.query.options(selectinload(Sale.sale_items)) \
+        .filter(Sale.date_sold >= start_time, Sale.shop_id == shop_id).order_by(Sale.date_sold.desc()).all()
+    return render_template('view_all_sales_items.html', sales=sales)
@@ -0,0 +1,399 @@
+from flask import Blueprint, render_template, url_for, flash, redirect, request, jsonify
+from inventory import db
+from inventory.models import Shop, Store, Item, StockOut, StockIn, StoreItem, TrashLog, PriceLog, StoreStockTransfer
+from inventory.forms import (StoreRegistrationForm, StoreNewItemForm, StoreStockInForm, StoreStockOutForm,
+                             StockFromShopForm, UpdateStoreStockOutForm, UpdateStoreStockForm, StoreStockTransferForm)
+from flask_login import current_user, login_required
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import IntegrityError
+from inventory.costing import receive_delivery, revalue_item_stock
+from inventory.stock import add_stock, remove_stock, set_stock, delete_stock, mark_received, InsufficientStock
+from inventory.search import search_item_names
+from inventory.valuation import stock_valuations, location_valuation, NO_STOCK
+from inventory.page_cache import cached_page
+from inventory.views.common import today_date, search_limit, search_results
+
+bp = Blueprint('stores', __name__)
+
+
+# Get items to be received in a store
+@bp.route('/get_items', methods=['GET', 'POST'])
+def get_items():
+    limit = search_limit()
+    item_name = request.json["item_name"]
+    items = search_item_names(item_name, limit=limit)
+    response = [{"name": name} for _, name in items]
+    return search_results(response, limit)
+
+
+@bp.route('/register_store', methods=['GET', 'POST'])
+@login_required
+def register_store():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        form = StoreRegistrationForm()
+        if form.validate_on_submit():
+            store = Store(store_name=form.store_name.data, location=form.location.data, user_id=current_user.id)
+            db.session.add(store)
+            db.session.commit()
+            flash(f"{store.store_name} at {store.location} was successfully registered.", "success")
+            return redirect(url_for('stores.view_stores'))
+        return render_template('register_store.html', form=form)
+
+
+@bp.route('/view_stores', methods=['GET', 'POST'])
+@login_required
+@cached_page('store', 'store_item')
+def view_stores():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        stores = Store.query.all()
+        date = today_date()
+        valuations = stock_valuations(StoreItem)
+        store_stock_lookup = {store.id: valuations.get(store.id, NO_STOCK) for store in stores}
+        total_stock_value = sum(valuation.value for valuation in store_stock_lookup.values())
+        return render_template('view_stores.html', store_stock_lookup=store_stock_lookup, stores=stores, date=date,
+                               total_stock_value=total_stock_value)
+
+
+@bp.route('/view_stores/<int:store_id>', methods=['GET'])
+@login_required
+def view_store(store_id):
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        store = Store.query.get_or_404(store_id)
+        date = today_date()
+        store_items = StoreItem.query.options(joinedload(StoreItem.item)).filter_by(store_id=store.id).all()
+        total_stock_value = location_valuation(StoreItem, store.id).value
+        return render_template('view_store.html', store=store, total_stock_value=total_stock_value, date=date,
+                               store_items=store_items)
+
+
+@bp.route('/add_items', methods=['GET', 'POST'])
+@login_required
+def add_items():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        form = StoreNewItemForm()
+        if form.validate_on_submit():
+            item = Item(item_name=form.item_name.data, item_cost_price=form.item_cost_price.data,
+                        item_selling_price=form.item_selling_price.data)
+            try:
+                db.session.add(item)
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                flash('An error occurred while adding the item.', 'danger')
+            if form.item_selling_price.data < form.item_cost_price.data:
+                flash('Item Added successfully', 'success')
+                flash('NOTE: Selling Price is less than Cost Price', 'danger')
+            else:
+                flash('Item added successfully.', 'success')
+            return redirect(url_for('stores.add_items'))
+        return render_template('add_items.html', form=form)
+
+
+@bp.route('/view_items', methods=['GET', 'POST'])
+@login_required
+@cached_page('item')
+def view_items():
+    items = Item.query.all()
+    return render_template('view_items.html', items=items)
+
+
+@bp.route('/view_stores/<int:store_id>/stock_in', methods=['GET', 'POST'])
+@login_required
+def stock_in(store_id):
+    store = Store.query.get(store_id)
+    form = StoreStockInForm()
+    if form.validate_on_submit():
+        item = Item.query.filter_by(item_name=form.item_name.data).first()
+        item_received = StockIn(item_name=item.item_name, item_id=item.id, item_quantity=form.item_quantity.data,
+                                store_id=store.id)
+        db.session.add(item_received)
+        receive_delivery(store.id, item, form.item_quantity.data, form.new_price.data)
+        db.session.commit()
+        flash("Item added to stock", "success")
+        return redirect(url_for('stores.stock_in', store_id=store.id))
+
+    restock_lookup = {}
+    current_date = datetime.now()
+    restock_entries = StockIn.query.filter(StockIn.date_received <= current_date,
+                                           StockIn.store_id == store.id
+                                           ).order_by(StockIn.date_received.desc()).all()
+    for entry in restock_entries:
+        date = entry.date_received.date()
+        if date in restock_lookup:
+            restock_lookup[date].append(entry)
+        else:
+            restock_lookup[date] = [entry]
+
+    return render_template('stock_in.html', form=form, store=store, restock_lookup=restock_lookup)
+
+
+@bp.route('/view_stores/<int:store_id>/stock_out', methods=['GET', 'POST'])
+@login_required
+def stock_out(store_id):
+    store = Store.query.get_or_404(store_id)
+    form = StoreStockOutForm()
+    form.populate_shop_choices()
+    selected_shop_id = form.get_selected_shop_id()
+    shop = Shop.query.filter_by(id=selected_shop_id).first()
+    if form.validate_on_submit():
+        selected_name = form.item_name.data.split(" (")
+        item_name = selected_name[0]
+        item = Item.query.filter_by(item_name=item_name).first()
+        try:
+            remove_stock(StoreItem, store.id, {item.id: form.item_quantity.data}, {item.id: item.item_cost_price})
+        except InsufficientStock:
+            db.session.rollback()
+            flash("Quantity is more than available.", "warning")
+        else:
+            stock_out = StockOut(item_name=item_name, item_id=item.id, item_quantity=form.item_quantity.data,
+                                 store_id=store.id, shop_id=shop.id)
+            db.session.add(stock_out)
+            db.session.commit()
+            flash("Stock sent successfully", "success")
+            return redirect(url_for('stores.stock_out', store_id=store.id))
+
+    stock_out_lookup = {}
+
+    current_date = datetime.now()
+    stockout_entries = StockOut.query.filter(StockOut.date_sent <= current_date,
+                                             StockOut.store_id == store.id).order_by(StockOut.date_sent.desc()).all()
+    for entry in stockout_entries:
+        date = entry.date_sent.date()
+        if date in stock_out_lookup:
+            stock_out_lookup[date].append(entry)
+        else:
+            stock_out_lookup[date] = [entry]
+
+    return render_template('stock_out.html', form=form, stock_out_lookup=stock_out_lookup, shop=shop, store=store)
+
+
+@bp.route('/<int:stock_id>/edit_store_stock', methods=['GET', 'POST'])
+@login_required
+def edit_store_stock(stock_id):
+    stock = StoreItem.query.get_or_404(stock_id)
+    item = Item.query.get_or_404(stock.item_id)
+    store = Store.query.get_or_404(stock.store.id)
+    form = UpdateStoreStockForm()
+    if request.method == 'GET':
+        form.item_name.data = stock.item.item_name
+        form.item_quantity.data = stock.item_quantity
+    if form.validate_on_submit():
+        item.item_name = form.item_name.data
+        set_stock(StoreItem, store.id, item.id, form.item_quantity.data, item.item_cost_price, running_out_below=40)
+        db.session.commit()
+        return redirect(url_for('stores.view_store', store_id=store.id))
+    return render_template('update_store_stock.html', form=form, store=store)
+
+
+# Getting items in stores
+@bp.route('/get_store_items', methods=['GET', 'POST'])
+def get_store_items():
+    limit = search_limit()
+    item_name = request.json["item_name"]
+    store_id = request.json["store_id"]
+    store_quantities = dict(db.session.query(StoreItem.item_id, StoreItem.item_quantity)
+                            .filter(StoreItem.store_id == store_id, StoreItem.item_quantity > 0))
+    items = search_item_names(item_name, limit=limit, item_ids=set(store_quantities))
+    response = [{"name": f"{name} ({store_quantities[item_id]})"} for item_id, name in items]
+    return search_results(response, limit)
+
+
+# Get items transfered from another store
+@bp.route('/get_store_transferred_items', methods=['GET', 'POST'])
+def get_store_transferred_items():
+    limit = search_limit()
+    item_name = request.json["item_name"]
+    store_id = request.json["store_id"]
+    store = Store.query.get(store_id)
+    stock_sent = StoreStockTransfer.query \
+        .filter(StoreStockTransfer.is_received == False, StoreStockTransfer.transfer_to_id == store.id,
+                func.lower(StoreStockTransfer.item_name).contains(item_name.lower(), autoescape=True)) \
+        .limit(limit).all()
+    response = [{"name": f"{item.item_name} ({item.item_quantity})"} for item in stock_sent]
+    return search_results(response, limit)
+
+
+@bp.route('/edit_stock_from_store/<int:item_id>', methods=['GET', 'POST'])
+@login_required
+def edit_stock_from_store(item_id):
+    item = StockOut.query.get(item_id)
+    form = UpdateStoreStockOutForm()
+    form.populate_shop_choices()  # Populate the shop choices
+
+    if request.method == 'GET':
+        form.item_name.data = item.item_name
+        form.item_quantity.data = item.item_quantity
+        form.shop.data = item.shop_id  # Set the selected shop based on item's shop_id
+
+    if request.method == 'POST':
+        item.item_name = form.item_name.data
+        item.item_id = db.session.query(Item.id).filter_by(item_name=form.item_name.data).scalar()
+        item.item_quantity = form.item_quantity.data
+        item.shop_id = form.shop.data
+        db.session.commit()
+        return redirect(url_for('stores.stock_out', store_id=item.store.id))
+    return render_template('update_stock_out.html', form=form, item=item)
+
+
+@bp.route('/edit_item/<int:item_id>', methods=['GET', 'POST'])
+@login_required
+def edit_item(item_id):
+    item = Item.query.get(item_id)
+    form = StoreNewItemForm()
+    if request.method == 'GET':
+        form.item_name.data = item.item_name
+        form.item_cost_price.data = item.item_cost_price
+        form.item_selling_price.data = item.item_selling_price
+    if request.method == 'POST':
+        item.item_name = form.item_name.data
+        item.item_cost_price = form.item_cost_price.data
+        item.item_selling_price = form.item_selling_price.data
+
+        # Keep track of edited price
+        price_log = PriceLog(item_name=item.item_name, item_id=item.id, item_cost_price=item.item_cost_price,
+                             item_selling_price=item.item_selling_price)
+        db.session.add(price_log)
+
+        # Update item value in stores and shops
+        revalue_item_stock(item.id, item.item_cost_price)
+        db.session.commit()
+        return redirect(url_for('stores.view_items'))
+    form.submit.label.text = 'Update Changes'
+    return render_template('edit_item.html', form=form)
+
+
+@bp.route('/edit_store/<int:store_id>', methods=['GET', 'POST'])
+@login_required
+def edit_store(store_id):
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        store = Store.query.get(store_id)
+        form = StoreRegistrationForm()
+        if request.method == 'GET':
+            form.store_name.data = store.store_name
+            form.location.data = store.location
+        if request.method == 'POST':
+            store.store_name = form.store_name.data
+            store.location = form.location.data
+            db.session.commit()
+            return redirect(url_for('stores.view_stores'))
+        form.submit.label.text = 'Update Changes'
+        return render_template('register_store.html', form=form)
+
+
+@bp.route('/<int:store_id>/delete_store_stock/<int:item_id>', methods=['GET', 'POST'])
+@login_required
+def delete_store_stock(store_id, item_id):
+    store_item = StoreItem.query.get_or_404(item_id)
+    item = Item.query.filter_by(id=store_item.item_id).first()
+    trash_log = TrashLog(item_name=item.item_name, item_id=item.id, item_cost_price=item.item_cost_price,
+                         item_selling_price=item.item_selling_price, item_quantity=store_item.item_quantity)
+    db.session.add(trash_log)
+    delete_stock(StoreItem, store_item.store_id, store_item.item_id, item.item_cost_price)
+    db.session.commit()
+    return redirect(url_for('stores.view_store', store_id=store_id))
+
+
+@bp.route('/price_change_log', methods=['GET'])
+@login_required
+def price_change_log():
+    current_date = datetime.now()
+    start_time = current_date - timedelta(days=60)
+    price_changes = PriceLog.query.filter(PriceLog.date >= start_time).all()
+    return render_template('price_change.html', price_changes=price_changes)
+
+
+@bp.route('/trash', methods=['GET'])
+@login_required
+def trash():
+    current_date = datetime.now()
+    start_time = current_date - timedelta(days=60)
+    trash_items = TrashLog.query.filter(TrashLog.date >= start_time).all()
+    return render_template('trash.html', trash_items=trash_items)
+
+
+@bp.route('/<int:store_id>/transfer-store-stock', methods=['GET', 'POST'])
+@login_required
+def transfer_store_stock(store_id):
+    store_from = Store.query.get(store_id)
+    form = StoreStockTransferForm()
+    form.populate_store_choices()
+    selected_store_id = form.get_selected_store_id()
+    store_to = Store.query.get(selected_store_id)
+    if form.validate_on_submit():
+        selected_name = form.item_name.data.split(" (")
+        item_name = selected_name[0]
+        item = Item.query.filter_by(item_name=item_name).first()
+        if store_from.id != store_to.id:
+            try:
+                remove_stock(StoreItem, store_from.id, {item.id: form.item_quantity.data},
+                             {item.id: item.item_cost_price})
+            except InsufficientStock:
+                db.session.rollback()
+                flash("Quantity is more than available.", "warning")
+            else:
+                stock_sent = StoreStockTransfer(item_name=item_name, item_id=item.id,
+                                                item_quantity=form.item_quantity.data,
+                                                transfer_from_id=store_from.id, transfer_to_id=store_to.id)
+                db.session.add(stock_sent)
+                db.session.commit()
+                flash("Stock transferred successfully", "success")
+                return redirect(url_for('stores.transfer_store_stock', store_id=store_from.id))
+        else:
+            flash("Please select the right store.", "warning")
+
+    stock_transfered_lookup = {}
+
+    current_date = datetime.now()
+    stock_sent_entries = StoreStockTransfer.query.filter(StoreStockTransfer.date_sent <= current_date,
+                                                         StoreStockTransfer.transfer_from_id == store_from.id) \
+        .order_by(StoreStockTransfer.date_sent.desc()).all()
+    for entry in stock_sent_entries:
+        date = entry.date_sent.date()
+        if date in stock_transfered_lookup:
+            stock_transfered_lookup[date].append(entry)
+        else:
+            stock_transfered_lookup[date] = [entry]
+
+    return render_template('transfer_store_stock.html', form=form, stock_transfered_lookup=stock_transfered_lookup,
+                           store=store_from)
+
+
+@bp.route('/<int:store_id>/stock-from-store', methods=['GET', 'POST'])
+@login_required
+def stock_from_store(store_id):
+    store = Store.query.get(store_id)
+    form = StockFromShopForm()
+    if form.validate_on_submit():
+        selected_name = form.item_name.data.split(" (")
+        item_name = selected_name[0]
+        item = Item.query.filter_by(item_name=item_name).first()
+        item_sent = StoreStockTransfer.query.filter_by(is_received=False, item_id=item.id,
+                                                       item_quantity=form.item_quantity.data,
+                                                       transfer_to_id=store.id).first()
+        if item_sent and mark_received(StoreStockTransfer, item_sent.id):
+            item_received = StockIn(item_name=item.item_name, item_id=item.id,
+                                    item_quantity=form.item_quantity.data, store_id=store.id)
+            db.session.add(item_received)
+            add_stock(StoreItem, store.id, item.id, item_received.item_quantity, item.item_cost_price,
+                      running_out_below=40)
+            db.session.commit()
+            flash("Item added to stock", "success")
+        else:
+            flash("An error has occurred", "warning")
+        return redirect(url_for('stores.stock_from_store', store_id=store.id))
+
+    restock_lookup = {}
+    current_date = datetime.now()
+    restock_entries = StoreStockTransfer.query.filter(StoreStockTransfer.date_sent <= current_date,
+                                                      StoreStockTransfer.transfer_to_id == store.id,
+                                                      StoreStockTransfer.is_received == True) \
+        .order_by(StoreStockTransfer.date_sent.desc()).all()
+    for entry in restock_entries:
+        date = entry.date_sent.strftime("%d-%m-%Y")
+        if date in restock_lookup:
+            restock_lookup[date].append(entry)
+        else:
+            restock_lookup[date] = [entry]
+    return render_template('stock_from_store.html', form=form, store=store, restock_lookup=restock_lookup)
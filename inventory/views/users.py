@@ -0,0 +1,124 @@
+from flask import Blueprint, render_template, url_for, flash, redirect, request
+from inventory import bcrypt, db
+from inventory.models import User, Shop, Shopkeeper
+from inventory.forms import UserRegistrationForm, LoginForm, ShopKeeperRegistrationForm
+from flask_login import current_user, login_user, logout_user, login_required
+from inventory.identity import get_identity, forget_identity
+
+bp = Blueprint('users', __name__)
+
+
+@bp.route('/register_user', methods=['GET', 'POST'])
+@login_required
+def register_user():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        form = UserRegistrationForm()
+        user = User.query.filter_by(username=form.username.data).first()
+        if user:
+            flash("A user with this username exist. Try another name", "warning")
+        else:
+            if form.validate_on_submit():
+                hashed_password = bcrypt.generate_password_hash(form.password.data).decode('utf-8')
+                user = User(username=form.username.data, password=hashed_password, user_role=form.user_role.data)
+                db.session.add(user)
+                db.session.commit()
+                flash(f"{user.username} was registered successfully", "success")
+                return redirect(url_for('users.login'))
+        return render_template('register_user.html', form=form)
+
+
+@bp.route('/view_users', methods=['GET'])
+@login_required
+def view_users():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        users = User.query.all()
+        return render_template('view_users.html', users=users)
+
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        return redirect(url_for('main.home'))
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(username=form.username.data).first()
+        if user and bcrypt.check_password_hash(user.password, form.password.data):
+            login_user(user, remember=form.remember.data)
+            if user.user_role == 'Admin':
+                return redirect(url_for('main.home'))
+            else:
+                identity = get_identity(user.id)
+                if identity.shop_ids:
+                    return redirect(url_for('shops.stock_sold', shop_id=identity.shop_ids[0]))
+                else:
+                    flash('Shopkeeper not found.', 'danger')
+        else:
+            flash('Please check your username and password.', 'danger')
+    return render_template('login.html', form=form)
+
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    return redirect(url_for('users.login'))
+
+
+# Assign shopkeeper to a shop
+@bp.route('/<int:shop_id>/assign_shopkeeper', methods=['GET', 'POST'])
+@login_required
+def assign_shopkeeper(shop_id):
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        shop = Shop.query.get_or_404(shop_id)
+        form = ShopKeeperRegistrationForm()
+        form.populate_shopkeeper_choices()
+        selected_staff_id = form.get_selected_shopkeeper_id()
+        user = User.query.filter_by(id=selected_staff_id).first()
+
+        if form.validate_on_submit():
+            shopkeeper = Shopkeeper.query.filter_by(user_id=user.id, shop_id=shop.id).first()
+            if shopkeeper:
+                flash("This staff is already attached to this shop.", "danger")
+            else:
+                shopkeeper = Shopkeeper(user_id=user.id, shop_id=shop.id)
+                db.session.add(shopkeeper)
+                db.session.commit()
+                forget_identity(user.id)
+                return redirect(url_for('shops.view_shops'))
+
+        return render_template('assign_shopkeeper.html', shop=shop, form=form)
+
+
+# Remove a shopkeeper from a shop
+@bp.route('/remove_shopkeeper/<int:shopkeeper_id>', methods=['GET', 'POST'])
+@login_required
+def remove_shopkeeper(shopkeeper_id):
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        shopkeeper = Shopkeeper.query.get_or_404(shopkeeper_id)
+        if shopkeeper:
+            db.session.delete(shopkeeper)
+            db.session.commit()
+            forget_identity(shopkeeper.user_id)
+        else:
+            flash("Shopkeeper does not exist")
+        return redirect(url_for('shops.view_shops'))
+
+
+@bp.route('/edit_user/<int:user_id>', methods=['GET', 'POST'])
+@login_required
+def edit_user(user_id):
+    if current_user.is_authenticated and current_user.user_role == 'Admin':
+        user = User.query.get(user_id)
+        form = UserRegistrationForm()
+        if request.method == 'GET':
+            form.username.data = user.username
+            form.user_role.data = user.user_role
+        if request.method == 'POST':
+            user.username = form.username.data
+            user.password = bcrypt.generate_password_hash(form.password.data).decode('utf-8')
+            user.user_role = form.user_role.data
+            db.session.commit()
+            forget_identity(user.id)
+            return redirect(url_for('users.view_users'))
+        form.submit.label.text = 'Update Changes'
+        return render_template('register_user.html', form=form)
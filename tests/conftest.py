@@ -0,0 +1,180 @@
+from inventory import create_app, db, bcrypt, availability, identity, page_cache, search, valuation
+from inventory.models import User, Shop, Shopkeeper, Store, Item, ShopItem, StoreItem, Sale, StockSold, Account
+from flask.testing import FlaskClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from datetime import datetime
+import contextlib
+import os
+import pytest
+
+
+# Requests run in an app context of their own, as they do when served, instead of the one the test holds. They get
+# their own database session and g, so the user logged in for a request is never the one of an earlier request
+class RequestClient(FlaskClient):
+    def open(self, *args, **kwargs):
+        with self.application.app_context():
+            return super().open(*args, **kwargs)
+
+
+# Settings a test module needs when the app is built, e.g. to turn on METRICS_ENABLED. Modules override this fixture
+@pytest.fixture
+def app_config():
+    return {}
+
+
+# Every test gets an app on a new SQLite database file, so threads of the concurrency tests each get a connection of
+# their own. TEST_DATABASE_URI runs the tests against another database instead, e.g. an empty MySQL database
+@pytest.fixture
+def app(tmp_path, app_config):
+    app = create_app({
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'SECRET_KEY': 'test',
+        'BCRYPT_LOG_ROUNDS': 4,
+        'SQLALCHEMY_DATABASE_URI': os.environ.get('TEST_DATABASE_URI', f"sqlite:///{tmp_path / 'inventory.db'}"),
+        **app_config,
+    })
+    app.test_client_class = RequestClient
+    # Users, pages, search and stock caches kept in memory by an earlier test would belong to another database
+    identity._users.clear()
+    page_cache._pages.clear()
+    valuation._valuations.clear()
+    search._index = None
+    availability._snapshot = None
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# Log a test client in as a user without going through the login form
+@pytest.fixture
+def login():
+    def login(client, user):
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+        return client
+    return login
+
+
+@pytest.fixture
+def count_statements():
+    @contextlib.contextmanager
+    def counting():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(Engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, 'before_cursor_execute', record)
+    return counting
+
+
+def add_user(username, user_role):
+    user = User(username=username, password=bcrypt.generate_password_hash('password').decode(), user_role=user_role)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def admin(app):
+    return add_user('admin', 'Admin')
+
+
+@pytest.fixture
+def staff(app):
+    return add_user('staff', 'Staff')
+
+
+# Shops with a shopkeeper each
+@pytest.fixture
+def make_shop(admin):
+    def make_shop(name, shopkeeper=None):
+        shop = Shop(shop_name=name, location=name, user_id=admin.id)
+        db.session.add(shop)
+        db.session.flush()
+        db.session.add(Shopkeeper(shop_id=shop.id, user_id=(shopkeeper or admin).id))
+        db.session.commit()
+        return shop
+    return make_shop
+
+
+@pytest.fixture
+def make_store(admin):
+    def make_store(name):
+        store = Store(store_name=name, location=name, user_id=admin.id)
+        db.session.add(store)
+        db.session.commit()
+        return store
+    return make_store
+
+
+# An item with quantity in stock at every shop and store given
+@pytest.fixture
+def make_item(app):
+    def make_item(name, cost=100, price=150, quantity=100, shops=(), stores=()):
+        item = Item(item_name=name, item_cost_price=cost, item_selling_price=price)
+        db.session.add(item)
+        db.session.flush()
+        db.session.add_all(ShopItem(shop_id=shop.id, item_id=item.id, item_quantity=quantity,
+                                    item_value=quantity * cost, item_status='In Stock') for shop in shops)
+        db.session.add_all(StoreItem(store_id=store.id, item_id=item.id, item_quantity=quantity,
+                                     item_value=quantity * cost, stock_status='In Stock') for store in stores)
+        db.session.commit()
+        return item
+    return make_item
+
+
+@pytest.fixture
+def make_accounts(app):
+    def make_accounts(balance=0, names=('Cash', 'Orange Money', 'Bank')):
+        accounts = [Account(account_name=name, balance=balance) for name in names]
+        db.session.add_all(accounts)
+        db.session.commit()
+        return accounts
+    return make_accounts
+
+
+# Items waiting in a user's cart at a shop: (item, quantity) pairs
+@pytest.fixture
+def make_cart(app):
+    def make_cart(shop, user, items, discount=0):
+        cart = [StockSold(item_name=item.item_name, item_id=item.id, item_quantity=quantity, item_discount=discount,
+                          item_value=quantity * (item.item_selling_price - discount),
+                          item_cost_price=item.item_cost_price, item_selling_price=item.item_selling_price,
+                          shop_id=shop.id, user_id=user.id) for item, quantity in items]
+        db.session.add_all(cart)
+        db.session.commit()
+        return cart
+    return make_cart
+
+
+# A recorded sale, written directly without touching the stock or the accounts
+@pytest.fixture
+def make_sale(make_cart):
+    def make_sale(shop, user, items, date_sold=None, payment_method='Cash'):
+        cart = make_cart(shop, user, items)
+        value = sum(stock_sold.item_value for stock_sold in cart)
+        sale = Sale(sales_value=value, sales_discount=0, payment_method=payment_method, shop_id=shop.id,
+                    user_id=user.id, amount_paid=value, date_sold=date_sold or datetime.now())
+        db.session.add(sale)
+        db.session.flush()
+        for stock_sold in cart:
+            stock_sold.sale_id = sale.id
+        db.session.commit()
+        return sale
+    return make_sale
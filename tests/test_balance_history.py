@@ -0,0 +1,96 @@
+from inventory import db
+from inventory.models import AccountBalanceLog
+from inventory.balance_history import closing_balances
+from datetime import date, datetime, time, timedelta
+import random
+
+
+# The closing balances as view_accounts found them before the window query: every log of every account read newest
+# first, keeping the first balance seen on each day
+def closing_balances_by_scan(accounts):
+    balances = {}
+    for account in accounts:
+        balance_logs = AccountBalanceLog.query.filter(AccountBalanceLog.account_id == account.id).order_by(
+            AccountBalanceLog.timestamp.desc(), AccountBalanceLog.id.desc()).all()
+        for balance_log in balance_logs:
+            balances.setdefault(balance_log.timestamp.date(), {}).setdefault(account.id, balance_log.balance)
+    return {day: dict(sorted(day_balances.items())) for day, day_balances in sorted(balances.items(), reverse=True)}
+
+
+# Every page of the history, following the day each page says the older one starts from
+def closing_balances_by_page(days):
+    balances, until = closing_balances(days)
+    pages = [balances]
+    while until is not None:
+        balances, until = closing_balances(days, until)
+        pages.append(balances)
+    return pages
+
+
+def add_logs(logs):
+    db.session.add_all(AccountBalanceLog(account_id=account.id, timestamp=timestamp, balance=balance)
+                       for account, timestamp, balance in logs)
+    db.session.commit()
+
+
+def test_closing_balance_is_the_last_log_of_the_day(make_accounts):
+    cash, bank = make_accounts(names=('Cash', 'Bank'))
+    day = datetime(2024, 3, 4)
+    add_logs([(cash, day + timedelta(hours=9), 100), (cash, day + timedelta(hours=17), 300),
+              (cash, day + timedelta(hours=12), 200), (bank, day + timedelta(hours=8), 50),
+              (cash, day + timedelta(days=1, minutes=1), 400), (bank, day - timedelta(minutes=1), 40)])
+    # Logged in the same instant, the log written last is the closing one
+    add_logs([(bank, day + timedelta(hours=18), 60)])
+    add_logs([(bank, day + timedelta(hours=18), 70)])
+
+    balances, older = closing_balances(7)
+
+    assert balances == {date(2024, 3, 5): {cash.id: 400},
+                        date(2024, 3, 4): {cash.id: 300, bank.id: 70},
+                        date(2024, 3, 3): {bank.id: 40}}
+    assert older is None
+
+
+def test_pages_match_a_scan_of_every_log(make_accounts):
+    accounts = make_accounts()
+    generator = random.Random(18)
+    start = datetime(2024, 1, 1)
+    # Busy days with several logs per account, quiet days with a few, and weeks without any
+    days = [day for day in range(120) if not 30 <= day < 50 and not 80 <= day < 95 and generator.random() < 0.6]
+    logs = []
+    for day in days:
+        for _ in range(generator.choice([1, 2, 5, 12])):
+            timestamp = datetime.combine(start.date() + timedelta(days=day), time.min) + timedelta(
+                seconds=generator.randrange(86400))
+            logs.append((generator.choice(accounts), timestamp, generator.randrange(100000)))
+    generator.shuffle(logs)
+    add_logs(logs)
+
+    expected = closing_balances_by_scan(accounts)
+    for page_days in (1, 7, 14, 45):
+        pages = closing_balances_by_page(page_days)
+
+        found = {}
+        for page in pages:
+            assert page
+            assert list(page) == sorted(page, reverse=True)
+            assert not found.keys() & page.keys()
+            found.update(page)
+        assert found == expected
+        assert list(found) == list(expected)
+        # A page spans at most its days, and the days without logs between pages are skipped
+        assert all(min(page) > max(page) - timedelta(days=page_days) for page in pages)
+
+
+def test_history_without_logs_is_empty(app):
+    assert closing_balances(14) == ({}, None)
+    assert closing_balances(14, date(2024, 1, 1)) == ({}, None)
+
+
+def test_accounts_page_rejects_a_bad_day(client, login, admin, make_accounts):
+    make_accounts()
+    login(client, admin)
+
+    assert client.get('/view_accounts').status_code == 200
+    assert client.get('/view_accounts', query_string={'until': '2024-01-01'}).status_code == 200
+    assert client.get('/view_accounts', query_string={'until': 'yesterday'}).status_code == 400
@@ -0,0 +1,67 @@
+from inventory import db
+from inventory.checkout import checkout, CheckoutError
+from inventory.models import Sale, ShopItem, StockSold, Account, DailyShopSummary
+import pytest
+
+
+def new_sale(shop, user, cart, payment_method='Cash'):
+    value = sum(cart_item.item_value for cart_item in cart)
+    return Sale(sales_value=value, sales_discount=0, payment_method=payment_method, shop_id=shop.id, user_id=user.id,
+                amount_paid=value)
+
+
+def quantity_in_stock(shop, item):
+    return ShopItem.query.filter_by(shop_id=shop.id, item_id=item.id).one().item_quantity
+
+
+def test_checkout(admin, make_shop, make_item, make_accounts, make_cart):
+    make_accounts()
+    shop = make_shop("Shop 1")
+    bread = make_item("Bread", price=150, quantity=10, shops=[shop])
+    milk = make_item("Milk", price=200, quantity=10, shops=[shop])
+    cart = make_cart(shop, admin, [(bread, 2), (milk, 3), (bread, 1)])
+
+    sale = checkout(new_sale(shop, admin, cart), cart)
+
+    assert quantity_in_stock(shop, bread) == 7
+    assert quantity_in_stock(shop, milk) == 7
+    assert StockSold.query.filter_by(sale_id=sale.id).count() == 3
+    assert Account.query.filter_by(account_name='Cash').one().balance == 1050
+    summary = DailyShopSummary.query.filter_by(shop_id=shop.id).one()
+    assert (summary.sales_count, summary.sales_value) == (1, 1050)
+
+
+def test_checkout_refuses_more_than_in_stock(admin, make_shop, make_item, make_accounts, make_cart):
+    make_accounts()
+    shop = make_shop("Shop 1")
+    bread = make_item("Bread", quantity=10, shops=[shop])
+    milk = make_item("Milk", quantity=2, shops=[shop])
+    cart = make_cart(shop, admin, [(bread, 5), (milk, 3)])
+
+    with pytest.raises(CheckoutError, match="Milk"):
+        checkout(new_sale(shop, admin, cart), cart)
+    db.session.rollback()
+
+    assert quantity_in_stock(shop, bread) == 10
+    assert quantity_in_stock(shop, milk) == 2
+    assert Sale.query.count() == 0
+    assert Account.query.filter_by(account_name='Cash').one().balance == 0
+
+
+def test_checkout_queries_do_not_grow_with_the_cart(admin, make_shop, make_item, make_accounts, make_cart,
+                                                    count_statements):
+    make_accounts()
+    shop = make_shop("Shop 1")
+    items = [make_item(f"Item {index}", shops=[shop]) for index in range(30)]
+    cart = make_cart(shop, admin, [(items[0], 1)])
+    checkout(new_sale(shop, admin, cart), cart)  # The first sale of the day also adds the daily summary
+
+    counts = []
+    for size in (1, 10, 30):
+        cart = make_cart(shop, admin, [(item, 1) for item in items[:size]])
+        sale = new_sale(shop, admin, cart)
+        with count_statements() as statements:
+            checkout(sale, cart)
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1] == counts[2]
@@ -0,0 +1,85 @@
+from inventory import db
+from inventory.daily_counts import parse_count, validate_daily_count, save_daily_count_data
+from inventory.models import Item, ShopItem, DailyCount
+from sqlalchemy import insert
+import time
+import pytest
+
+
+@pytest.mark.parametrize('value, count', [
+    ("5", 5), (" 7 ", 7), ("-3", -3), (12, 12), ("0", 0),
+    ("--5", None), ("-", None), ("", None), ("5.0", None), ("1e3", None), ("+5", None), ("٣", None),
+    (5.0, None), (True, None), (None, None), ([5], None),
+])
+def test_parse_count(value, count):
+    assert parse_count(value) == count
+
+
+def test_every_bad_row_is_reported(make_shop, make_item):
+    shop, other_shop = make_shop("Shop 1"), make_shop("Shop 2")
+    make_item("Bread", shops=[shop])
+    make_item("Milk", shops=[shop])
+    make_item("Rice", shops=[other_shop])
+    bread, milk, rice = (stock.id for stock in ShopItem.query.order_by(ShopItem.id))
+
+    rows, errors = validate_daily_count(shop.id, [
+        {"item_id": bread, "count": "--5"},
+        {"item_id": milk, "count": -2},
+        {"item_id": milk, "count": 4},
+        {"item_id": milk, "count": 6},
+        {"item_id": "x", "count": 1},
+        "Bread",
+        {"item_id": rice, "count": 3},
+    ])
+
+    assert [(error["row"], error["error"]) for error in errors] == [
+        (0, "The count must be a whole number of 0 or more."),
+        (1, "The count must be a whole number of 0 or more."),
+        (3, "The item is counted more than once."),
+        (4, "Invalid item."),
+        (5, "Invalid row."),
+        (6, "The item is not in this shop."),
+    ]
+    assert [(row["shop_item_id"], row["count"], row["base_count"]) for row in rows] == [(milk, 4, 100)]
+
+
+def test_nothing_is_saved_with_a_bad_row(client, login, admin, make_shop, make_item):
+    shop = make_shop("Shop 1")
+    make_item("Bread", shops=[shop])
+    bread = ShopItem.query.one().id
+    login(client, admin)
+    with client.session_transaction() as session:
+        session['shop_id'] = shop.id
+
+    response = client.post('/save_daily_count', json=[{"item_id": bread, "count": "--5"}])
+    assert response.status_code == 400
+    assert response.json["errors"][0]["row"] == 0
+    assert client.post('/save_daily_count', json={"item_id": bread}).status_code == 400
+    assert DailyCount.query.count() == 0
+
+    response = client.post('/save_daily_count', json=[{"item_id": bread, "count": "95"}])
+    assert response.status_code == 200
+    assert [(count.count, count.base_count) for count in DailyCount.query] == [(95, 100)]
+
+
+# A shop counting 5,000 items: one query loads them all and one bulk insert saves the counts, whatever their number
+def test_large_count_is_saved_in_two_statements(make_shop, count_statements):
+    shop = make_shop("Shop 1")
+    db.session.execute(insert(Item), [{"item_name": f"Item {index}", "item_cost_price": 100,
+                                       "item_selling_price": 150} for index in range(5000)])
+    db.session.execute(insert(ShopItem), [{"shop_id": shop.id, "item_id": item_id, "item_quantity": 50,
+                                           "item_value": 5000, "item_status": 'In Stock'}
+                                          for (item_id,) in db.session.query(Item.id)])
+    db.session.commit()
+    payload = [{"item_id": shop_item_id, "count": 48} for (shop_item_id,) in db.session.query(ShopItem.id)]
+    shop_id = shop.id
+
+    started = time.perf_counter()
+    with count_statements() as statements:
+        errors = save_daily_count_data(shop_id, payload)
+    elapsed = time.perf_counter() - started
+
+    assert errors == []
+    assert len(statements) == 2
+    assert DailyCount.query.count() == 5000
+    print(f"5,000 counts saved in {elapsed:.3f}s")
@@ -0,0 +1,39 @@
+from inventory.dashboard import dashboard_metrics
+from datetime import datetime, timedelta
+
+
+def test_dashboard_metrics(make_shop, make_item, make_sale, admin):
+    shop = make_shop("Shop 1")
+    bread = make_item("Bread", price=150, shops=[shop])
+    milk = make_item("Milk", price=200, shops=[shop])
+    make_sale(shop, admin, [(bread, 2), (milk, 1)])
+    make_sale(shop, admin, [(bread, 3)], date_sold=datetime.now() - timedelta(days=2))
+    make_shop("Shop 2")
+
+    metrics = dashboard_metrics()
+
+    assert metrics['total_sales_value'] == 500  # Today's sales only
+    assert metrics['total_stock_value'] == 2 * 100 * 100
+    assert metrics['top_5_items_sold'] == {"Bread": 5, "Milk": 1}
+    assert metrics['sorted_total_shop_sales_lookup'] == {"Shop 1": 6, "Shop 2": 0}
+
+
+def test_dashboard_queries_do_not_grow_with_shops_and_sales(client, login, admin, make_shop, make_item, make_sale,
+                                                           count_statements):
+    login(client, admin)
+    shop = make_shop("Shop 1")
+    item = make_item("Bread", shops=[shop])
+    make_sale(shop, admin, [(item, 1)])
+    client.get('/')  # The logged in user is loaded once, then kept in memory
+    with count_statements() as few:
+        assert client.get('/').status_code == 200
+
+    for number in range(2, 12):
+        shop = make_shop(f"Shop {number}")
+        items = [make_item(f"Item {number}-{index}", shops=[shop]) for index in range(3)]
+        for day in range(5):
+            make_sale(shop, admin, [(item, day + 1) for item in items], date_sold=datetime.now() - timedelta(days=day))
+    with count_statements() as many:
+        assert client.get('/').status_code == 200
+
+    assert len(many) == len(few)
@@ -0,0 +1,141 @@
+from inventory import db
+from inventory.events import EventBus, bus, queue_event, event_stream
+import json
+import pytest
+
+
+@pytest.fixture
+def app_config():
+    return {'LIVE_EVENTS_ENABLED': True, 'EVENT_STREAM_HEARTBEAT': 0.05, 'EVENT_STREAM_DURATION': 0.2}
+
+
+def drain(subscriber):
+    entries = []
+    while not subscriber.empty():
+        entries.append(subscriber.get_nowait())
+    return entries
+
+
+# The events of a stream as (id, kind, data), leaving out the retry and keep-alive lines
+def parse_stream(text):
+    events = []
+    for block in text.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(("retry", ":")))
+        if fields:
+            events.append((fields["id"], fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_subscribers_get_every_event_published_after_they_subscribe():
+    events = EventBus()
+    events.publish('sale', {"id": 1})
+    subscriber, missed = events.subscribe()
+    events.publish('sale', {"id": 2}, shop_id=3)
+
+    assert missed == []
+    assert drain(subscriber) == [(2, 'sale', {"id": 2}, 3)]
+    assert events.position() == f"{events.token}-2"
+
+    events.unsubscribe(subscriber)
+    events.publish('sale', {"id": 3})
+    assert drain(subscriber) == []
+
+
+def test_a_page_reconnecting_gets_the_events_it_missed():
+    events = EventBus(history_size=3)
+    position = events.position()
+    for number in range(1, 4):
+        events.publish('stock', {"id": number})
+
+    assert events.subscribe(position)[1] == [(number, 'stock', {"id": number}, None) for number in (1, 2, 3)]
+    assert events.subscribe(f"{events.token}-2")[1] == [(3, 'stock', {"id": 3}, None)]
+    assert events.subscribe(events.position())[1] == []
+
+
+@pytest.mark.parametrize('last_event_id', ["other-1", "garbage", "{token}-x", "{token}--1", "{token}-9"])
+def test_an_unknown_position_asks_for_a_reload(last_event_id):
+    events = EventBus()
+    events.publish('sale', {})
+
+    assert events.subscribe(last_event_id.format(token=events.token))[1] is None
+
+
+def test_a_position_older_than_the_history_asks_for_a_reload():
+    events = EventBus(history_size=2)
+    for number in range(4):
+        events.publish('sale', {"id": number})
+
+    assert events.subscribe(f"{events.token}-1")[1] is None
+    assert [entry[0] for entry in events.subscribe(f"{events.token}-2")[1]] == [3, 4]
+
+
+def test_a_slow_page_is_dropped_and_told_to_reload():
+    events = EventBus(queue_size=2)
+    slow, _ = events.subscribe()
+    for number in range(4):
+        events.publish('sale', {"id": number})
+
+    assert [entry and entry[0] for entry in drain(slow)] == [1, 2, None]
+    assert slow not in events.subscribers
+
+
+# Events are queued by the writes they describe, and go with them when those are rolled back
+def test_events_are_published_once_committed(make_accounts):
+    account, = make_accounts(names=('Cash',))
+    position = bus.last_id
+    account.balance = 10
+    db.session.flush()
+    queue_event('sale', {"id": 1})
+    db.session.rollback()
+    account.balance = 20
+    db.session.flush()
+    queue_event('sale', {"id": 2}, shop_id=5)
+    assert bus.last_id == position
+
+    db.session.commit()
+
+    assert [entry[1:] for entry in bus.history if entry[0] > position] == [('sale', {"id": 2}, 5)]
+
+
+def test_stream_replays_missed_events_of_the_pages_shops(monkeypatch):
+    events = EventBus()
+    monkeypatch.setattr('inventory.events.bus', events)
+    position = events.position()
+    events.publish('sale', {"id": 1}, shop_id=1)
+    events.publish('sale', {"id": 2}, shop_id=2)
+    events.publish('stock', {"id": 3})
+
+    text = "".join(event_stream(position, {1}, heartbeat=0.01, duration=0.03))
+    admin_text = "".join(event_stream(position, None, heartbeat=0.01, duration=0.03))
+
+    assert text.startswith("retry: 3000\n\n")
+    assert ": keep-alive\n\n" in text
+    assert parse_stream(text) == [(f"{events.token}-1", 'sale', {"id": 1})]
+    assert [event_id for event_id, _, _ in parse_stream(admin_text)] == [f"{events.token}-{n}" for n in (1, 2, 3)]
+    assert not events.subscribers
+
+
+def test_events_route_catches_up_from_the_last_event_id(client, login, admin, staff, make_shop):
+    shop = make_shop("Shop 1", shopkeeper=staff)
+    position = bus.position()
+    for shop_id in (shop.id, shop.id + 1):
+        queue_event('sale', {"shop": shop_id}, shop_id=shop_id)
+    db.session.commit()
+
+    response = login(client, staff).get('/events', headers={'Last-Event-ID': position})
+
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert [data for _, _, data in parse_stream(response.get_data(as_text=True))] == [{"shop": shop.id}]
+
+    response = login(client, admin).get('/events', query_string={'last_event_id': position})
+    assert [data for _, _, data in parse_stream(response.get_data(as_text=True))] == [{"shop": shop.id},
+                                                                                      {"shop": shop.id + 1}]
+
+    response = client.get('/events', headers={'Last-Event-ID': 'restarted-12'})
+    assert parse_stream(response.get_data(as_text=True)) == [(bus.position(), 'reload', {})]
+
+
+@pytest.mark.parametrize('app_config', [{}])
+def test_events_route_is_off_unless_enabled(client, login, admin):
+    assert login(client, admin).get('/events').status_code == 404
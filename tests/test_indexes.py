@@ -0,0 +1,83 @@
+from inventory import db
+from inventory.models import ShopItem
+from sqlalchemy import text, inspect
+from sqlalchemy.exc import IntegrityError
+import pytest
+
+
+# The lookups most pages make and the index each of them should use
+LOOKUPS = [
+    ("SELECT * FROM shop_item WHERE shop_id = 1 AND item_id = 2", 'ix_shop_item_shop_id_item_id'),
+    ("SELECT * FROM store_item WHERE store_id = 1 AND item_id = 2", 'ix_store_item_store_id_item_id'),
+    ("SELECT * FROM sale WHERE shop_id = 1 AND date_sold >= '2024-01-01' ORDER BY date_sold DESC",
+     'ix_sale_shop_id_date_sold'),
+    ("SELECT * FROM stock_sold WHERE sale_id IS NULL AND shop_id = 1 AND user_id = 1",
+     'ix_stock_sold_sale_id_shop_id_user_id'),
+    ("SELECT * FROM stock_sold WHERE sale_id = 1", 'ix_stock_sold_sale_id_shop_id_user_id'),
+    ("SELECT * FROM daily_count WHERE shop_id = 1 AND date >= '2024-01-01'", 'ix_daily_count_shop_id_date'),
+    ("SELECT * FROM stock_out WHERE is_received = 0 AND item_id = 1", 'ix_stock_out_is_received_item_id'),
+    ("SELECT * FROM transfer_stock WHERE is_received = 0 AND item_id = 1", 'ix_transfer_stock_is_received_item_id'),
+    ("SELECT * FROM store_stock_transfer WHERE is_received = 0 AND item_id = 1",
+     'ix_store_stock_transfer_is_received_item_id'),
+]
+
+
+# The indexes the database considers for a query: the whole plan on SQLite, the possible keys on MySQL
+def query_plan(sql):
+    if db.engine.dialect.name == 'sqlite':
+        return " ".join(row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    return " ".join(row._mapping['possible_keys'] or '' for row in db.session.execute(text(f"EXPLAIN {sql}")))
+
+
+@pytest.mark.parametrize('sql, index', LOOKUPS)
+def test_lookups_use_their_index(app, sql, index):
+    assert index in query_plan(sql)
+
+
+def test_stock_rows_are_unique_per_shop(make_shop, make_item):
+    shop = make_shop("Shop 1")
+    item = make_item("Bread", shops=[shop])
+
+    db.session.add(ShopItem(shop_id=shop.id, item_id=item.id, item_quantity=1, item_value=100))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_create_indexes_adds_the_missing_indexes(app):
+    db.session.execute(text("DROP INDEX ix_sale_shop_id_date_sold" if db.engine.dialect.name == 'sqlite'
+                            else "DROP INDEX ix_sale_shop_id_date_sold ON sale"))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['create-indexes'])
+
+    assert result.exit_code == 0
+    assert "Created ix_sale_shop_id_date_sold" in result.output
+    assert "Created 1 indexes" in result.output
+    assert 'ix_sale_shop_id_date_sold' in {index['name'] for index in inspect(db.engine).get_indexes('sale')}
+    assert "Created 0 indexes" in app.test_cli_runner().invoke(args=['create-indexes']).output
+
+
+def test_create_indexes_stops_on_duplicate_stock_rows(app, make_shop, make_item):
+    shop = make_shop("Shop 1")
+    item = make_item("Bread", shops=[shop])
+    db.session.execute(text("DROP INDEX ix_shop_item_shop_id_item_id" if db.engine.dialect.name == 'sqlite'
+                            else "DROP INDEX ix_shop_item_shop_id_item_id ON shop_item"))
+    db.session.add(ShopItem(shop_id=shop.id, item_id=item.id, item_quantity=1, item_value=100))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['create-indexes'])
+
+    assert result.exit_code != 0
+    assert f"shop_item: item {item.id} has more than one row at location {shop.id}" in result.output
+
+
+def test_create_indexes_stops_on_missing_columns(app):
+    db.session.execute(text("ALTER TABLE job DROP COLUMN date_started"))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['create-indexes'])
+
+    assert result.exit_code != 0
+    assert "job.date_started is missing" in result.output
+    assert "flask db upgrade" in result.output
@@ -0,0 +1,83 @@
+from inventory import db
+from inventory.jobs import job_type, run_job, fail_abandoned_job, evict_expired_jobs, ABANDONED_ERROR
+from inventory.models import Job
+from datetime import datetime, timedelta
+import json
+import uuid
+
+
+@job_type('sample_report')
+def sample_report_job(text, fail=False):
+    if fail:
+        raise ValueError("Nothing to report")
+    return 'report.txt', 'text/plain', text.encode()
+
+
+def add_job(status='Pending', created=0, started=None, **params):
+    now = datetime.now()
+    job = Job(id=uuid.uuid4().hex, kind='sample_report', params=json.dumps(dict({'text': "Sales"}, **params)),
+              status=status, date_created=now - timedelta(seconds=created),
+              date_started=None if started is None else now - timedelta(seconds=started))
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def test_run_job(app):
+    job = add_job()
+    run_job(app, job.id)
+
+    db.session.expire_all()
+    assert (job.status, job.filename, job.result) == ('Done', 'report.txt', b"Sales")
+    assert job.date_started <= job.date_finished
+
+
+def test_failed_job_keeps_its_error(app):
+    job = add_job(fail=True)
+    run_job(app, job.id)
+
+    db.session.expire_all()
+    assert (job.status, job.error) == ('Failed', "Nothing to report")
+
+
+# Only the time a job has been waiting or running counts, not how long ago it was submitted
+def test_abandoned_jobs_are_failed(app):
+    app.config['JOB_ABANDON_TIMEOUT'] = 60
+    waiting = add_job('Pending', created=120)
+    lost = add_job('Running', created=120, started=90)
+    running = add_job('Running', created=120, started=30)
+    queued = add_job('Pending', created=30)
+
+    evict_expired_jobs()
+
+    db.session.expire_all()
+    assert (waiting.status, waiting.error) == ('Failed', ABANDONED_ERROR)
+    assert (lost.status, lost.error) == ('Failed', ABANDONED_ERROR)
+    assert running.status == 'Running'
+    assert queued.status == 'Pending'
+    assert fail_abandoned_job(running).status == 'Running'
+
+
+def test_abandoned_job_is_not_finished_later(app):
+    app.config['JOB_ABANDON_TIMEOUT'] = 60
+    job = add_job('Pending', created=120)
+    fail_abandoned_job(job)
+    run_job(app, job.id)  # Picked up by a worker after it was failed
+    assert (job.status, job.result) == ('Failed', None)
+
+    job = add_job('Pending')
+
+    # The worker takes so long that the job is failed as abandoned while it runs
+    @job_type('slow_report')
+    def slow_report_job():
+        Job.query.filter_by(id=job.id).update({'date_started': datetime.now() - timedelta(seconds=90)})
+        db.session.commit()
+        fail_abandoned_job(db.session.get(Job, job.id))
+        return 'report.txt', 'text/plain', b"Late"
+
+    job.kind, job.params = 'slow_report', '{}'
+    db.session.commit()
+    run_job(app, job.id)
+
+    db.session.expire_all()
+    assert (job.status, job.error, job.result) == ('Failed', ABANDONED_ERROR, None)
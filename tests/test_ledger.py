@@ -0,0 +1,153 @@
+from inventory import db
+from inventory.ledger import post_entry, set_balance, LedgerError, InsufficientFunds
+from inventory.models import Account, AccountMovement, Debtor, Expense, JournalEntry, JournalLine
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+import random
+import threading
+import pytest
+
+
+def balances():
+    return {account.account_name: account.balance for account in Account.query.order_by(Account.id)}
+
+
+def test_post_entry(make_accounts):
+    cash, orange_money, _ = make_accounts(balance=1000)
+
+    entry = post_entry("Transfer", {cash.id: -300, orange_money.id: 300}, funded=True)
+    db.session.commit()
+
+    assert balances() == {'Cash': 700, 'Orange Money': 1300, 'Bank': 1000}
+    assert sorted((line.account_id, line.amount, line.balance) for line in entry.lines) == \
+        [(cash.id, -300, 700), (orange_money.id, 300, 1300)]
+
+
+def test_post_entry_refuses_unbalanced_and_unfunded_entries(make_accounts):
+    cash, orange_money, _ = make_accounts(balance=1000)
+
+    with pytest.raises(LedgerError, match="does not balance"):
+        post_entry("Transfer", {cash.id: -300, orange_money.id: 200})
+    with pytest.raises(InsufficientFunds, match="Cash"):
+        post_entry("Transfer", {cash.id: -1500, orange_money.id: 1500}, funded=True)
+    db.session.rollback()
+
+    assert balances() == {'Cash': 1000, 'Orange Money': 1000, 'Bank': 1000}
+    assert JournalEntry.query.count() == 0
+
+
+def test_set_balance_records_an_adjustment(make_accounts):
+    cash, _, _ = make_accounts(balance=1000)
+
+    entry = set_balance(cash.id, 800, "Counted")
+    db.session.commit()
+
+    assert balances()['Cash'] == 800
+    assert sorted((line.category or '', line.amount) for line in entry.lines) == [('', -200), ('adjustment', 200)]
+
+
+# Transfers between random accounts posted from threads of their own, as requests of several workers would. Whatever
+# the interleaving, no money is created or lost, no account goes below zero and every balance is what its journal says
+def test_concurrent_transfers_keep_the_totals(app, make_accounts):
+    account_ids = [account.id for account in make_accounts(balance=1000)]
+    errors = []
+    start = threading.Barrier(8)
+
+    def transfer(seed):
+        generator = random.Random(seed)
+        with app.app_context():
+            start.wait()
+            try:
+                for _ in range(100):
+                    transfer_from, transfer_to = generator.sample(account_ids, 2)
+                    amount = generator.randint(1, 300)
+                    while True:
+                        try:
+                            post_entry("Transfer", {transfer_from: -amount, transfer_to: amount}, funded=True)
+                            db.session.commit()
+                            break
+                        except InsufficientFunds:
+                            db.session.rollback()
+                            break
+                        except OperationalError:  # SQLite: another thread holds the write lock
+                            db.session.rollback()
+            except Exception as error:
+                errors.append(error)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=transfer, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    db.session.expire_all()
+    assert sum(balances().values()) == 3000
+    for account in Account.query:
+        moved = db.session.query(func.coalesce(func.sum(JournalLine.amount), 0)) \
+            .filter(JournalLine.account_id == account.id).scalar()
+        assert account.balance >= 0
+        assert account.balance == 1000 + moved
+    unbalanced = db.session.query(JournalLine.entry_id).group_by(JournalLine.entry_id) \
+        .having(func.abs(func.sum(JournalLine.amount)) > 1e-6).all()
+    assert unbalanced == []
+
+
+def test_account_transfer(client, login, admin, make_accounts):
+    cash, orange_money, _ = make_accounts(balance=1000)
+    login(client, admin)
+
+    response = client.post('/account_transfer', data={'amount': 400, 'transfer_from': cash.id,
+                                                      'transfer_to': orange_money.id, 'rate': 1})
+    assert response.status_code == 302
+    db.session.expire_all()
+    assert balances() == {'Cash': 600, 'Orange Money': 1400, 'Bank': 1000}
+    assert AccountMovement.query.count() == 1
+
+    response = client.post('/account_transfer', data={'amount': 5000, 'transfer_from': cash.id,
+                                                      'transfer_to': orange_money.id, 'rate': 1})
+    assert b"Insufficient funds" in response.data
+    assert b"Orange Money" in response.data  # The form still lists the accounts
+    db.session.expire_all()
+    assert balances() == {'Cash': 600, 'Orange Money': 1400, 'Bank': 1000}
+
+
+def test_expenses_cannot_overdraw_an_account(client, login, admin, make_accounts):
+    make_accounts(balance=1000)
+    login(client, admin)
+
+    response = client.post('/expenses', data={'account': 'Cash', 'amount': 5e12, 'description': "Rent"},
+                           follow_redirects=True)
+    assert b"No enough balance in the Cash account" in response.data
+    db.session.expire_all()
+    assert balances()['Cash'] == 1000
+    assert Expense.query.count() == 0
+
+    client.post('/expenses', data={'account': 'Cash', 'amount': 600, 'description': "Rent"})
+    expense = Expense.query.one()
+    response = client.post(f'/{expense.id}/edit_expense', data={'account': 'Cash', 'amount': 1200,
+                                                                'description': "Rent"}, follow_redirects=True)
+    assert b"No enough balance in the Cash account" in response.data
+    db.session.expire_all()
+    assert balances()['Cash'] == 400
+    assert expense.amount == 600
+
+    client.post(f'/{expense.id}/edit_expense', data={'account': 'Cash', 'amount': 1000, 'description': "Rent"})
+    db.session.expire_all()
+    assert balances()['Cash'] == 0
+    assert expense.amount == 1000
+
+
+def test_loans_cannot_overdraw_an_account(client, login, admin, make_accounts):
+    make_accounts(balance=1000)
+    login(client, admin)
+
+    response = client.post('/borrowers', data={'name': "Awa", 'phone_number': 620000000, 'amount': 1500,
+                                               'account': 'Cash'}, follow_redirects=True)
+
+    assert b"No enough balance in the Cash account" in response.data
+    db.session.expire_all()
+    assert balances()['Cash'] == 1000
+    assert Debtor.query.count() == 0
@@ -0,0 +1,111 @@
+from inventory.metrics import Metrics, LATENCY_BUCKETS
+import re
+import pytest
+
+SAMPLE = re.compile(r'^([a-z_]+)(?:\{((?:[a-z_]+="[^"]*",?)*)\})? (\S+)$')
+
+
+@pytest.fixture
+def app_config():
+    return {'METRICS_ENABLED': True, 'METRICS_TOKEN': 'scraper-token', 'SLOW_QUERY_MS': 0}
+
+
+# The samples of a Prometheus text exposition as (name, labels, value), checking every line is a comment or a sample
+def parse_exposition(text):
+    assert text.endswith("\n")
+    samples, types = [], {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            types[name] = kind
+        elif not line.startswith("# HELP "):
+            match = SAMPLE.match(line)
+            assert match, line
+            name, labels, value = match.groups()
+            labels = dict(re.findall(r'([a-z_]+)="([^"]*)"', labels or ""))
+            samples.append((name, labels, float(value)))
+            assert re.sub(r'_(bucket|count|sum)$', '', name) in types
+    return samples, types
+
+
+@pytest.mark.parametrize('app_config', [{'METRICS_TOKEN': 'scraper-token'}])
+def test_nothing_is_recorded_unless_enabled(app, client, login, admin):
+    login(client, admin)
+    client.get('/')
+
+    assert 'metrics' not in app.extensions
+    assert client.get('/metrics').status_code == 404
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scraper-token'}).status_code == 404
+    assert client.get('/slow_queries').status_code == 404
+
+
+def test_only_admins_and_the_scraper_can_read_metrics(client, login, admin, staff):
+    assert client.get('/metrics').status_code == 404
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 404
+
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scraper-token'})
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'text/plain; version=0.0.4; charset=utf-8'
+
+    assert login(client, staff).get('/metrics').status_code == 404
+    assert client.get('/slow_queries').status_code == 404
+    assert login(client, admin).get('/metrics').status_code == 200
+    assert client.get('/slow_queries').status_code == 200
+
+
+@pytest.mark.parametrize('app_config', [{'METRICS_ENABLED': True}])
+def test_no_token_lets_no_scraper_in(client):
+    assert client.get('/metrics', headers={'Authorization': 'Bearer None'}).status_code == 404
+    assert client.get('/metrics', headers={'Authorization': 'Bearer '}).status_code == 404
+
+
+def test_requests_and_statements_are_exposed(client, login, admin):
+    login(client, admin)
+    for _ in range(3):
+        assert client.get('/').status_code == 200
+
+    samples, types = parse_exposition(client.get('/metrics').get_data(as_text=True))
+
+    assert types == {'inventory_request_duration_seconds': 'histogram',
+                     'inventory_sql_statements_total': 'counter',
+                     'inventory_sql_duration_seconds_total': 'counter'}
+    home = {'endpoint': 'main.home', 'method': 'GET', 'status': '200'}
+    buckets = [(labels['le'], value) for name, labels, value in samples
+               if name == 'inventory_request_duration_seconds_bucket' and labels.items() > home.items()]
+    assert [le for le, _ in buckets] == [str(bound) for bound in LATENCY_BUCKETS] + ['+Inf']
+    assert [value for _, value in buckets] == sorted(value for _, value in buckets)
+    assert buckets[-1][1] == 3
+    assert ('inventory_request_duration_seconds_count', home, 3) in samples
+    assert [value for name, labels, value in samples
+            if name == 'inventory_request_duration_seconds_sum' and labels == home][0] > 0
+    statements = [value for name, labels, value in samples
+                  if name == 'inventory_sql_statements_total' and labels == {'endpoint': 'main.home'}]
+    assert statements and statements[0] >= 3
+
+
+def test_latencies_fall_in_the_first_bucket_they_fit():
+    metrics = Metrics(slow_query_ms=100, slow_query_log_size=2)
+    for seconds in (0.001, 0.005, 0.0051, 1, 60):
+        metrics.record_request('main.home', 'GET', 200, seconds)
+
+    samples, _ = parse_exposition(metrics.exposition())
+
+    counts = {labels['le']: value for name, labels, value in samples
+              if name == 'inventory_request_duration_seconds_bucket'}
+    assert counts['0.005'] == 2
+    assert counts['0.01'] == 3
+    assert counts['0.5'] == 3
+    assert counts['1'] == 4
+    assert counts['10'] == 4
+    assert counts['+Inf'] == 5
+    assert ('inventory_request_duration_seconds_sum', {'endpoint': 'main.home', 'method': 'GET', 'status': '200'},
+            round(0.001 + 0.005 + 0.0051 + 1 + 60, 6)) in samples
+
+
+def test_slow_queries_keep_the_slowest_recent_statements():
+    metrics = Metrics(slow_query_ms=100, slow_query_log_size=2)
+    for statement, seconds in (("SELECT 1", 0.5), ("SELECT 2", 0.05), ("SELECT 3", 0.2), ("SELECT 4", 0.3)):
+        metrics.record_statement('main.home', statement, (), seconds)
+
+    assert [query["statement"] for query in metrics.slowest_queries()] == ["SELECT 4", "SELECT 3"]
+    assert metrics.sql == {'main.home': [4, pytest.approx(1.05)]}
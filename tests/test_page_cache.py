@@ -0,0 +1,66 @@
+from inventory import db
+from inventory.models import Item
+
+
+def test_repeated_page_runs_no_statements(client, login, admin, make_item, count_statements):
+    make_item("Bread")
+    login(client, admin)
+
+    first = client.get('/view_items')
+    with count_statements() as statements:
+        second = client.get('/view_items')
+
+    assert second.status_code == 200
+    assert second.data == first.data
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert second.headers['Cache-Control'] == 'private, no-cache'
+    assert statements == []
+
+
+def test_unchanged_page_is_not_modified(client, login, admin, make_item, count_statements):
+    make_item("Bread")
+    login(client, admin)
+
+    etag = client.get('/view_items').headers['ETag']
+    with count_statements() as statements:
+        response = client.get('/view_items', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert statements == []
+
+
+def test_page_changes_with_its_tables(client, login, admin, make_item):
+    make_item("Bread")
+    login(client, admin)
+    etag = client.get('/view_items').headers['ETag']
+
+    db.session.add(Item(item_name="Milk", item_cost_price=100, item_selling_price=150))
+    db.session.commit()
+    response = client.get('/view_items', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert b"Milk" in response.data
+    assert response.headers['ETag'] != etag
+
+
+def test_pages_are_kept_per_user(client, login, admin, staff, make_item):
+    make_item("Bread")
+    login(client, admin)
+    admin_etag = client.get('/view_items').headers['ETag']
+
+    login(client, staff)
+    response = client.get('/view_items', headers={'If-None-Match': admin_etag})
+
+    assert response.status_code == 200
+
+
+def test_flashed_messages_are_not_kept(client, login, admin, make_item):
+    make_item("Bread")
+    login(client, admin)
+    client.get('/view_items')
+
+    with client.session_transaction() as session:
+        session['_flashes'] = [('info', "Item saved")]
+    assert b"Item saved" in client.get('/view_items').data
+    assert b"Item saved" not in client.get('/view_items').data
@@ -0,0 +1,106 @@
+from inventory import db
+from inventory.checkout import checkout
+from inventory.models import Sale, StockSold, DailyShopSummary
+from inventory.rollups import record_sale, rebuild_daily_summaries
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+import pytest
+
+
+# Summaries with sales, in a stable order (sales without a seller have no user_id)
+def summaries():
+    rows = [(str(summary.date), summary.shop_id, summary.user_id, summary.payment_method, summary.sales_count,
+             summary.sales_value, summary.sales_cost, summary.sales_discount)
+            for summary in DailyShopSummary.query if summary.sales_count]
+    return sorted(rows, key=lambda row: (row[0], row[1], row[2] or 0, row[3]))
+
+
+def sell(shop, user, cart, payment_method='Cash', discount=0, date_sold=None):
+    value = sum(cart_item.item_value for cart_item in cart) - discount
+    return checkout(Sale(sales_value=value, sales_discount=discount, payment_method=payment_method, shop_id=shop.id,
+                         user_id=user.id if user else None, amount_paid=value, date_sold=date_sold), cart)
+
+
+# The summaries kept up to date sale by sale are the ones rebuilt from the sales, once the rows of sales taken out
+# again (with a count of zero) are left aside
+def test_recorded_sales_match_the_rebuilt_summaries(client, login, admin, staff, make_shop, make_item, make_accounts,
+                                                    make_cart):
+    make_accounts()
+    shop_1, shop_2 = make_shop("Shop 1"), make_shop("Shop 2", shopkeeper=staff)
+    bread = make_item("Bread", cost=100, price=150, shops=[shop_1, shop_2])
+    milk = make_item("Milk", cost=120, price=200, shops=[shop_1, shop_2])
+    yesterday = datetime.now() - timedelta(days=1)
+
+    sell(shop_1, admin, make_cart(shop_1, admin, [(bread, 2), (milk, 1)]))
+    sell(shop_1, admin, make_cart(shop_1, admin, [(bread, 1)], discount=10), discount=5)
+    sell(shop_1, admin, make_cart(shop_1, admin, [(milk, 3)]), payment_method='Orange Money')
+    sell(shop_1, admin, make_cart(shop_1, admin, [(milk, 1)]), date_sold=yesterday)
+    sell(shop_2, staff, make_cart(shop_2, staff, [(bread, 4)]))
+    edited = sell(shop_2, staff, make_cart(shop_2, staff, [(bread, 1), (milk, 2)]))
+    sell(shop_2, None, make_cart(shop_2, staff, [(milk, 1)]))  # Sales without a seller share a row
+    sell(shop_2, None, make_cart(shop_2, staff, [(bread, 1)]))
+    deleted = sell(shop_1, admin, make_cart(shop_1, admin, [(bread, 5)]))
+
+    login(client, admin)
+    item_sold = StockSold.query.filter_by(sale_id=edited.id, item_id=milk.id).one()
+    response = client.post(f'/{item_sold.id}/edit_sale_item/{shop_2.id}',
+                           data={'item_name': "Bread", 'item_quantity': 3, 'item_discount': 20})
+    assert response.status_code == 302
+
+    db.session.expire_all()
+    deleted = db.session.get(Sale, deleted.id)
+    record_sale(deleted, sign=-1)
+    StockSold.query.filter_by(sale_id=deleted.id).delete()
+    db.session.delete(deleted)
+    db.session.commit()
+
+    recorded = summaries()
+    assert len([summary for summary in recorded if summary[2] is None]) == 1
+    rebuild_daily_summaries()
+    assert summaries() == recorded
+
+
+def test_summaries_are_unique_without_a_seller(make_shop):
+    shop = make_shop("Shop 1")
+    key = dict(date=datetime.now().date(), shop_id=shop.id, user_id=None, payment_method='Cash')
+    db.session.add(DailyShopSummary(**key, sales_count=1, sales_value=100, sales_cost=50, sales_discount=0))
+    db.session.commit()
+
+    db.session.add(DailyShopSummary(**key, sales_count=1, sales_value=100, sales_cost=50, sales_discount=0))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+# A concurrent first sale of the day, here without a seller, inserted the summary after the UPDATE found no row:
+# the INSERT is refused and the sale is added to that row instead
+def test_first_sale_of_the_day_joins_a_concurrent_insert(make_shop, monkeypatch):
+    shop = make_shop("Shop 1")
+    now = datetime.now()
+    db.session.add(DailyShopSummary(date=now.date(), shop_id=shop.id, user_id=None, payment_method='Cash',
+                                    sales_count=1, sales_value=100, sales_cost=50, sales_discount=0))
+    db.session.commit()
+    sale = Sale(sales_value=150, sales_discount=0, payment_method='Cash', shop_id=shop.id, amount_paid=150,
+                date_sold=now)
+    db.session.add(sale)
+    db.session.flush()
+
+    execute = db.session.execute
+    missed = []
+
+    class NoRows:
+        rowcount = 0
+
+    def execute_missing_first_update(statement, *args, **kwargs):
+        if not missed and getattr(getattr(statement, 'table', None), 'name', None) == 'daily_shop_summary':
+            missed.append(statement)
+            return NoRows()
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db.session, 'execute', execute_missing_first_update)
+    record_sale(sale, [])
+    db.session.commit()
+
+    summary = DailyShopSummary.query.one()
+    assert missed
+    assert (summary.sales_count, summary.sales_value) == (2, 250)
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+import pytest
+
+
+# Read every page of a shop's sales history, following the cursors
+def read_history(client, shop):
+    pages, cursor = [], None
+    while True:
+        response = client.get(f'/{shop.id}/sales_history', query_string={'cursor': cursor} if cursor else {})
+        assert response.status_code == 200
+        pages.append([sale["id"] for sale in response.json["sales"]])
+        cursor = response.json["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+# Sales recorded in the same instant must each show up once, whether or not a page ends among them
+@pytest.mark.parametrize('page_size', [1, 2, 3, 4, 7, 20])
+def test_pages_hold_every_sale_once(app, client, login, admin, make_shop, make_item, make_sale, page_size):
+    app.config['SALES_PAGE_SIZE'] = page_size
+    shop = make_shop("Shop 1")
+    other_shop = make_shop("Shop 2")
+    bread = make_item("Bread", shops=[shop, other_shop])
+    now = datetime(2024, 5, 1, 12, 30, 15, 250000)
+    times = [now] * 5 + [now - timedelta(seconds=1)] * 3 + [now - timedelta(days=1), now + timedelta(hours=1)]
+    sales = [make_sale(shop, admin, [(bread, 1)], date_sold=date_sold) for date_sold in times]
+    make_sale(other_shop, admin, [(bread, 1)], date_sold=now)
+    expected = [sale.id for sale in sorted(sales, key=lambda sale: (sale.date_sold, sale.id), reverse=True)]
+
+    pages = read_history(login(client, admin), shop)
+
+    assert [sale_id for page in pages for sale_id in page] == expected
+    assert all(len(page) == page_size for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= page_size
+
+
+def test_a_shop_without_sales_has_one_empty_page(client, login, admin, make_shop):
+    shop = make_shop("Shop 1")
+
+    assert read_history(login(client, admin), shop) == [[]]
+
+
+@pytest.mark.parametrize('cursor', ["garbage", "2024-05-01T12:30:15_x", "yesterday_12", "_12", "2024-05-01T12:30:15_"])
+def test_a_bad_cursor_is_rejected(client, login, admin, make_shop, cursor):
+    shop = make_shop("Shop 1")
+
+    response = login(client, admin).get(f'/{shop.id}/sales_history', query_string={'cursor': cursor})
+
+    assert response.status_code == 400
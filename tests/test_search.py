@@ -0,0 +1,87 @@
+from inventory import db
+from inventory.models import Item
+from inventory.search import ItemNameIndex, search_item_names
+import random
+import pytest
+
+NAMES = ["Rice 25kg", "Brown rice", "Rice flour", "Price tag", "Bread", "Sugar", "rice cooker", "Licorice"]
+
+
+def search(names, term, limit=None, item_ids=None):
+    index = ItemNameIndex(enumerate(names))
+    return [names[item_id] for item_id in index.search(term, limit, item_ids)]
+
+
+# What a search should return: names starting with the term in name order, then the other names containing it by
+# where the term is found and by name
+def expected(names, term, limit=None):
+    term = term.lower()
+    prefix = sorted((name for name in names if name.lower().startswith(term)), key=str.lower)
+    substring = sorted((name for name in names if term in name.lower() and not name.lower().startswith(term)),
+                       key=lambda name: (name.lower().find(term), name.lower()))
+    return (prefix + substring)[:limit]
+
+
+def test_names_starting_with_the_term_come_first():
+    assert search(NAMES, "rice") == ["Rice 25kg", "rice cooker", "Rice flour", "Price tag", "Licorice", "Brown rice"]
+
+
+@pytest.mark.parametrize('term', ["ri", "RICE", "ice", "e", "br", "cooker", "xyz", ""])
+def test_search_matches_a_scan_of_every_name(term):
+    assert search(NAMES, term) == expected(NAMES, term)
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 4, 5, 20])
+def test_limit(limit):
+    assert search(NAMES, "rice", limit) == expected(NAMES, "rice")[:limit]
+    assert search(NAMES, "ri", limit) == expected(NAMES, "ri")[:limit]
+
+
+def test_search_within_some_items():
+    assert search(NAMES, "rice", item_ids={1, 3, 4}) == ["Price tag", "Brown rice"]
+    assert search(NAMES, "ri", limit=1, item_ids={1, 3}) == ["Price tag"]
+
+
+def test_random_names():
+    generator = random.Random(6)
+    names = list({"".join(generator.choice("abcr ") for _ in range(generator.randint(1, 8))) for _ in range(500)})
+    for term in ["a", "ab", "abc", "rab", " r", "cab a"]:
+        for limit in (None, 5, 50):
+            assert search(names, term, limit) == expected(names, term, limit)
+
+
+def test_index_follows_added_and_renamed_items(app):
+    db.session.add_all([Item(item_name="Rice", item_cost_price=100, item_selling_price=150),
+                        Item(item_name="Sugar", item_cost_price=100, item_selling_price=150)])
+    db.session.commit()
+    assert [name for _, name in search_item_names("ric")] == ["Rice"]
+
+    db.session.add(Item(item_name="Brown rice", item_cost_price=100, item_selling_price=150))
+    Item.query.filter_by(item_name="Sugar").one().item_name = "Rice flour"
+    db.session.commit()
+
+    assert [name for _, name in search_item_names("ric")] == ["Rice", "Rice flour", "Brown rice"]
+    assert search_item_names("sugar") == []
+
+
+def test_item_search_endpoint_applies_the_limit(client, make_item):
+    for index in range(30):
+        make_item(f"Rice {index:02}")
+
+    response = client.post('/get_items', json={"item_name": "rice", "limit": 5})
+
+    assert [item["name"] for item in response.json] == [f"Rice {index:02}" for index in range(5)]
+    assert response.headers["X-Search-Limit"] == "5"
+
+
+# A page asking for more results than the server returns must learn the lower limit, or it would take a full page of
+# results for every match
+def test_item_search_endpoint_reports_the_limit_it_applied(app, client, make_item):
+    app.config['SEARCH_RESULT_LIMIT'] = 10
+    for index in range(30):
+        make_item(f"Rice {index:02}")
+
+    response = client.post('/get_items', json={"item_name": "rice", "limit": 20})
+
+    assert len(response.json) == 10
+    assert response.headers["X-Search-Limit"] == "10"
@@ -0,0 +1,197 @@
+from inventory import db
+from inventory.checkout import checkout
+from inventory.models import Sale, ShopItem, StoreItem, StockSold, DailyCount, CountDifference
+from inventory.stock import remove_stock, add_stock, set_stock, delete_stock, InsufficientStock
+from sqlalchemy.exc import OperationalError
+from datetime import datetime
+import threading
+import pytest
+
+
+def shop_stock(shop, item):
+    stock = ShopItem.query.filter_by(shop_id=shop.id, item_id=item.id).one()
+    return stock.item_quantity, stock.item_value
+
+
+def test_remove_and_add_stock(make_shop, make_item):
+    shop = make_shop("Shop 1")
+    item = make_item("Bread", cost=100, quantity=50, shops=[shop])
+
+    remove_stock(ShopItem, shop.id, {item.id: 20}, {item.id: 100})
+    db.session.commit()
+    assert shop_stock(shop, item) == (30, 3000)
+
+    add_stock(ShopItem, shop.id, item.id, 5, 100, running_out_below=40)
+    db.session.commit()
+    assert shop_stock(shop, item) == (35, 3500)
+    assert ShopItem.query.filter_by(shop_id=shop.id, item_id=item.id).one().item_status == 'Running Out'
+
+
+def test_remove_stock_refuses_more_than_in_stock(make_shop, make_item):
+    shop = make_shop("Shop 1")
+    bread = make_item("Bread", quantity=10, shops=[shop])
+    milk = make_item("Milk", quantity=10, shops=[shop])
+
+    with pytest.raises(InsufficientStock) as error:
+        remove_stock(ShopItem, shop.id, {bread.id: 5, milk.id: 11}, {bread.id: 100, milk.id: 100})
+    db.session.rollback()
+
+    assert error.value.item_id == milk.id
+    assert shop_stock(shop, bread) == (10, 1000)
+    assert shop_stock(shop, milk) == (10, 1000)
+
+
+# Sellers in threads of their own take 3 units at a time until the stock runs out. However their reads and writes
+# interleave, the units sold add up to what left the stock and the stock never goes below zero
+def test_concurrent_sales_never_oversell(app, make_shop, make_item):
+    shop = make_shop("Shop 1")
+    item = make_item("Bread", cost=100, quantity=100, shops=[shop])
+    shop_id, item_id = shop.id, item.id
+    sold = []
+    errors = []
+    start = threading.Barrier(8)
+
+    def sell():
+        with app.app_context():
+            units = 0
+            start.wait()
+            try:
+                while True:
+                    try:
+                        remove_stock(ShopItem, shop_id, {item_id: 3}, {item_id: 100})
+                        db.session.commit()
+                        units += 3
+                    except InsufficientStock:
+                        db.session.rollback()
+                        break
+                    except OperationalError:  # SQLite: another seller holds the write lock
+                        db.session.rollback()
+            except Exception as error:
+                errors.append(error)
+            finally:
+                sold.append(units)
+                db.session.remove()
+
+    sellers = [threading.Thread(target=sell) for _ in range(8)]
+    for seller in sellers:
+        seller.start()
+    for seller in sellers:
+        seller.join()
+
+    db.session.expire_all()
+    quantity, value = shop_stock(shop, item)
+    assert errors == []
+    assert sum(sold) == 99
+    assert (quantity, value) == (1, 100)
+
+
+def test_editing_a_sale_moves_the_stock(client, login, admin, make_shop, make_item, make_accounts, make_cart):
+    make_accounts()
+    shop = make_shop("Shop 1")
+    item = make_item("Bread", price=150, quantity=20, shops=[shop])
+    cart = make_cart(shop, admin, [(item, 5)])
+    checkout(Sale(sales_value=750, sales_discount=0, payment_method='Cash', shop_id=shop.id, user_id=admin.id,
+                  amount_paid=750), cart)
+    item_sold = cart[0]
+    login(client, admin)
+
+    response = client.post(f'/{item_sold.id}/edit_sale_item/{shop.id}',
+                           data={'item_name': "Bread", 'item_quantity': 30, 'item_discount': 0})
+    assert b"No enough quantity in stock" in response.data
+    db.session.expire_all()
+    assert shop_stock(shop, item)[0] == 15
+    assert db.session.get(StockSold, item_sold.id).item_quantity == 5
+
+    response = client.post(f'/{item_sold.id}/edit_sale_item/{shop.id}',
+                           data={'item_name': "Bread", 'item_quantity': 8, 'item_discount': 0})
+    assert response.status_code == 302
+    db.session.expire_all()
+    assert shop_stock(shop, item) == (12, 1200)
+    assert db.session.get(StockSold, item_sold.id).item_quantity == 8
+    assert db.session.get(Sale, item_sold.sale_id).sales_value == 1200
+
+
+# Sales recorded before items were referenced by id have no item_id until `flask backfill-item-ids` is run
+def test_editing_a_sale_not_backfilled_yet(client, login, admin, make_shop, make_item, make_accounts, make_cart):
+    make_accounts()
+    shop = make_shop("Shop 1")
+    item = make_item("Bread", price=150, quantity=20, shops=[shop])
+    cart = make_cart(shop, admin, [(item, 5)])
+    checkout(Sale(sales_value=750, sales_discount=0, payment_method='Cash', shop_id=shop.id, user_id=admin.id,
+                  amount_paid=750), cart)
+    item_sold = cart[0]
+    StockSold.query.filter_by(id=item_sold.id).update({'item_id': None})
+    db.session.commit()
+    login(client, admin)
+
+    response = client.post(f'/{item_sold.id}/edit_sale_item/{shop.id}',
+                           data={'item_name': "Bread", 'item_quantity': 3, 'item_discount': 0})
+
+    assert response.status_code == 302
+    db.session.expire_all()
+    assert shop_stock(shop, item) == (17, 1700)
+    assert (item_sold.item_id, item_sold.item_quantity) == (item.id, 3)
+
+
+def test_set_and_delete_stock(make_shop, make_item):
+    shop = make_shop("Shop 1")
+    item = make_item("Bread", cost=100, quantity=50, shops=[shop])
+
+    assert set_stock(ShopItem, shop.id, item.id, 30, 100, running_out_below=40) == 50
+    db.session.commit()
+    assert shop_stock(shop, item) == (30, 3000)
+    assert ShopItem.query.filter_by(shop_id=shop.id, item_id=item.id).one().item_status == 'Running Out'
+
+    assert delete_stock(ShopItem, shop.id, item.id, 100) == 30
+    db.session.commit()
+    assert ShopItem.query.count() == 0
+    assert set_stock(ShopItem, shop.id, item.id, 30, 100, running_out_below=40) is None
+
+
+def test_editing_stock(client, login, admin, make_shop, make_store, make_item):
+    shop, store = make_shop("Shop 1"), make_store("Store 1")
+    item = make_item("Bread", cost=100, quantity=50, shops=[shop], stores=[store])
+    shop_item = ShopItem.query.filter_by(shop_id=shop.id).one()
+    store_item = StoreItem.query.filter_by(store_id=store.id).one()
+    login(client, admin)
+
+    client.post(f'/{shop_item.id}/edit_shop_stock', data={'item_name': "Bread", 'item_quantity': 45})
+    client.post(f'/{store_item.id}/edit_store_stock', data={'item_name': "Bread", 'item_quantity': 120})
+
+    db.session.expire_all()
+    assert shop_stock(shop, item) == (45, 4500)
+    assert (store_item.item_quantity, store_item.item_value) == (120, 12000)
+
+
+# A count found 10 units missing, then 5 more were sold before the admin accepted the difference: the 10 units are
+# taken out of what is left rather than the stock being set back to the count, which would undo the sale
+def test_voiding_a_count_difference_keeps_later_sales(client, login, admin, make_shop, make_item):
+    shop = make_shop("Shop 1")
+    item = make_item("Bread", cost=100, quantity=100, shops=[shop])
+    shop_item = ShopItem.query.filter_by(shop_id=shop.id).one()
+    db.session.add(DailyCount(shop_item_id=shop_item.id, count=90, base_count=100, shop_id=shop.id,
+                              date=datetime.now()))
+    db.session.commit()
+    remove_stock(ShopItem, shop.id, {item.id: 5}, {item.id: 100})
+    db.session.commit()
+    login(client, admin)
+
+    client.get(f'/{shop.id}/{item.id}/void_count_differences')
+
+    db.session.expire_all()
+    assert shop_stock(shop, item) == (85, 8500)
+    assert CountDifference.query.one().quantity == -10
+
+
+def test_deleting_stock(client, login, admin, make_shop, make_store, make_item):
+    shop, store = make_shop("Shop 1"), make_store("Store 1")
+    make_item("Bread", shops=[shop], stores=[store])
+    shop_item = ShopItem.query.filter_by(shop_id=shop.id).one()
+    store_item = StoreItem.query.filter_by(store_id=store.id).one()
+    login(client, admin)
+
+    client.get(f'/{shop.id}/delete_shop_stock/{shop_item.id}')
+    client.get(f'/{store.id}/delete_store_stock/{store_item.id}')
+
+    assert ShopItem.query.count() == 0
+    assert StoreItem.query.count() == 0